@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark de notifier_server sur plusieurs workers reliés par le backplane
+Pour 1, 2, 4... workers : les clients sont répartis entre les workers, les webhooks
+arrivent sur des workers différents, et chaque client doit recevoir chaque message
+
+Usage : python bench_backplane.py [--workers 1,2,4] [--clients 2000] [--messages 20]
+        python bench_backplane.py --backplane redis://127.0.0.1:6379
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import requests
+
+from bench_broadcast import free_port, percentile, post_webhook, raise_fd_limit, reader, start_server
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+
+def start_broker(port):
+    process = subprocess.Popen(
+        [sys.executable, "notifier_backplane.py", "--port", str(port)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(0.5)
+    return process
+
+
+async def run_round(args, urls):
+    latencies, connected = [], []
+    sent_at = {}
+    tasks = []
+    for i in range(args.clients):
+        ws_url = urls[i % len(urls)].replace("http", "ws", 1) + "/ws"
+        tasks.append(asyncio.create_task(reader(ws_url, latencies, sent_at, args.messages, connected)))
+        if i % 200 == 199:
+            await asyncio.sleep(0.05)
+    while len(connected) < args.clients:
+        await asyncio.sleep(0.1)
+    per_node = [requests.get(f"{url}/stats", timeout=5).json()["clients"] for url in urls]
+
+    for i in range(args.messages):
+        commit = f"{len(urls):08x}{i:032x}"
+        payload = {"ref": "refs/heads/main", "after": commit,
+                   "commits": [{"id": commit, "added": [], "removed": [], "modified": ["accueil.html"]}]}
+        sent_at[commit] = time.time()
+        # Chaque webhook arrive sur un worker différent
+        await asyncio.to_thread(post_webhook, urls[i % len(urls)], args.secret, payload)
+        await asyncio.sleep(args.interval)
+    await asyncio.wait_for(asyncio.gather(*tasks), timeout=120)
+    latencies.sort()
+    return per_node, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--backplane", help="URL du backplane (sinon un courtier tcp:// local est lancé)")
+    parser.add_argument("--secret", default="bench-secret")
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.2)
+    args = parser.parse_args()
+    if websockets is None:
+        print("Le paquet websockets est requis : pip install websockets")
+        return 1
+    raise_fd_limit(2 * args.clients + 256)
+
+    broker = None
+    backplane = args.backplane
+    if not backplane:
+        broker_port = free_port()
+        broker = start_broker(broker_port)
+        backplane = f"tcp://127.0.0.1:{broker_port}"
+    print(f"backplane : {backplane}")
+    print(f"{'workers':>7} {'clients/worker':>16} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    try:
+        for count in [int(n) for n in args.workers.split(",")]:
+            servers, urls = [], []
+            try:
+                for _ in range(count):
+                    port = free_port()
+                    servers.append(start_server(port, args.secret, {"RETROSOFT_BACKPLANE": backplane}))
+                    urls.append(f"http://127.0.0.1:{port}")
+                per_node, latencies = asyncio.run(run_round(args, urls))
+            finally:
+                for server in servers:
+                    server.terminate()
+                    server.wait()
+            print(f"{count:7d} {'/'.join(map(str, per_node)):>16} "
+                  f"{percentile(latencies, 0.5):8.1f}ms {percentile(latencies, 0.95):8.1f}ms "
+                  f"{percentile(latencies, 0.99):8.1f}ms {latencies[-1]:8.1f}ms")
+    finally:
+        if broker:
+            broker.terminate()
+            broker.wait()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
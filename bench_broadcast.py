@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Test de charge de la diffusion de notifier_server
+Ouvre des milliers de clients WebSocket locaux (dont quelques-uns qui ne lisent jamais),
+envoie des webhooks signés et mesure le délai entre l'envoi et la réception par chaque client
+
+Usage : python bench_broadcast.py [--clients 2000] [--slow 20] [--messages 20]
+        python bench_broadcast.py --url http://serveur:8000 --secret ...
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import requests
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+
+def raise_fd_limit(needed):
+    """Des milliers de sockets dépassent souvent la limite par défaut de descripteurs"""
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, secret, extra_env=None):
+    env = dict(os.environ, RETROSOFT_GITHUB_SECRET=secret, **(extra_env or {}))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "notifier_server:app", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env)
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        try:
+            requests.get(f"http://127.0.0.1:{port}/stats", timeout=1)
+            return process
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Le serveur ne démarre pas")
+
+
+def post_webhook(url, secret, payload):
+    body = json.dumps(payload).encode()
+    signature = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    start = time.perf_counter()
+    response = requests.post(f"{url}/github-webhook", data=body, timeout=30,
+                             headers={"X-Hub-Signature-256": signature, "Content-Type": "application/json"})
+    response.raise_for_status()
+    return (time.perf_counter() - start) * 1000
+
+
+async def reader(ws_url, latencies, sent_at, expected, done):
+    async with websockets.connect(ws_url, max_queue=None, open_timeout=60) as ws:
+        done.append(None)
+        received = 0
+        while received < expected:
+            message = json.loads(await ws.recv())
+            start = sent_at.get(message.get("commit"))
+            if start is not None:
+                latencies.append((time.time() - start) * 1000)
+                received += 1
+
+
+async def stalled(ws_url, done):
+    """Client qui ne lit jamais : ses tampons se remplissent puis le serveur doit l'isoler"""
+    async with websockets.connect(ws_url, max_queue=1, open_timeout=60) as ws:
+        ws.transport.pause_reading()
+        done.append(None)
+        await asyncio.sleep(3600)
+
+
+def percentile(samples, p):
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+async def run(args, url):
+    ws_url = url.replace("http", "ws", 1) + "/ws"
+    latencies, connected = [], []
+    sent_at = {}
+    tasks = []
+    for i in range(args.clients):
+        tasks.append(asyncio.create_task(reader(ws_url, latencies, sent_at, args.messages, connected)))
+        if i % 200 == 199:
+            await asyncio.sleep(0.05)  # Laisse le serveur accepter les connexions par vagues
+    slow_connected = []
+    slow = [asyncio.create_task(stalled(ws_url, slow_connected)) for _ in range(args.slow)]
+    while len(connected) < args.clients or len(slow_connected) < args.slow:
+        await asyncio.sleep(0.1)
+    print(f"{args.clients} clients connectés (+{args.slow} clients bloqués)")
+
+    # Événement push comparable à ceux de GitHub (le gros du volume est hors des fichiers modifiés)
+    filler = "x" * args.payload_size
+    webhook_times = []
+    for i in range(args.messages):
+        commit = f"{i:040x}"
+        payload = {"ref": "refs/heads/main", "after": commit, "head_commit": {"message": filler},
+                   "commits": [{"id": commit, "added": [], "removed": [],
+                                "modified": [f"module_{n}.py" for n in range(args.files)]}]}
+        sent_at[commit] = time.time()
+        webhook_times.append(await asyncio.to_thread(post_webhook, url, args.secret, payload))
+        await asyncio.sleep(args.interval)
+    await asyncio.wait_for(asyncio.gather(*tasks), timeout=120)
+    for task in slow:
+        task.cancel()
+
+    latencies.sort()
+    webhook_times.sort()
+    print(f"réponse du webhook : p50 {percentile(webhook_times, 0.5):.1f} ms, "
+          f"max {webhook_times[-1]:.1f} ms")
+    print(f"latence de diffusion ({len(latencies)} réceptions) : p50 {percentile(latencies, 0.5):.1f} ms, "
+          f"p95 {percentile(latencies, 0.95):.1f} ms, p99 {percentile(latencies, 0.99):.1f} ms, "
+          f"max {latencies[-1]:.1f} ms")
+    print(f"serveur : {requests.get(f'{url}/stats', timeout=5).json()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="serveur existant (sinon un serveur local est lancé)")
+    parser.add_argument("--secret", default="bench-secret")
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--slow", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.2)
+    parser.add_argument("--payload-size", type=int, default=2000)
+    parser.add_argument("--files", type=int, default=5, help="fichiers modifiés par push")
+    args = parser.parse_args()
+    if websockets is None:
+        print("Le paquet websockets est requis : pip install websockets")
+        return 1
+
+    raise_fd_limit(2 * (args.clients + args.slow) + 256)
+    server = None
+    url = args.url
+    if not url:
+        port = free_port()
+        server = start_server(port, args.secret)
+        url = f"http://127.0.0.1:{port}"
+    try:
+        asyncio.run(run(args, url))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
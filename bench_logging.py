@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark du coût de la journalisation pour le thread appelant (thread GUI)
+Compare l'ancien logging.basicConfig synchrone à la file d'attente de log_setup
+
+Usage : python bench_logging.py [--records 50000]
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import log_setup
+
+
+def reset_root():
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+
+
+def measure(records):
+    """Durée par appel de logging.debug (µs) pour le thread appelant"""
+    samples = []
+    for i in range(records):
+        start = time.perf_counter_ns()
+        logging.debug("Enregistrement de test %d : %s", i, "x" * 60)
+        samples.append((time.perf_counter_ns() - start) / 1000)
+    samples.sort()
+    return {
+        "moyenne": statistics.fmean(samples),
+        "p50": samples[len(samples) // 2],
+        "p99": samples[int(len(samples) * 0.99)],
+        "max": samples[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        reset_root()
+        logging.basicConfig(filename=os.path.join(tmp, "sync.txt"), level=logging.DEBUG,
+                            format=log_setup.LOG_FORMAT)
+        before = measure(args.records)
+        reset_root()
+
+        log_setup.setup_logging(os.path.join(tmp, "async.txt"), max_bytes=1024 * 1024, backup_count=3)
+        after = measure(args.records)
+        flush_start = time.perf_counter()
+        log_setup.stop_logging()
+        flush = (time.perf_counter() - flush_start) * 1000
+        reset_root()
+
+    print(f"{args.records} appels logging.debug, coût par appel (µs)")
+    print(f"  {'':<10} {'synchrone':>12} {'file':>12}")
+    for key in before:
+        print(f"  {key:<10} {before[key]:12.2f} {after[key]:12.2f}")
+    print(f"Vidage de la file à l'arrêt : {flush:.0f} ms")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
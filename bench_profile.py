@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Temps de chargement au second lancement, avec le profil web persistant (cache HTTP
+sur disque) et avec le profil hors enregistrement par défaut de Qt 6
+
+Un serveur local sert une page et ses ressources (cacheables, avec une latence
+simulée) ; chaque lancement est un processus neuf. Le premier remplit le cache,
+le second est mesuré : durée jusqu'à loadFinished et requêtes reçues par le serveur.
+
+Usage : python bench_profile.py [--runs 3] [--assets 40] [--latency 80] [--url URL]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+MODES = ("persistant", "hors enregistrement")
+
+
+def make_handler(assets, latency, counter):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            counter.append(self.path)
+            time.sleep(latency)
+            if self.path in ("/", "/index.html"):
+                body = "<!doctype html><html><head><title>bench</title>"
+                body += "".join(f'<link rel="stylesheet" href="/a{i}.css">' for i in range(assets))
+                body += "</head><body>" + "".join(f'<img src="/i{i}.svg">' for i in range(assets))
+                body = (body + "</body></html>").encode()
+                content_type, cache = "text/html", "no-cache"
+            else:
+                # Ressource statique versionnée : réutilisable sans revalidation
+                body = (("/* %s */ body{margin:0}" % self.path) if self.path.endswith(".css") else
+                        '<svg xmlns="http://www.w3.org/2000/svg" width="8" height="8"/>').encode() * 64
+                content_type = "text/css" if self.path.endswith(".css") else "image/svg+xml"
+                cache = "public, max-age=31536000, immutable"
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Cache-Control", cache)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+    return Handler
+
+
+def run_launch(mode, url, storage):
+    """Exécuté dans le processus enfant : un lancement, une page, puis sortie"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtCore import QUrl
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEnginePage
+    from PyQt6.QtWebEngineWidgets import QWebEngineView
+    import web_profile
+
+    app = QApplication(sys.argv[:1])
+    if mode == "persistant":
+        # Cache dans le dossier temporaire aussi : sinon le premier lancement réutilise
+        # le cache partagé du profil et n'est plus un lancement à froid
+        profile = web_profile.create_profile(storage_path=storage, cache_dir=os.path.join(storage, "cache"))
+    else:
+        profile = QWebEngineProfile.defaultProfile()
+    view = QWebEngineView()
+    view.setPage(QWebEnginePage(profile, view))
+    result = {}
+
+    def on_load_finished(ok):
+        result["ms"] = (time.perf_counter() - start) * 1000
+        result["ok"] = ok
+        # Laisse Chromium terminer l'écriture du cache avant de quitter
+        from PyQt6.QtCore import QTimer
+        QTimer.singleShot(1500, app.quit)
+
+    view.loadFinished.connect(on_load_finished)
+    view.show()
+    start = time.perf_counter()
+    view.setUrl(QUrl(url))
+    app.exec()
+    del view
+    print(json.dumps(result))
+
+
+def launch(mode, url, storage):
+    proc = subprocess.run([sys.executable, __file__, "--launch", mode, "--url", url, "--storage", storage],
+                          cwd=APP_DIR, capture_output=True, text=True, timeout=120)
+    lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+    if not lines:
+        raise RuntimeError(f"Pas de mesure (code retour {proc.returncode})\n{proc.stderr[-2000:]}")
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--assets", type=int, default=40, help="ressources de la page de test")
+    parser.add_argument("--latency", type=float, default=80, help="latence simulée par requête (ms)")
+    parser.add_argument("--url", help="page réelle à mesurer à la place du serveur local")
+    parser.add_argument("--launch", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--storage", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.launch:
+        run_launch(args.launch, args.url, args.storage)
+        return 0
+
+    requests_seen = []
+    server = None
+    url = args.url
+    if not url:
+        server = ThreadingHTTPServer(("127.0.0.1", 0),
+                                     make_handler(args.assets, args.latency / 1000, requests_seen))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+    results = {mode: [] for mode in MODES}
+    try:
+        for mode in MODES:
+            for _ in range(args.runs):
+                with tempfile.TemporaryDirectory(prefix="retrosoft_profile_") as storage:
+                    first = launch(mode, url, storage)
+                    requests_seen.clear()
+                    second = launch(mode, url, storage)
+                    results[mode].append((first["ms"], second["ms"], len(requests_seen)))
+    finally:
+        if server:
+            server.shutdown()
+
+    print(f"{url} : médiane sur {args.runs} paires de lancements")
+    print(f"{'profil':<20} {'1er lancement':>14} {'2e lancement':>13} {'requêtes (2e)':>14}")
+    for mode, samples in results.items():
+        first = statistics.median(s[0] for s in samples)
+        second = statistics.median(s[1] for s in samples)
+        count = statistics.median(s[2] for s in samples) if server else float("nan")
+        print(f"{mode:<20} {first:11.0f} ms {second:10.0f} ms {count:14.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Coût mémoire et temps de démarrage d'un service : sous-processus Python dédié
+(ancien modèle) contre tâche sur la boucle asyncio partagée du navigateur
+
+Usage : python bench_services.py [--runs 5] [--settle 3]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Prêt = modules du service importés (ce que payait chaque sous-processus avant de travailler)
+READY_SNIPPET = "import notifier_client; print('ready', flush=True); import time; time.sleep({settle})"
+
+
+def measure_subprocess(settle):
+    """Démarrage jusqu'à « prêt » et RSS d'un interpréteur dédié au service"""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-c", READY_SNIPPET.format(settle=settle)],
+                            cwd=HERE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    proc.stdout.readline()
+    startup = time.perf_counter() - start
+    rss = psutil.Process(proc.pid).memory_info().rss
+    proc.kill()
+    proc.wait()
+    return startup, rss
+
+
+def measure_in_process(settle):
+    """Démarrage et surcoût RSS du même service hébergé dans un processus déjà chargé (le navigateur)"""
+    code = f"""
+import os, sys, time, psutil
+sys.path.insert(0, {HERE!r})
+# État du navigateur avant le lancement des services : Qt et le live updater sont déjà importés
+try:
+    import PyQt6.QtWidgets
+except ImportError:
+    pass
+import live_updater
+from service_monitor import supervisor
+me = psutil.Process()
+before = me.memory_info().rss
+start = time.perf_counter()
+supervisor.enable("notify")
+while not supervisor.is_running("notify"):
+    time.sleep(0.001)
+startup = time.perf_counter() - start
+time.sleep({settle})
+print(startup, me.memory_info().rss - before)
+"""
+    out = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True, timeout=120)
+    startup, rss = out.stdout.split()
+    return float(startup), int(rss)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--settle", type=float, default=3.0, help="attente avant la mesure de RSS (s)")
+    args = parser.parse_args()
+    if psutil is None:
+        print("Le paquet psutil est requis : pip install psutil")
+        return 1
+
+    results = {}
+    for label, func in (("sous-processus", measure_subprocess), ("boucle partagée", measure_in_process)):
+        samples = [func(args.settle) for _ in range(args.runs)]
+        results[label] = (statistics.median(s[0] for s in samples), statistics.median(s[1] for s in samples))
+    print(f"{'modèle':<18} {'démarrage':>12} {'RSS ajoutée':>14}")
+    for label, (startup, rss) in results.items():
+        print(f"{label:<18} {startup * 1000:10.0f} ms {rss / 2**20:11.1f} Mo")
+    (old_startup, old_rss), (new_startup, new_rss) = results.values()
+    print(f"économie par service : {(old_rss - new_rss) / 2**20:.1f} Mo, {(old_startup - new_startup) * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
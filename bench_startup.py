@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark de démarrage à froid de Retrosoft
+Mesure le temps jusqu'à MainWindow.show et jusqu'au premier loadFinished,
+avec le détail du coût de chaque import (python -X importtime)
+
+Usage : python bench_startup.py [--runs 5] [--url about:blank] [--top 15]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from lazy_imports import FEATURE_MODULES
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_importtime(stderr):
+    """Retourne {module de premier niveau: durée cumulée en ms} depuis la sortie -X importtime"""
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        try:
+            _, self_us, cumulative_us, name = _split_importtime(line)
+        except ValueError:
+            continue
+        # L'indentation du nom donne la profondeur : on ne garde que les imports directs
+        if name.startswith("  "):
+            continue
+        totals[name.strip()] = totals.get(name.strip(), 0.0) + cumulative_us / 1000
+    return totals
+
+
+def _split_importtime(line):
+    head, rest = line.split(":", 1)
+    self_us, cumulative_us, name = rest.split("|", 2)
+    return head, int(self_us), int(cumulative_us), name[1:]
+
+
+def run_once(url):
+    """Lance Retrosoft une fois et retourne (timings, imports)"""
+    fd, output_path = tempfile.mkstemp(suffix=".json", prefix="retrosoft_bench_")
+    os.close(fd)
+    env = dict(os.environ, RETROSOFT_STARTUP_BENCH=output_path)
+    spawn = time.time()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.join(APP_DIR, "navigateur.py"), url],
+        cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        text=True, timeout=120,
+    )
+    try:
+        with open(output_path, "r", encoding="utf-8") as f:
+            timings = json.load(f)
+    except (OSError, ValueError):
+        raise RuntimeError(f"Pas de mesure (code retour {proc.returncode})")
+    finally:
+        os.remove(output_path)
+    result = {
+        "interpreter": (timings["t0"] - spawn) * 1000,
+        "imports": (timings["imports_done"] - timings["t0"]) * 1000,
+        "window_shown": (timings["window_shown"] - spawn) * 1000,
+        "first_load_finished": (timings["first_load_finished"] - spawn) * 1000,
+    }
+    return result, parse_importtime(proc.stderr)
+
+
+def measure_features():
+    """Coût d'import de chaque outil dans un interpréteur neuf (ce que le chargement paresseux évite)"""
+    costs = {}
+    for feature, modules in FEATURE_MODULES.items():
+        code = "; ".join(f"import {m}" for m in modules)
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        )
+        if proc.returncode != 0:
+            costs[feature] = None
+            continue
+        totals = parse_importtime(proc.stderr)
+        costs[feature] = sum(totals.get(m, 0.0) for m in modules)
+    return costs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--url", default="about:blank")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    runs = []
+    imports = {}
+    for i in range(args.runs):
+        result, totals = run_once(args.url)
+        runs.append(result)
+        for name, ms in totals.items():
+            imports.setdefault(name, []).append(ms)
+        print(f"Run {i + 1}/{args.runs} : show {result['window_shown']:.0f} ms, "
+              f"loadFinished {result['first_load_finished']:.0f} ms")
+
+    print("\nMédianes (ms depuis le lancement du processus)")
+    for key in ("interpreter", "imports", "window_shown", "first_load_finished"):
+        print(f"  {key:<22} {statistics.median(r[key] for r in runs):8.1f}")
+
+    print(f"\nImports de premier niveau les plus coûteux (médiane cumulée, top {args.top})")
+    ranked = sorted(imports.items(), key=lambda kv: statistics.median(kv[1]), reverse=True)
+    for name, values in ranked[:args.top]:
+        print(f"  {name:<40} {statistics.median(values):8.1f}")
+
+    print("\nCoût des outils chargés à la demande (interpréteur neuf)")
+    for feature, ms in measure_features().items():
+        label = "non installé" if ms is None else f"{ms:8.1f}"
+        print(f"  {feature:<22} {label}")
+
+
+if __name__ == "__main__":
+    main()
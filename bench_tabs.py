@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+CPU et mémoire de Retrosoft avec de nombreux onglets ouverts, selon l'état des
+onglets en arrière-plan : tous actifs, gelés (Frozen) ou abandonnés (Discarded)
+
+Chaque mode tourne dans un processus neuf ; la mesure couvre le navigateur et
+tous ses processus Chromium (rendu, GPU...).
+
+Usage : python bench_tabs.py [--tabs 30] [--duration 20] [--url URL ...]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+MODES = ("actifs", "gelés", "abandonnés")
+# Page d'arrière-plan typique : minuteries et petite animation
+BUSY_PAGE = """<!doctype html><html><head><title>Onglet %d</title></head><body>
+<div id="clock"></div><canvas id="c" width="300" height="150"></canvas>
+<script>
+const ctx = document.getElementById("c").getContext("2d"); let t = 0;
+setInterval(() => { document.getElementById("clock").textContent = new Date().toISOString(); }, 250);
+(function frame() { t++; ctx.clearRect(0, 0, 300, 150); ctx.fillRect(t %% 300, 50, 20, 20);
+  requestAnimationFrame(frame); })();
+</script></body></html>"""
+
+
+def process_tree_usage(root):
+    """(temps CPU cumulé, RSS) du processus et de ses descendants"""
+    cpu = rss = 0
+    for proc in [root] + root.children(recursive=True):
+        try:
+            times = proc.cpu_times()
+            cpu += times.user + times.system
+            rss += proc.memory_info().rss
+        except psutil.Error:
+            pass
+    return cpu, rss
+
+
+def run_mode(mode, urls, tabs, duration, settle):
+    """Exécuté dans le processus enfant : ouvre les onglets, applique l'état puis mesure"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtCore import QUrl
+    from PyQt6.QtWidgets import QApplication
+    from tab_manager import TabManager
+
+    app = QApplication(sys.argv[:1])
+    manager = TabManager(QUrl("about:blank"))
+    manager.timer.stop()  # Politique appliquée à la main ci-dessous
+    manager.resize(1200, 800)
+    manager.show()
+    loaded = []
+    for i in range(tabs):
+        view = manager.new_tab(QUrl(urls[i % len(urls)]), background=i > 0)
+        view.loadFinished.connect(lambda ok: loaded.append(ok))
+    deadline = time.monotonic() + 60
+    while len(loaded) < tabs and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+
+    def wait(seconds):
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            app.processEvents()
+            time.sleep(0.01)
+
+    wait(settle)
+    if mode != "actifs":
+        # Tous les onglets en arrière-plan sont « inactifs depuis longtemps »
+        for view in manager.views():
+            view.last_active -= 3600
+        if mode == "gelés":
+            manager.apply_policy(freeze_after=1, discard_after=0, budget_mb=0)
+        else:
+            manager.apply_policy(freeze_after=0, discard_after=1, budget_mb=0)
+        wait(settle)
+    me = psutil.Process()
+    cpu_start, _ = process_tree_usage(me)
+    start = time.monotonic()
+    wait(duration)
+    cpu_end, rss = process_tree_usage(me)
+    elapsed = time.monotonic() - start
+    report = manager.lifecycle_report()
+    # Réactivation d'un onglet abandonné : coût du rechargement à la demande
+    reactivate_ms = None
+    if mode == "abandonnés" and manager.count() > 1:
+        reloaded = []
+        view = manager.widget(manager.count() - 1)
+        view.loadFinished.connect(lambda ok: reloaded.append(time.perf_counter()))
+        t0 = time.perf_counter()
+        manager.setCurrentIndex(manager.count() - 1)
+        end = time.monotonic() + 30
+        while not reloaded and time.monotonic() < end:
+            app.processEvents()
+            time.sleep(0.001)
+        if reloaded:
+            reactivate_ms = (reloaded[0] - t0) * 1000
+    print(json.dumps({"loaded": len(loaded), "cpu_percent": 100 * (cpu_end - cpu_start) / elapsed,
+                      "rss": rss, "report": report, "reactivate_ms": reactivate_ms}))
+    app.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tabs", type=int, default=30)
+    parser.add_argument("--duration", type=float, default=20.0, help="durée de la mesure CPU (s)")
+    parser.add_argument("--settle", type=float, default=5.0, help="attente après chargement / transition (s)")
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--url", action="append", help="page à ouvrir (répétable) ; défaut : page animée locale")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if psutil is None:
+        print("Le paquet psutil est requis : pip install psutil")
+        return 1
+
+    if args.mode:
+        run_mode(args.mode, json.loads(os.environ["RETROSOFT_BENCH_URLS"]), args.tabs, args.duration, args.settle)
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix="retrosoft_tabs_") as tmp:
+        urls = args.url
+        if not urls:
+            urls = []
+            for i in range(args.tabs):
+                path = os.path.join(tmp, f"tab{i}.html")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(BUSY_PAGE % i)
+                urls.append("file://" + path)
+        env = dict(os.environ, RETROSOFT_BENCH_URLS=json.dumps(urls))
+        results = {}
+        for mode in MODES:
+            samples = []
+            for _ in range(args.runs):
+                proc = subprocess.run(
+                    [sys.executable, __file__, "--mode", mode, "--tabs", str(args.tabs),
+                     "--duration", str(args.duration), "--settle", str(args.settle)],
+                    cwd=APP_DIR, env=env, capture_output=True, text=True, timeout=300)
+                lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+                if not lines:
+                    print(f"{mode} : pas de mesure (code retour {proc.returncode})\n{proc.stderr[-2000:]}")
+                    return 1
+                samples.append(json.loads(lines[-1]))
+            results[mode] = samples
+
+    print(f"{args.tabs} onglets, mesure sur {args.duration:.0f} s")
+    print(f"{'arrière-plan':<12} {'CPU':>8} {'RSS totale':>12}  état")
+    for mode, samples in results.items():
+        cpu = statistics.median(s["cpu_percent"] for s in samples)
+        rss = statistics.median(s["rss"] for s in samples)
+        print(f"{mode:<12} {cpu:7.1f}% {rss / 2**20:9.0f} Mo  {samples[-1]['report']}")
+    reactivations = [s["reactivate_ms"] for s in results["abandonnés"] if s["reactivate_ms"] is not None]
+    if reactivations:
+        print(f"réactivation d'un onglet abandonné : {statistics.median(reactivations):.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
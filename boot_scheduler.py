@@ -0,0 +1,156 @@
+"""
+Ordonnanceur de démarrage des services de Retrosoft
+Retient les services non critiques jusqu'au premier affichage de page (loadFinished)
+ou jusqu'à une fenêtre d'inactivité, puis les lance par priorité et dépendances
+"""
+
+import logging
+import time
+from PyQt6.QtCore import QTimer
+from startup_trace import tracer
+
+# Étapes de démarrage
+FIRST_PAINT = "first_paint"  # après le premier loadFinished
+IDLE = "idle"                # quelques secondes après le premier loadFinished
+
+# Priorités (plus petit = lancé en premier)
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+
+class BootService:
+    """Service en attente de démarrage et ses mesures"""
+
+    def __init__(self, name, start, priority, after, stage, order):
+        self.name = name
+        self.start = start
+        self.priority = priority
+        self.after = tuple(after)
+        self.stage = stage
+        self.order = order
+        self.state = "pending"
+        self.queued_at = time.perf_counter()
+        self.started_at = None
+        self.duration = None
+        self.error = None
+
+
+class BootScheduler:
+    """Lance les services par étape, priorité et dépendances, un par tour de boucle Qt"""
+
+    def __init__(self, idle_delay_ms=3000, max_wait_ms=15000):
+        self.idle_delay_ms = idle_delay_ms
+        self.max_wait_ms = max_wait_ms
+        self.services = {}
+        self._released = set()
+        self._attached = False
+        self._pump_scheduled = False
+        self._first_paint_at = None
+
+    def add(self, name, start, priority=PRIORITY_NORMAL, after=(), stage=FIRST_PAINT):
+        """Enregistre un service ; il sera lancé quand son étape sera atteinte"""
+        if name in self.services:
+            logging.warning(f"Service {name} déjà enregistré au démarrage")
+            return
+        self.services[name] = BootService(name, start, priority, after, stage, len(self.services))
+        if stage in self._released:
+            self._schedule_pump()
+
+    def attach(self, view):
+        """Attend le premier loadFinished de la vue (ou max_wait_ms au plus)"""
+        if self._attached:
+            return
+        self._attached = True
+        view.loadFinished.connect(self._on_first_paint)
+        QTimer.singleShot(self.max_wait_ms, self._on_first_paint)
+
+    def _on_first_paint(self, ok=True):
+        if FIRST_PAINT in self._released:
+            return
+        self._first_paint_at = time.perf_counter()
+        logging.info("Premier affichage : démarrage des services différés")
+        self.release(FIRST_PAINT)
+        QTimer.singleShot(self.idle_delay_ms, lambda: self.release(IDLE))
+
+    def release(self, stage):
+        """Autorise le lancement des services d'une étape"""
+        self._released.add(stage)
+        self._schedule_pump()
+
+    def _schedule_pump(self):
+        if not self._pump_scheduled:
+            self._pump_scheduled = True
+            QTimer.singleShot(0, self._pump)
+
+    def _dependencies_state(self, service):
+        """'ready', 'waiting' ou 'failed' selon l'état des dépendances"""
+        for dep in service.after:
+            other = self.services.get(dep)
+            if other is None:
+                continue
+            if other.state in ("failed", "skipped"):
+                return "failed"
+            if other.state != "started":
+                return "waiting"
+        return "ready"
+
+    def _next_ready(self):
+        ready = []
+        for service in self.services.values():
+            if service.state != "pending" or service.stage not in self._released:
+                continue
+            deps = self._dependencies_state(service)
+            if deps == "failed":
+                service.state = "skipped"
+                service.error = "dépendance en échec"
+                logging.warning(f"Service {service.name} ignoré : dépendance en échec")
+                continue
+            if deps == "ready":
+                ready.append(service)
+        if not ready:
+            return None
+        return min(ready, key=lambda s: (s.priority, s.order))
+
+    def _pump(self):
+        self._pump_scheduled = False
+        service = self._next_ready()
+        if service is None:
+            return
+        service.started_at = time.perf_counter()
+        try:
+            with tracer.span(f"boot:{service.name}", category="boot"):
+                service.start()
+            service.state = "started"
+        except Exception as e:
+            service.state = "failed"
+            service.error = str(e)
+            logging.error(f"Échec du démarrage du service {service.name} : {e}")
+        service.duration = time.perf_counter() - service.started_at
+        logging.info(f"Service {service.name} : {service.state} "
+                     f"(attente {self.wait_ms(service):.0f} ms, lancement {service.duration * 1000:.1f} ms)")
+        # Un service par tour de boucle pour laisser respirer l'interface
+        self._schedule_pump()
+
+    def wait_ms(self, service):
+        if service.started_at is None:
+            return None
+        return (service.started_at - service.queued_at) * 1000
+
+    def report(self):
+        """Résumé texte pour la fenêtre de diagnostic"""
+        lines = ["Services au démarrage :"]
+        for service in sorted(self.services.values(), key=lambda s: (s.started_at is None, s.started_at or 0)):
+            if service.started_at is None:
+                lines.append(f"  {service.name} : {service.state}")
+                continue
+            line = (f"  {service.name} : {service.state}, attente {self.wait_ms(service):.0f} ms, "
+                    f"lancement {service.duration * 1000:.1f} ms")
+            if service.error:
+                line += f" ({service.error})"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+# Ordonnanceur unique pour tout le processus
+scheduler = BootScheduler()
@@ -0,0 +1,202 @@
+"""
+Configuration de Retrosoft (config.json) partagée par tout le processus
+Le fichier n'est relu que si sa date de modification ou sa taille change ;
+les écritures sont atomiques et regroupées, les lectures se font en mémoire
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json")
+# Intervalle minimal entre deux vérifications du fichier par les lectures
+CHECK_INTERVAL = 1.0
+# Les modifications rapprochées sont écrites en une fois après ce délai
+WRITE_DELAY = 0.5
+
+_TRUE = {"1", "true", "yes", "on", "oui"}
+_FALSE = {"0", "false", "no", "off", "non", ""}
+
+
+class ConfigStore:
+    """Copie en mémoire de config.json avec abonnements par clé"""
+
+    def __init__(self, path=CONFIG_PATH, write_delay=WRITE_DELAY):
+        self.path = path
+        self.write_delay = write_delay
+        self._data = {}
+        self._stamp = None          # (mtime_ns, taille) du fichier lu ou écrit en dernier
+        self._checked_at = 0.0
+        self._lock = threading.RLock()
+        self._subscribers = {}      # clé -> [callback(nouvelle valeur, ancienne valeur)]
+        self._global_subscribers = []  # callback(nouvelle config, ancienne config)
+        self._write_timer = None
+        self.check()
+        atexit.register(self.flush)
+
+    # --- Lecture -------------------------------------------------------
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def check(self):
+        """Relit le fichier s'il a changé sur disque ; notifie les abonnés"""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            stamp = self._stat()
+            if stamp == self._stamp:
+                return False
+            if self._write_timer is not None:
+                return False  # Écriture en attente : la version en mémoire est la plus récente
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                data = {}
+            except (OSError, ValueError) as e:
+                # Fichier en cours d'écriture par un autre programme : on réessaiera
+                logging.warning(f"Lecture de {self.path} impossible : {e}")
+                return False
+            self._stamp = stamp
+            old, self._data = self._data, data if isinstance(data, dict) else {}
+            new = self._data
+        self._notify(new, old)
+        return True
+
+    def _maybe_check(self):
+        if time.monotonic() - self._checked_at >= CHECK_INTERVAL:
+            self.check()
+
+    def exists(self):
+        return self._stat() is not None or bool(self._data)
+
+    def snapshot(self):
+        """Copie de toute la configuration"""
+        self._maybe_check()
+        with self._lock:
+            return json.loads(json.dumps(self._data))
+
+    def get(self, key, default=None):
+        self._maybe_check()
+        with self._lock:
+            return self._data.get(key, default)
+
+    def get_str(self, key, default=""):
+        value = self.get(key)
+        return value if isinstance(value, str) else default
+
+    def get_bool(self, key, default=False):
+        value = self.get(key)
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, (int, float)):
+            return bool(value)
+        if isinstance(value, str) and value.strip().lower() in _TRUE | _FALSE:
+            return value.strip().lower() in _TRUE
+        return default
+
+    def get_int(self, key, default=0):
+        value = self.get(key)
+        if isinstance(value, bool):
+            return default
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return default
+
+    def get_float(self, key, default=0.0):
+        value = self.get(key)
+        if isinstance(value, bool):
+            return default
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return default
+
+    # --- Écriture ------------------------------------------------------
+
+    def set(self, key, value):
+        self.update({key: value})
+
+    def update(self, values):
+        """Modifie la configuration en mémoire ; l'écriture sur disque suit après write_delay"""
+        with self._lock:
+            old = dict(self._data)
+            self._data.update(values)
+            new = dict(self._data)
+            if self._write_timer is None:
+                self._write_timer = threading.Timer(self.write_delay, self.flush)
+                self._write_timer.daemon = True
+                self._write_timer.start()
+        self._notify(new, old)
+
+    def flush(self):
+        """Écrit immédiatement les modifications en attente (fichier temporaire puis renommage)"""
+        with self._lock:
+            if self._write_timer is None:
+                return
+            self._write_timer.cancel()
+            self._write_timer = None
+            tmp_path = self.path + ".tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self._data, f, indent=2, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+                # Notre propre écriture ne doit pas être relue comme un changement externe
+                self._stamp = self._stat()
+            except OSError as e:
+                logging.error(f"Écriture de {self.path} impossible : {e}")
+
+    # --- Abonnements ---------------------------------------------------
+
+    def subscribe(self, key, callback):
+        """callback(nouvelle valeur, ancienne valeur) quand la clé change
+
+        Appelé sur le thread qui a détecté le changement : un abonné Qt doit
+        repasser par un signal pour agir sur le thread GUI.
+        """
+        with self._lock:
+            self._subscribers.setdefault(key, []).append(callback)
+
+    def subscribe_all(self, callback):
+        """callback(nouvelle config, ancienne config) à chaque changement"""
+        with self._lock:
+            self._global_subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            for callbacks in self._subscribers.values():
+                if callback in callbacks:
+                    callbacks.remove(callback)
+            if callback in self._global_subscribers:
+                self._global_subscribers.remove(callback)
+
+    def _notify(self, new, old):
+        if new == old:
+            return
+        with self._lock:
+            keyed = [(key, list(callbacks)) for key, callbacks in self._subscribers.items()]
+            global_callbacks = list(self._global_subscribers)
+        for key, callbacks in keyed:
+            if new.get(key) != old.get(key):
+                for callback in callbacks:
+                    self._call(callback, new.get(key), old.get(key))
+        for callback in global_callbacks:
+            self._call(callback, new, old)
+
+    @staticmethod
+    def _call(callback, *args):
+        try:
+            callback(*args)
+        except Exception as e:
+            logging.error(f"Abonné à la configuration en erreur : {e}")
+
+
+store = ConfigStore()
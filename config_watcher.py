@@ -4,6 +4,7 @@ import time
 import threading
 import json
 import logging
+from config_store import store, CONFIG_PATH
 try:
     from watchdog.observers import Observer
     from watchdog.events import FileSystemEventHandler
@@ -11,26 +12,22 @@ try:
 except ImportError:
     HAS_WATCHDOG = False
 
-CONFIG_PATH = os.path.join(os.path.dirname(__file__), "config.json")
-
 class ConfigChangeHandler:
     def __init__(self, on_change):
         self.on_change = on_change
-        self.last_config = self.load_config()
+        # Les changements (fichier modifié ou store.set) sont notifiés par le store
+        store.subscribe_all(self.on_config_changed)
 
     def load_config(self):
-        try:
-            with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return {}
+        return store.snapshot()
+
+    def on_config_changed(self, new_config, old_config):
+        logging.info("Changement de config détecté, application à chaud...")
+        self.on_change(new_config, old_config)
 
     def check_and_reload(self):
-        new_config = self.load_config()
-        if new_config != self.last_config:
-            logging.info("Changement de config détecté, application à chaud...")
-            self.on_change(new_config, self.last_config)
-            self.last_config = new_config
+        # Simple stat du fichier ; relu seulement si sa date ou sa taille a changé
+        store.check()
 
     def start_polling(self, interval=2):
         while True:
@@ -60,4 +57,4 @@ def start_config_watcher(on_change):
     else:
         logging.info("Surveillance de config.json (polling)")
         t = threading.Thread(target=handler.start_polling, daemon=True)
-        t.start() 
\ No newline at end of file
+        t.start()
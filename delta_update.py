@@ -0,0 +1,215 @@
+"""
+Mises à jour différentielles (delta binaire) entre deux versions de Retrosoft
+Format : en-tête (tailles et SHA-256 de la base et de la cible) puis une suite
+d'opérations COPY (depuis l'ancien fichier) / ADD (octets nouveaux) compressée en LZMA
+"""
+
+import hashlib
+import lzma
+import struct
+
+MAGIC = b"RSDELTA1"
+_HEADER = struct.Struct(">8sQ32sQ32s")
+_COPY = struct.Struct(">QI")
+_ADD = struct.Struct(">I")
+_MOD = 1 << 16
+
+
+class DeltaError(Exception):
+    """Delta inapplicable (mauvaise base, fichier corrompu, résultat invalide)"""
+
+
+def delta_asset_name(from_version, to_version):
+    """Nom de l'asset de release contenant le patch vX→vY"""
+    return f"Retrosoft-v{from_version.lstrip('v')}-to-v{to_version.lstrip('v')}.rsdelta"
+
+
+def _weak_hash(block):
+    """Somme de contrôle glissante façon rsync : (a, b) combinés sur 32 bits"""
+    a = sum(block) % _MOD
+    b = sum((len(block) - i) * x for i, x in enumerate(block)) % _MOD
+    return a, b
+
+
+# Fenêtres traitées d'un coup par numpy (borne la mémoire : ~50 Mo par tranche)
+_CHUNK = 1 << 20
+
+
+def _window_keys(data, block_size):
+    """(début, clés) par tranches : clé (b << 16) | a de chaque fenêtre, calculée avec numpy
+
+    Sommes préfixes : a = S1, b = (block_size + i) * S1 - S2 avec S2 = somme de j * x[j]
+    (indices locaux à la tranche : b ne dépend que du contenu de la fenêtre).
+    Un débordement int64 ne fausse rien : 2**16 divise 2**64.
+    """
+    import numpy as np
+    total = len(data) - block_size + 1
+    view = memoryview(data)
+    for start in range(0, max(total, 0), _CHUNK):
+        count = min(_CHUNK, total - start)
+        x = np.frombuffer(view[start:start + count + block_size - 1], dtype=np.uint8).astype(np.int64)
+        c1 = np.concatenate(([0], np.cumsum(x)))
+        c2 = np.concatenate(([0], np.cumsum(x * np.arange(len(x), dtype=np.int64))))
+        s1 = c1[block_size:] - c1[:count]
+        s2 = c2[block_size:] - c2[:count]
+        b = ((block_size + np.arange(count, dtype=np.int64)) * s1 - s2) % _MOD
+        yield start, (b << 16) | (s1 % _MOD)
+
+
+def _numpy_index(old, block_size):
+    """Index {clé: [offsets]} des blocs alignés de old, ou None sans numpy"""
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return None
+    index = {}
+    for start, keys in _window_keys(old, block_size):
+        first = -start % block_size
+        for n, key in enumerate(keys[first::block_size].tolist()):
+            index.setdefault(key, []).append(start + first + n * block_size)
+    return index
+
+
+def _candidate_finder(index, new, block_size, vectorized):
+    """next_candidate(i) -> (position >= i dont la clé est dans l'index, clé) ou None
+
+    Vectorisé : les positions candidates sont toutes connues d'avance et les octets
+    littéraux ne sont plus parcourus en Python ; sinon la fenêtre glisse octet par octet.
+    """
+    if vectorized:
+        import numpy as np
+        wanted = np.fromiter(index, dtype=np.int64, count=len(index))
+        positions, position_keys = [], []
+        for start, keys in _window_keys(new, block_size):
+            found = np.flatnonzero(np.isin(keys, wanted))
+            positions.append(found + start)
+            position_keys.append(keys[found])
+        positions = np.concatenate(positions) if positions else np.zeros(0, dtype=np.int64)
+        position_keys = np.concatenate(position_keys) if position_keys else positions
+
+        def next_candidate(i):
+            n = int(np.searchsorted(positions, i))
+            if n == len(positions):
+                return None
+            return int(positions[n]), int(position_keys[n])
+        return next_candidate
+
+    def next_candidate(i):
+        if i + block_size > len(new):
+            return None
+        a, b = _weak_hash(new[i:i + block_size])
+        while True:
+            key = (b << 16) | a
+            if key in index:
+                return i, key
+            if i + block_size >= len(new):
+                return None
+            # Décale la fenêtre d'un octet
+            out_byte, in_byte = new[i], new[i + block_size]
+            a = (a - out_byte + in_byte) % _MOD
+            b = (b - block_size * out_byte + a) % _MOD
+            i += 1
+    return next_candidate
+
+
+def create_delta(old, new, block_size=4096):
+    """Construit le delta qui transforme old en new (bytes -> bytes)"""
+    # numpy (outil de release) si disponible : le calcul des sommes ne passe plus par Python
+    index = _numpy_index(old, block_size)
+    vectorized = index is not None
+    if not vectorized:
+        index = {}
+        for offset in range(0, len(old) - block_size + 1, block_size):
+            a, b = _weak_hash(old[offset:offset + block_size])
+            index.setdefault((b << 16) | a, []).append(offset)
+
+    ops = []
+
+    def add_literal(start, end):
+        if end > start:
+            ops.append(b"A" + _ADD.pack(end - start) + new[start:end])
+
+    next_candidate = _candidate_finder(index, new, block_size, vectorized) if index else lambda i: None
+    i = 0
+    literal_start = 0
+    while True:
+        candidate = next_candidate(i)
+        if candidate is None:
+            break
+        i, key = candidate
+        match = None
+        for offset in index[key]:
+            if old[offset:offset + block_size] == new[i:i + block_size]:
+                match = offset
+                break
+        if match is None:
+            i += 1  # Collision de la somme faible
+            continue
+        # Étend la correspondance vers l'avant, bloc par bloc puis octet par octet
+        length = block_size
+        while (match + length + block_size <= len(old) and i + length + block_size <= len(new)
+               and old[match + length:match + length + block_size] == new[i + length:i + length + block_size]):
+            length += block_size
+        while match + length < len(old) and i + length < len(new) and old[match + length] == new[i + length]:
+            length += 1
+        add_literal(literal_start, i)
+        ops.append(b"C" + _COPY.pack(match, length))
+        i += length
+        literal_start = i
+    add_literal(literal_start, len(new))
+    ops.append(b"E")
+
+    header = _HEADER.pack(MAGIC, len(old), hashlib.sha256(old).digest(),
+                          len(new), hashlib.sha256(new).digest())
+    return header + lzma.compress(b"".join(ops))
+
+
+def read_header(path):
+    """Retourne (taille base, sha256 base, taille cible, sha256 cible) en hexadécimal"""
+    with open(path, "rb") as f:
+        raw = f.read(_HEADER.size)
+    if len(raw) != _HEADER.size:
+        raise DeltaError("Delta tronqué")
+    magic, base_size, base_sha, target_size, target_sha = _HEADER.unpack(raw)
+    if magic != MAGIC:
+        raise DeltaError("Format de delta inconnu")
+    return base_size, base_sha.hex(), target_size, target_sha.hex()
+
+
+def file_sha256(path, block_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def apply_delta(base_path, delta_path, out_path):
+    """Reconstruit la nouvelle version ; vérifie la base et le SHA-256 du résultat"""
+    base_size, base_sha, target_size, target_sha = read_header(delta_path)
+    if file_sha256(base_path) != base_sha:
+        raise DeltaError("La version installée ne correspond pas à la base du delta")
+    digest = hashlib.sha256()
+    with open(base_path, "rb") as base, open(delta_path, "rb") as raw, open(out_path, "wb") as out:
+        raw.seek(_HEADER.size)
+        with lzma.open(raw, "rb") as ops:
+            while True:
+                op = ops.read(1)
+                if op == b"C":
+                    offset, length = _COPY.unpack(ops.read(_COPY.size))
+                    base.seek(offset)
+                    data = base.read(length)
+                elif op == b"A":
+                    (length,) = _ADD.unpack(ops.read(_ADD.size))
+                    data = ops.read(length)
+                elif op == b"E":
+                    break
+                else:
+                    raise DeltaError("Opération de delta invalide")
+                if len(data) != length:
+                    raise DeltaError("Delta tronqué")
+                out.write(data)
+                digest.update(data)
+    if digest.hexdigest() != target_sha:
+        raise DeltaError("SHA-256 du fichier reconstruit invalide")
+    return target_sha
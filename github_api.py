@@ -0,0 +1,165 @@
+"""
+Accès à l'API GitHub pour les mises à jour de Retrosoft
+Session HTTP persistante et cache ETag sur disque : un dépôt inchangé ne renvoie qu'une réponse 304
+sans corps (qui compte tout de même dans le quota : GitHub n'exempte que les 304 authentifiés)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import requests
+
+DEFAULT_REPO_PATH = "qjslk/navigateur-rapide"
+DEFAULT_BRANCH = "main"
+ETAG_CACHE_FILE = ".github_cache.json"
+# Entrées gardées dans le cache ETag (les moins récemment utilisées sont évincées)
+ETAG_CACHE_MAX_ENTRIES = 32
+
+_COMMIT_SHA = re.compile(r"[0-9a-f]{40}")
+
+_session = None
+_session_lock = threading.Lock()
+# Dernier état du quota de l'API lu dans les en-têtes X-RateLimit-*
+_rate_limit = None
+
+
+def get_api_base():
+    """URL de l'API GitHub (surchargée par RETROSOFT_GITHUB_API, ex. pour un serveur local de test)"""
+    return os.environ.get("RETROSOFT_GITHUB_API", "https://api.github.com").rstrip("/")
+
+
+def get_raw_base():
+    """URL des fichiers bruts (surchargée par RETROSOFT_GITHUB_RAW)"""
+    return os.environ.get("RETROSOFT_GITHUB_RAW", "https://raw.githubusercontent.com").rstrip("/")
+
+
+def repo_path_from_url(repo_url):
+    """'https://github.com/owner/repo' -> 'owner/repo'"""
+    if repo_url.startswith("https://github.com/"):
+        return repo_url.replace("https://github.com/", "").strip("/")
+    return DEFAULT_REPO_PATH
+
+
+def git_blob_sha(data):
+    """SHA-1 d'un blob git (identique au champ "sha" de l'API GitHub)"""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def get_session():
+    """Session HTTP partagée (connexions keep-alive réutilisées)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            # Pool assez grand pour les téléchargements parallèles
+            adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+            _session.headers.update({
+                "Accept": "application/vnd.github+json",
+                "User-Agent": "Retrosoft-updater",
+            })
+        return _session
+
+
+class ETagCache:
+    """Réponses JSON de l'API GitHub indexées par URL, avec leur ETag"""
+
+    def __init__(self, path=ETAG_CACHE_FILE, max_entries=ETAG_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = None
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except Exception:
+                self._entries = {}
+        return self._entries
+
+    def get(self, url):
+        with self._lock:
+            entries = self._load()
+            entry = entries.pop(url, None)
+            if entry is not None:
+                entries[url] = entry  # Plus récemment utilisée : en fin d'ordre
+            return entry
+
+    def put(self, url, etag, data):
+        with self._lock:
+            entries = self._load()
+            entries.pop(url, None)
+            entries[url] = {"etag": etag, "data": data}
+            while len(entries) > self.max_entries:
+                del entries[next(iter(entries))]
+            tmp_path = self.path + ".tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(entries, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logging.warning(f"Écriture du cache ETag impossible : {e}")
+
+
+etag_cache = ETagCache()
+
+
+def _record_rate_limit(response):
+    """Quota lu sur chaque réponse, 304 compris : sans authentification, un 304 consomme une requête"""
+    global _rate_limit
+    remaining = response.headers.get("X-RateLimit-Remaining")
+    if remaining is None:
+        return
+    _rate_limit = {
+        "remaining": int(remaining),
+        "limit": int(response.headers.get("X-RateLimit-Limit", 0)),
+        "reset": float(response.headers.get("X-RateLimit-Reset", 0)),
+    }
+
+
+def get_rate_limit():
+    """Quota restant {"remaining", "limit", "reset" (horodatage)} ou None si encore inconnu"""
+    return dict(_rate_limit) if _rate_limit else None
+
+
+def get_json_cached(url, timeout=10, use_cache=True):
+    """GET conditionnel (If-None-Match) ; retourne (données, vient_du_cache)
+
+    use_cache=False pour une ressource immuable (arbre d'un commit) : rien n'est
+    gardé sur disque, elle ne sera jamais revalidée.
+    """
+    cached = etag_cache.get(url) if use_cache else None
+    headers = {}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    response = get_session().get(url, headers=headers, timeout=timeout)
+    _record_rate_limit(response)
+    if response.status_code == 304 and cached:
+        return cached["data"], True
+    response.raise_for_status()
+    data = response.json()
+    etag = response.headers.get("ETag")
+    if etag and use_cache:
+        etag_cache.put(url, etag, data)
+    return data, False
+
+
+def fetch_tree(repo_path, branch=DEFAULT_BRANCH, timeout=10):
+    """Arbre git complet du dépôt en une requête : {chemin: {"sha", "size"}}"""
+    url = f"{get_api_base()}/repos/{repo_path}/git/trees/{branch}?recursive=1"
+    # L'arbre d'un commit ne change jamais : seul celui d'une branche profite du cache ETag
+    data, from_cache = get_json_cached(url, timeout=timeout, use_cache=not _COMMIT_SHA.fullmatch(branch))
+    if data.get("truncated"):
+        logging.warning("Arbre GitHub tronqué : certains fichiers ne seront pas comparés")
+    logging.debug(f"Arbre {repo_path}@{branch} {'inchangé (304)' if from_cache else 'téléchargé'}")
+    return {
+        entry["path"]: {"sha": entry["sha"], "size": entry.get("size")}
+        for entry in data.get("tree", [])
+        if entry.get("type") == "blob"
+    }
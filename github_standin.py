@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Serveur local imitant l'API GitHub pour tester les mises à jour de Retrosoft
+Sert un dossier local comme s'il s'agissait du dépôt (arbre git, contenus, fichiers bruts)
+
+Usage : python github_standin.py --root DOSSIER [--port 8765]
+Puis lancer Retrosoft avec :
+    RETROSOFT_GITHUB_API=http://127.0.0.1:8765 RETROSOFT_GITHUB_RAW=http://127.0.0.1:8765/raw
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from github_api import git_blob_sha
+
+IGNORED_DIRS = {".git", "__pycache__", "traces"}
+
+
+def build_tree(root):
+    """Arbre au format de l'API git/trees?recursive=1"""
+    entries = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in IGNORED_DIRS)
+        for name in sorted(filenames):
+            full = os.path.join(dirpath, name)
+            with open(full, "rb") as f:
+                data = f.read()
+            path = os.path.relpath(full, root).replace(os.sep, "/")
+            entries.append({"path": path, "mode": "100644", "type": "blob",
+                            "sha": git_blob_sha(data), "size": len(data)})
+    body = json.dumps({"tree": entries, "truncated": False})
+    return {"sha": hashlib.sha1(body.encode()).hexdigest(), "tree": entries, "truncated": False}
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    root = "."
+    counts = {}
+    counts_lock = threading.Lock()
+    # Quota d'un client non authentifié : chaque requête d'API le consomme, 304 compris
+    rate_limit = 60
+    rate_used = 0
+
+    def _count(self, kind):
+        with self.counts_lock:
+            self.counts[kind] = self.counts.get(kind, 0) + 1
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _rate_headers(self):
+        with self.counts_lock:
+            StandinHandler.rate_used += 1
+            remaining = max(0, self.rate_limit - StandinHandler.rate_used)
+        return {"X-RateLimit-Limit": str(self.rate_limit), "X-RateLimit-Remaining": str(remaining),
+                "X-RateLimit-Reset": str(int(time.time()) + 3600)}
+
+    def _send_json(self, data):
+        body = json.dumps(data).encode()
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        headers = self._rate_headers()
+        if self.headers.get("If-None-Match") == etag:
+            self._count("304")
+            self._send(304, headers={"ETag": etag, **headers})
+            return
+        self._count("200")
+        self._send(200, body, {"Content-Type": "application/json", "ETag": etag, **headers})
+
+    def do_GET(self):
+        parts = urlsplit(self.path).path.strip("/").split("/")
+        # /repos/{owner}/{repo}/git/trees/{branch}
+        if len(parts) >= 6 and parts[0] == "repos" and parts[3:5] == ["git", "trees"]:
+            self._count("tree")
+            self._send_json(build_tree(self.root))
+        # /repos/{owner}/{repo}/contents/{path}
+        elif len(parts) >= 5 and parts[0] == "repos" and parts[3] == "contents":
+            self._count("contents")
+            data = self._read("/".join(parts[4:]))
+            if data is None:
+                self._send(404)
+            else:
+                self._send_json({"sha": git_blob_sha(data), "size": len(data)})
+        # /raw/{owner}/{repo}/{branch}/{path}
+        elif len(parts) >= 5 and parts[0] == "raw":
+            self._count("raw")
+            data = self._read("/".join(parts[4:]))
+            if data is None:
+                self._send(404)
+            else:
+                self._send(200, data, {"Content-Type": "application/octet-stream"})
+        else:
+            self._send(404)
+
+    def _read(self, relpath):
+        full = os.path.normpath(os.path.join(self.root, relpath))
+        if not full.startswith(os.path.abspath(self.root)) or not os.path.isfile(full):
+            return None
+        with open(full, "rb") as f:
+            return f.read()
+
+    def log_message(self, fmt, *args):
+        print(f"{self.address_string()} {fmt % args}")
+
+
+def serve(root, port=8765):
+    """Démarre le serveur dans un thread ; retourne le serveur (server.shutdown() pour l'arrêter)"""
+    StandinHandler.root = os.path.abspath(root)
+    server = ThreadingHTTPServer(("127.0.0.1", port), StandinHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", default=".")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    StandinHandler.root = os.path.abspath(args.root)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), StandinHandler)
+    print(f"Stand-in GitHub sur http://127.0.0.1:{args.port} (racine {StandinHandler.root})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"Requêtes : {StandinHandler.counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Application à chaud des fichiers mis à jour par le live updater
+Recharge accueil.html dans la vue et les modules Python purs via importlib,
+sans redémarrer Retrosoft (sauf si navigateur.py lui-même a changé)
+"""
+
+import importlib
+import logging
+import os
+import sys
+import time
+
+# Fichiers qui ne peuvent pas être appliqués sans redémarrage
+RESTART_REQUIRED = {"navigateur.py"}
+HOME_PAGE = "accueil.html"
+
+
+class HotReloadResult:
+    """Bilan d'une application à chaud"""
+
+    def __init__(self):
+        self.reloaded = []         # (fichier, durée en ms)
+        self.failed = []           # (fichier, message)
+        self.restart_required = []
+
+    def summary(self):
+        parts = [f"{name} ({ms:.0f} ms)" for name, ms in self.reloaded]
+        text = f"Appliqué à chaud : {', '.join(parts)}" if parts else "Rien à appliquer à chaud"
+        if self.failed:
+            text += f" ; échecs : {', '.join(name for name, _ in self.failed)}"
+        if self.restart_required:
+            text += f" ; redémarrage requis pour {', '.join(self.restart_required)}"
+        return text
+
+
+def reload_home_page(main_window):
+    """Recharge sans cache les onglets qui affichent accueil.html ; les autres la liront à leur prochain affichage"""
+    tabs = getattr(main_window, "tabs", None)
+    if tabs is not None:
+        views = tabs.views()
+    else:
+        views = [view for view in [getattr(main_window, "browser", None)] if view is not None]
+    from PyQt6.QtWebEngineCore import QWebEnginePage
+    for view in views:
+        if view.url() != main_window.home_page_url:
+            continue
+        state = view.page().lifecycleState()
+        if state == QWebEnginePage.LifecycleState.Discarded:
+            continue  # Rechargée de toute façon quand on y revient
+        if state == QWebEnginePage.LifecycleState.Frozen:
+            # Une page gelée ne se recharge pas : abandonnée, elle sera relue à la réactivation
+            view.page().setLifecycleState(QWebEnginePage.LifecycleState.Discarded)
+        else:
+            view.page().triggerAction(QWebEnginePage.WebAction.ReloadAndBypassCache)
+
+
+def _live_objects(main_window, module_name):
+    """Objets de la fenêtre principale dont la classe vient du module rechargé"""
+    if main_window is None:
+        return []
+    return [obj for obj in vars(main_window).values()
+            if type(obj).__module__ == module_name]
+
+
+def reload_module(module_name, main_window=None):
+    """Recharge un module déjà importé en lui transmettant son état
+
+    Le module peut définir __hot_reload_save__() -> état et __hot_reload_restore__(état).
+    Les objets de la fenêtre principale issus du module passent sur les nouvelles classes.
+    """
+    module = sys.modules.get(module_name)
+    if module is None:
+        return False
+    save = getattr(module, "__hot_reload_save__", None)
+    state = save() if save else None
+    objects = _live_objects(main_window, module_name)
+    module = importlib.reload(module)
+    restore = getattr(module, "__hot_reload_restore__", None)
+    if restore:
+        restore(state)
+    for obj in objects:
+        new_class = getattr(module, type(obj).__name__, None)
+        if isinstance(new_class, type) and new_class is not type(obj):
+            try:
+                obj.__class__ = new_class
+            except TypeError:
+                # Classes Qt (sip) : l'instance garde l'ancien code jusqu'à sa prochaine création
+                logging.debug(f"{type(obj).__name__} conservé dans sa version précédente")
+    return True
+
+
+def apply_updates(files, main_window=None):
+    """Applique les fichiers téléchargés ; retourne un HotReloadResult"""
+    result = HotReloadResult()
+    frozen = getattr(sys, "frozen", False)
+    for filename in files:
+        if filename in RESTART_REQUIRED:
+            result.restart_required.append(filename)
+            continue
+        start = time.perf_counter()
+        try:
+            if filename == HOME_PAGE:
+                reload_home_page(main_window)
+            elif filename.endswith(".py"):
+                if frozen:
+                    # Les modules d'un exécutable PyInstaller ne sont pas lus depuis le disque
+                    result.restart_required.append(filename)
+                    continue
+                reload_module(os.path.splitext(filename)[0].replace("/", "."), main_window)
+            else:
+                continue
+        except Exception as e:
+            logging.error(f"Échec de l'application à chaud de {filename} : {e}")
+            result.failed.append((filename, str(e)))
+            continue
+        elapsed = (time.perf_counter() - start) * 1000
+        result.reloaded.append((filename, elapsed))
+        logging.info(f"{filename} appliqué à chaud en {elapsed:.1f} ms")
+    return result
@@ -0,0 +1,87 @@
+"""
+Chargement paresseux des dépendances lourdes de Retrosoft
+Chaque outil de la sidebar charge ses modules à sa première utilisation
+"""
+
+import importlib
+import logging
+import sys
+import threading
+import time
+
+# Modules nécessaires à chaque outil de la sidebar
+FEATURE_MODULES = {
+    "clipboard": ["pyperclip"],
+    "screenshot": ["pyautogui"],
+    "qr": ["cv2", "pyzbar.pyzbar"],
+    "tts": ["pyttsx3"],
+    "links": ["bs4"],
+    "system_info": ["psutil"],
+    "notifications": ["plyer"],
+    "history": ["pandas"],
+}
+
+# Durée d'import mesurée pour chaque module chargé via ce module (secondes)
+import_timings = {}
+
+_prewarm_thread = None
+
+
+def load_module(name):
+    """Importe un module et mémorise la durée de son import"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    elapsed = time.perf_counter() - start
+    import_timings.setdefault(name, elapsed)
+    logging.debug(f"Import paresseux de {name} en {elapsed * 1000:.1f} ms")
+    return module
+
+
+class LazyModule:
+    """Module importé seulement au premier accès à l'un de ses attributs"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = load_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "chargé" if self._module is not None else "non chargé"
+        return f"<LazyModule {self._name} ({state})>"
+
+
+def load_feature(feature):
+    """Charge tous les modules d'un outil de la sidebar"""
+    for name in FEATURE_MODULES.get(feature, []):
+        load_module(name)
+
+
+def prewarm(features=None):
+    """Précharge les modules des outils dans un thread d'arrière-plan"""
+    global _prewarm_thread
+    if _prewarm_thread is not None and _prewarm_thread.is_alive():
+        return _prewarm_thread
+    features = list(features or FEATURE_MODULES)
+
+    def run():
+        start = time.perf_counter()
+        for feature in features:
+            try:
+                load_feature(feature)
+            except Exception as e:
+                logging.warning(f"Préchargement de {feature} impossible : {e}")
+        logging.info(f"Préchargement des outils terminé en {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    _prewarm_thread = threading.Thread(target=run, name="lazy-prewarm", daemon=True)
+    _prewarm_thread.start()
+    return _prewarm_thread
@@ -12,9 +12,46 @@ import tempfile
 import shutil
 from pathlib import Path
 from PyQt6.QtWidgets import QMessageBox
-from PyQt6.QtCore import QThread, pyqtSignal, QTimer
+from PyQt6.QtCore import QObject, QThread, pyqtSignal, QTimer
 import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 from version import get_github_repo_url
+from github_api import (fetch_tree, repo_path_from_url, get_session, get_raw_base,
+                        git_blob_sha, get_rate_limit, DEFAULT_BRANCH)
+from update_manifest import UpdateManifest
+from hot_reload import apply_updates
+
+# Nombre de téléchargements simultanés
+DEFAULT_DOWNLOAD_WORKERS = 4
+
+# Planning adaptatif : les notifications push font l'essentiel, le polling n'est qu'un filet de sécurité
+PUSH_HEALTHY_INTERVAL_MINUTES = 30
+POLL_JITTER = 0.2  # ±20 % : les clients ne sondent pas GitHub au même rythme
+# Quota GitHub bas : la vérification suivante attend la réinitialisation du quota
+# (sans authentification, chaque vérification consomme une requête, même conclue par un 304)
+LOW_QUOTA_RATIO = 0.1
+
+# Fichiers suivis par les mises à jour en temps réel
+MONITORED_FILES = [
+    "navigateur.py",
+    "version.py",
+    "updater.py",
+    "accueil.html"
+]
+
+class PushUpdateEvents(QObject):
+    """Événements du client de notifications (thread ou boucle asyncio) livrés au thread GUI
+
+    Les récepteurs sont des méthodes de la fenêtre principale : la connexion Qt
+    passe en file d'attente et le traitement se fait sur le thread GUI.
+    """
+    files_downloaded = pyqtSignal(list)  # Fichiers téléchargés suite à un push
+    connection_changed = pyqtSignal(bool)  # Connexion réelle au serveur de notifications
+
+
+push_events = PushUpdateEvents()
 
 class LiveUpdateChecker(QThread):
     """Thread pour vérifier les mises à jour de code en temps réel"""
@@ -26,29 +63,17 @@ class LiveUpdateChecker(QThread):
     def __init__(self, current_version="1.0.0"):
         super().__init__()
         self.current_version = current_version
-        repo_url = get_github_repo_url()
         # Extraire le chemin "owner/repo" depuis l'URL
-        if repo_url.startswith("https://github.com/"):
-            repo_path = repo_url.replace("https://github.com/", "").strip("/")
-        else:
-            repo_path = "qjslk/navigateur-rapide"  # fallback
-        self.github_repo = repo_path
-        self.github_api_url = f"https://api.github.com/repos/{self.github_repo}"
-        self.files_to_monitor = [
-            "navigateur.py",
-            "version.py", 
-            "updater.py",
-            "accueil.html"
-        ]
+        self.github_repo = repo_path_from_url(get_github_repo_url())
+        self.files_to_monitor = list(MONITORED_FILES)
         
     def run(self):
         """Vérifier s'il y a des fichiers modifiés sur GitHub"""
         try:
-            updated_files = []
-            
-            for filename in self.files_to_monitor:
-                if self.check_file_updated(filename):
-                    updated_files.append(filename)
+            # Une seule requête (304 si le dépôt n'a pas changé) pour tous les fichiers,
+            # comparée en mémoire au manifeste local
+            tree = fetch_tree(self.github_repo)
+            updated_files = UpdateManifest().changed_files(tree, self.files_to_monitor)
             
             if updated_files:
                 self.files_updated.emit(updated_files)
@@ -57,34 +82,6 @@ class LiveUpdateChecker(QThread):
                 
         except Exception as e:
             self.error_occurred.emit(f"Erreur de vérification: {str(e)}")
-    
-    def check_file_updated(self, filename):
-        """Vérifier si un fichier spécifique a été modifié"""
-        try:
-            # Récupérer les informations du fichier depuis GitHub
-            url = f"{self.github_api_url}/contents/{filename}"
-            response = requests.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                github_data = response.json()
-                github_sha = github_data["sha"]
-                
-                # Comparer avec le SHA local (si existe)
-                local_sha_file = f".{filename}.sha"
-                if os.path.exists(local_sha_file):
-                    with open(local_sha_file, 'r') as f:
-                        local_sha = f.read().strip()
-                    
-                    return github_sha != local_sha
-                else:
-                    # Première fois, considérer comme mise à jour
-                    return True
-            
-            return False
-            
-        except Exception as e:
-            logging.error(f"Erreur lors de la vérification de {filename}: {e}")
-            return False
 
 class LiveFileDownloader(QThread):
     """Thread pour télécharger les fichiers mis à jour"""
@@ -92,25 +89,21 @@ class LiveFileDownloader(QThread):
     download_finished = pyqtSignal(list)  # Liste des fichiers téléchargés
     error_occurred = pyqtSignal(str)
     
-    def __init__(self, files_to_download):
+    def __init__(self, files_to_download, expected_shas=None, max_workers=DEFAULT_DOWNLOAD_WORKERS,
+                 ref=DEFAULT_BRANCH):
         super().__init__()
         self.files_to_download = files_to_download
-        repo_url = get_github_repo_url()
-        if repo_url.startswith("https://github.com/"):
-            repo_path = repo_url.replace("https://github.com/", "").strip("/")
-        else:
-            repo_path = "qjslk/navigateur-rapide"
-        self.github_repo = repo_path
-        self.github_raw_url = f"https://raw.githubusercontent.com/{self.github_repo}/main"
+        # SHA attendus {fichier: sha} ; lus dans l'arbre GitHub (cache ETag) s'ils ne sont pas fournis
+        self.expected_shas = expected_shas
+        self.max_workers = max(1, max_workers)
+        self.github_repo = repo_path_from_url(get_github_repo_url())
+        # ref : branche ou SHA de commit (un commit précis évite le décalage du cache des fichiers bruts)
+        self.github_raw_url = f"{get_raw_base()}/{self.github_repo}/{ref}"
         
     def run(self):
         """Télécharger les fichiers mis à jour"""
         try:
-            downloaded_files = []
-            
-            for filename in self.files_to_download:
-                if self.download_file(filename):
-                    downloaded_files.append(filename)
+            downloaded_files = self.download_all()
             
             if downloaded_files:
                 self.download_finished.emit(downloaded_files)
@@ -120,25 +113,43 @@ class LiveFileDownloader(QThread):
         except Exception as e:
             self.error_occurred.emit(f"Erreur de téléchargement: {str(e)}")
     
+    def download_all(self):
+        """Télécharge tous les fichiers (utilisable hors thread) ; retourne ceux qui ont réussi"""
+        if self.expected_shas is None:
+            tree = fetch_tree(self.github_repo)
+            self.expected_shas = {path: entry["sha"] for path, entry in tree.items()}
+        
+        # Téléchargements en parallèle sur la session partagée (connexions réutilisées)
+        self.manifest = UpdateManifest()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="live-download") as pool:
+            results = pool.map(self.download_file, self.files_to_download)
+            downloaded_files = [f for f, ok in zip(self.files_to_download, results) if ok]
+        self.manifest.save()
+        return downloaded_files
+    
     def download_file(self, filename):
-        """Télécharger un fichier spécifique"""
+        """Télécharger un fichier spécifique et vérifier son SHA de blob git"""
         try:
             # URL du fichier brut sur GitHub
             file_url = f"{self.github_raw_url}/{filename}"
-            response = requests.get(file_url, timeout=30)
+            response = get_session().get(file_url, timeout=30)
             
             if response.status_code == 200:
-                # Sauvegarder le fichier
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(response.text)
+                data = response.content
+                sha = git_blob_sha(data)
+                expected = self.expected_shas.get(filename)
+                if expected and sha != expected:
+                    logging.error(f"Téléchargement corrompu de {filename} : SHA {sha} au lieu de {expected}")
+                    return False
                 
-                # Sauvegarder le SHA pour la prochaine vérification
-                sha_url = f"https://api.github.com/repos/{self.github_repo}/contents/{filename}"
-                sha_response = requests.get(sha_url, timeout=10)
-                if sha_response.status_code == 200:
-                    sha_data = sha_response.json()
-                    with open(f".{filename}.sha", 'w') as f:
-                        f.write(sha_data["sha"])
+                # Sauvegarder le fichier (octets exacts, remplacement atomique)
+                tmp_path = f"{filename}.part"
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, filename)
+                
+                # Mémoriser le SHA pour la prochaine vérification
+                self.manifest.record(filename, sha)
                 
                 logging.info(f"Fichier {filename} mis à jour avec succès")
                 return True
@@ -158,24 +169,78 @@ class LiveUpdater:
         self.checker = None
         self.downloader = None
         
-        # Timer pour vérifications périodiques
+        # Timer des vérifications périodiques, réarmé à chaque fois selon le planning adaptatif
         self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.check_for_updates_silent)
+        self.update_timer.setSingleShot(True)
+        self.update_timer.timeout.connect(self.on_poll_timer)
+        self.base_interval_minutes = 5
+        self.push_healthy = False
+        self.next_delay = None      # Délai (s) choisi pour la prochaine vérification
+        self.next_reason = ""
+        self.next_check_at = None
         
     def start_live_updates(self, interval_minutes=5):
         """Démarrer les mises à jour automatiques périodiques"""
+        self.base_interval_minutes = interval_minutes
         # Vérification initiale
         self.check_for_updates_silent()
         
         # Vérifications périodiques
-        self.update_timer.start(interval_minutes * 60 * 1000)  # Convertir en millisecondes
-        logging.info(f"Mises à jour automatiques activées (vérification toutes les {interval_minutes} minutes)")
+        self.schedule_next_check()
+        logging.info(f"Mises à jour automatiques activées ({self.describe_schedule()})")
     
     def stop_live_updates(self):
         """Arrêter les mises à jour automatiques"""
         self.update_timer.stop()
+        self.next_check_at = None
         logging.info("Mises à jour automatiques désactivées")
     
+    def on_poll_timer(self):
+        self.check_for_updates_silent()
+        self.schedule_next_check()
+    
+    def set_push_healthy(self, healthy):
+        """État des notifications push (sonde du notifier) : change le rythme du polling"""
+        if healthy == self.push_healthy:
+            return
+        self.push_healthy = healthy
+        if self.next_check_at is not None:
+            self.schedule_next_check()
+            logging.info(f"Notifications push {'actives' if healthy else 'indisponibles'} : {self.describe_schedule()}")
+    
+    def compute_next_delay(self):
+        """Délai avant la prochaine vérification (s) et sa raison"""
+        if self.push_healthy:
+            minutes, reason = PUSH_HEALTHY_INTERVAL_MINUTES, "notifications push actives"
+        else:
+            minutes, reason = self.base_interval_minutes, "notifications push indisponibles"
+        delay = minutes * 60 * random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER)
+        quota = get_rate_limit()
+        if quota and quota["limit"] and quota["remaining"] < quota["limit"] * LOW_QUOTA_RATIO:
+            until_reset = quota["reset"] - time.time()
+            if until_reset > delay:
+                # Petite marge aléatoire : tous les clients ne repartent pas à la seconde de réinitialisation
+                delay = until_reset + random.uniform(0, 60)
+                reason = f"quota GitHub bas ({quota['remaining']}/{quota['limit']})"
+        return delay, reason
+    
+    def schedule_next_check(self):
+        self.next_delay, self.next_reason = self.compute_next_delay()
+        self.next_check_at = time.time() + self.next_delay
+        self.update_timer.start(int(self.next_delay * 1000))
+    
+    def describe_schedule(self):
+        """Rythme effectif du polling, pour le diagnostic"""
+        if self.next_check_at is None:
+            return "Vérification du code : désactivée"
+        remaining = max(0, self.next_check_at - time.time())
+        text = (f"Vérification du code : ~{3600 / self.next_delay:.1f}/h ({self.next_reason}), "
+                f"prochaine dans {remaining / 60:.0f} min")
+        quota = get_rate_limit()
+        if quota:
+            text += f" ; quota GitHub {quota['remaining']}/{quota['limit']}"
+        return text
+    
     def check_for_updates_silent(self):
         """Vérifier les mises à jour en mode silencieux"""
         if self.checker and self.checker.isRunning():
@@ -260,15 +325,20 @@ class LiveUpdater:
         self.downloader.start()
     
     def on_download_finished(self, downloaded_files, silent):
-        """Téléchargement terminé"""
+        """Téléchargement terminé : application à chaud, redémarrage seulement si nécessaire"""
+        result = apply_updates(downloaded_files, self.parent)
+        logging.info(result.summary())
         if not silent:
-            QMessageBox.information(
-                self.parent,
-                "Mise à jour terminée",
+            message = (
                 f"✅ {len(downloaded_files)} fichier(s) mis à jour:\n\n" +
-                "\n".join([f"• {f}" for f in downloaded_files]) +
-                "\n\n🔄 Redémarrez l'application pour appliquer les changements."
+                "\n".join([f"• {f}" for f in downloaded_files])
             )
+            if result.restart_required:
+                message += "\n\n🔄 Redémarrez l'application pour appliquer les changements de " + \
+                    ", ".join(result.restart_required) + "."
+            else:
+                message += "\n\n⚡ Changements appliqués sans redémarrage."
+            QMessageBox.information(self.parent, "Mise à jour terminée", message)
         else:
             # Notification discrète dans les logs
             logging.info(f"Mise à jour automatique: {len(downloaded_files)} fichier(s) mis à jour")
@@ -292,11 +362,12 @@ class LiveUpdater:
             logging.error(f"Erreur de mise à jour automatique: {error_message}")
 
 # Fonction utilitaire pour intégrer facilement dans l'application principale
-def setup_live_updater(main_window, version="1.0.0", auto_check_minutes=5):
+def setup_live_updater(main_window, version="1.0.0", auto_check_minutes=5, start=True):
     """Configure le système de mise à jour en temps réel"""
     updater = LiveUpdater(main_window, version)
     
     # Démarrer les mises à jour automatiques
-    updater.start_live_updates(auto_check_minutes)
+    if start:
+        updater.start_live_updates(auto_check_minutes)
     
     return updater
\ No newline at end of file
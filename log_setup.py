@@ -0,0 +1,117 @@
+"""
+Journalisation asynchrone de Retrosoft
+Les threads (GUI compris) déposent les enregistrements dans une file ;
+un thread dédié les écrit avec rotation par taille et par durée
+"""
+
+import atexit
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import time
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_listener = None
+
+
+class SizeAndTimeRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotation dès que le fichier dépasse max_bytes ou qu'il a plus de interval_s secondes"""
+
+    def __init__(self, filename, max_bytes=0, backup_count=5, interval_s=0, compress=False, encoding="utf-8"):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding=encoding, delay=True)
+        self.interval_s = interval_s
+        try:
+            opened_at = os.path.getmtime(filename)
+        except OSError:
+            opened_at = time.time()
+        self.rollover_at = opened_at + interval_s if interval_s else None
+        if compress:
+            self.namer = lambda name: name + ".gz"
+            self.rotator = _gzip_rotator
+
+    def shouldRollover(self, record):
+        if self.rollover_at is not None and record.created >= self.rollover_at:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        if self.interval_s:
+            self.rollover_at = time.time() + self.interval_s
+
+
+class _LightQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler qui ne formate que le message côté appelant (le reste dans le thread d'écriture)"""
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _gzip_rotator(source, dest):
+    # Exécuté par le thread d'écriture : la compression ne bloque jamais l'interface
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Un objet JSON par ligne, lisible par les outils de diagnostic sans expression régulière"""
+
+    def format(self, record):
+        entry = {
+            "ts": record.created,
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging(log_path="browser_log.txt", level=logging.DEBUG, max_bytes=5 * 1024 * 1024,
+                  backup_count=5, rotate_hours=24, compress=False, json_lines=False):
+    """Configure le logger racine : QueueHandler côté appelant, écriture dans un thread dédié"""
+    global _listener
+    if _listener is not None:
+        return _listener
+    handlers = []
+    text_handler = SizeAndTimeRotatingFileHandler(
+        log_path, max_bytes, backup_count, int(rotate_hours * 3600), compress)
+    text_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    handlers.append(text_handler)
+    if json_lines:
+        json_path = os.path.splitext(log_path)[0] + ".jsonl"
+        json_handler = SizeAndTimeRotatingFileHandler(
+            json_path, max_bytes, backup_count, int(rotate_hours * 3600), compress)
+        json_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(json_handler)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_LightQueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    # Vide la file avant la fin du processus
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,145 @@
+"""
+Lecture incrémentale des fichiers de log de Retrosoft
+Ne lit que la fin du fichier ou les octets ajoutés depuis la dernière lecture
+"""
+
+import logging
+import os
+import threading
+from PyQt6.QtCore import QObject, QTimer, QFileSystemWatcher, pyqtSignal
+
+# (chemin, paramètre) -> (mtime, taille, résultat) : évite de relire un fichier inchangé
+_tail_cache = {}
+_tail_cache_lock = threading.Lock()
+
+
+def _cached(path, key, compute):
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _tail_cache_lock:
+        cached = _tail_cache.get((path, key))
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    result = compute(st.st_size)
+    with _tail_cache_lock:
+        _tail_cache[(path, key)] = (stamp, result)
+    return result
+
+
+def _read_backwards(f, size, block_size, enough):
+    """Lit le fichier par blocs depuis la fin jusqu'à ce que enough(données) soit vrai"""
+    pos = size
+    data = b""
+    while pos > 0 and not enough(data):
+        step = min(block_size, pos)
+        pos -= step
+        f.seek(pos)
+        data = f.read(step) + data
+    return data, pos
+
+
+def tail_lines(path, n=10, block_size=8192):
+    """Retourne les n dernières lignes du fichier (liste vide s'il n'existe pas)"""
+    def compute(size):
+        with open(path, "rb") as f:
+            data, _ = _read_backwards(f, size, block_size, lambda d: d.count(b"\n") > n)
+        return [l.decode("utf-8", errors="replace") for l in data.splitlines()[-n:]]
+    try:
+        return list(_cached(path, ("lines", n), compute))
+    except OSError:
+        return []
+
+
+def tail_text(path, max_chars=10000, block_size=8192):
+    """Retourne au plus les max_chars derniers caractères du fichier"""
+    def compute(size):
+        with open(path, "rb") as f:
+            # 4 octets maximum par caractère en UTF-8
+            data, _ = _read_backwards(f, size, block_size, lambda d: len(d) >= max_chars * 4)
+        return data.decode("utf-8", errors="replace")[-max_chars:]
+    try:
+        return _cached(path, ("text", max_chars), compute)
+    except OSError:
+        return ""
+
+
+def find_last_line(path, marker, n=10):
+    """Dernière ligne contenant marker parmi les n dernières lignes, ou None"""
+    return next((l for l in reversed(tail_lines(path, n)) if marker in l), None)
+
+
+class LogTailer(QObject):
+    """Suit un fichier de log par offset ; notifié par QFileSystemWatcher (inotify sous Linux)
+    avec un sondage stat() en secours"""
+
+    lines_appended = pyqtSignal(list)  # nouvelles lignes complètes
+    reset = pyqtSignal()               # fichier tronqué ou remplacé
+
+    def __init__(self, path, parent=None, initial_bytes=65536, poll_ms=1500, watched_poll_ms=5000):
+        super().__init__(parent)
+        self.path = path
+        self.initial_bytes = initial_bytes
+        self.offset = None
+        self._inode = None
+        self._partial = b""
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self.poll)
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.poll)
+        self._poll_ms = poll_ms
+        self._watched_poll_ms = watched_poll_ms
+
+    def start(self):
+        self.poll()
+        self._timer.start(self._watched_poll_ms if self._watch() else self._poll_ms)
+
+    def stop(self):
+        self._timer.stop()
+        if self._watcher.files():
+            self._watcher.removePaths(self._watcher.files())
+
+    def _watch(self):
+        """Surveille le fichier ; retourne False si la notification système est indisponible"""
+        if self.path in self._watcher.files():
+            return True
+        return os.path.exists(self.path) and self._watcher.addPath(self.path)
+
+    def poll(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return
+        watched = self._watch()
+        if self._timer.isActive():
+            self._timer.setInterval(self._watched_poll_ms if watched else self._poll_ms)
+        if self.offset is None:
+            # Première lecture : seulement la fin du fichier
+            self.offset = max(0, st.st_size - self.initial_bytes)
+            self._inode = st.st_ino
+            skip_partial_line = self.offset > 0
+        else:
+            skip_partial_line = False
+            if st.st_size < self.offset or (st.st_ino and self._inode and st.st_ino != self._inode):
+                # Rotation ou troncature : on repart du début
+                self.offset = 0
+                self._inode = st.st_ino
+                self._partial = b""
+                self.reset.emit()
+        if st.st_size == self.offset:
+            return
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                data = f.read(st.st_size - self.offset)
+        except OSError as e:
+            logging.debug(f"Lecture de {self.path} impossible : {e}")
+            return
+        self.offset += len(data)
+        data = self._partial + data
+        chunks = data.split(b"\n")
+        self._partial = chunks.pop()
+        if skip_partial_line and chunks:
+            chunks.pop(0)
+        lines = [c.rstrip(b"\r").decode("utf-8", errors="replace") for c in chunks]
+        if lines:
+            self.lines_appended.emit(lines)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Outil de release : patchs binaires entre deux versions de Retrosoft
+
+Créer un patch à publier comme asset de la release vY :
+    python make_delta.py create ancien.exe nouveau.exe --from 2.0.0 --to 2.1.0
+Mesurer l'économie de bande passante sur les releases publiées :
+    python make_delta.py measure --repo qjslk/navigateur-rapide --pairs 5
+
+numpy (facultatif, poste de release uniquement) vectorise le calcul des sommes glissantes.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import requests
+
+from delta_update import apply_delta, create_delta, delta_asset_name
+from github_api import get_api_base
+
+
+def cmd_create(args):
+    with open(args.old, "rb") as f:
+        old = f.read()
+    with open(args.new, "rb") as f:
+        new = f.read()
+    start = time.perf_counter()
+    delta = create_delta(old, new, args.block_size)
+    elapsed = time.perf_counter() - start
+    output = args.output or delta_asset_name(args.from_version, args.to_version)
+    with open(output, "wb") as f:
+        f.write(delta)
+    # Vérification immédiate : le patch doit reconstruire exactement le nouveau fichier
+    with tempfile.TemporaryDirectory() as tmp:
+        apply_delta(args.old, output, os.path.join(tmp, "check"))
+    print(f"{output} : {len(delta)} octets pour {len(new)} ({100 * (1 - len(delta) / len(new)):.1f} % économisés), "
+          f"créé en {elapsed:.1f} s")
+
+
+def _download(url, path):
+    with requests.get(url, stream=True, timeout=(10, 60)) as response:
+        response.raise_for_status()
+        with open(path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                f.write(chunk)
+    return path
+
+
+def cmd_measure(args):
+    response = requests.get(f"{get_api_base()}/repos/{args.repo}/releases",
+                            params={"per_page": args.pairs + 1}, timeout=10)
+    response.raise_for_status()
+    releases = []
+    for release in response.json():
+        asset = next((a for a in release.get("assets", []) if a["name"].endswith(args.asset_suffix)), None)
+        if asset:
+            releases.append((release["tag_name"], asset))
+    # Les releases arrivent de la plus récente à la plus ancienne
+    releases.reverse()
+    if len(releases) < 2:
+        print("Pas assez de releases avec un asset à comparer")
+        return 1
+    print(f"{'paire':<24} {'complet':>12} {'delta':>12} {'économie':>9}")
+    total_full = total_delta = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for (old_tag, old_asset), (new_tag, new_asset) in zip(releases, releases[1:]):
+            old_path = _download(old_asset["browser_download_url"], os.path.join(tmp, "old"))
+            new_path = _download(new_asset["browser_download_url"], os.path.join(tmp, "new"))
+            with open(old_path, "rb") as f:
+                old = f.read()
+            with open(new_path, "rb") as f:
+                new = f.read()
+            delta = create_delta(old, new, args.block_size)
+            total_full += len(new)
+            total_delta += len(delta)
+            print(f"{old_tag + ' → ' + new_tag:<24} {len(new):12d} {len(delta):12d} "
+                  f"{100 * (1 - len(delta) / len(new)):8.1f}%")
+    print(f"{'total':<24} {total_full:12d} {total_delta:12d} {100 * (1 - total_delta / total_full):8.1f}%")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--block-size", type=int, default=4096)
+    sub = parser.add_subparsers(dest="command", required=True)
+    create = sub.add_parser("create", help="créer un patch entre deux fichiers")
+    create.add_argument("old")
+    create.add_argument("new")
+    create.add_argument("--from", dest="from_version", required=True)
+    create.add_argument("--to", dest="to_version", required=True)
+    create.add_argument("-o", "--output")
+    measure = sub.add_parser("measure", help="mesurer l'économie sur les releases publiées")
+    measure.add_argument("--repo", default="qjslk/navigateur-rapide")
+    measure.add_argument("--pairs", type=int, default=5)
+    measure.add_argument("--asset-suffix", default=".exe")
+    args = parser.parse_args()
+    if args.command == "create":
+        cmd_create(args)
+        return 0
+    return cmd_measure(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
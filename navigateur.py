@@ -1,7 +1,10 @@
 # /chemin/vers/votre/projet/mon_navigateur.py
+import time
+_STARTUP_T0 = time.time()
 import sys
 import logging
 import os
+import json
 import subprocess
 import winreg
 from PyQt6.QtCore import QUrl, QSize, Qt
@@ -29,36 +32,50 @@ from PyQt6.QtWidgets import (
     QTextEdit,
     QInputDialog,
 )
-from PyQt6.QtWebEngineWidgets import QWebEngineView
-from PyQt6.QtGui import QIcon, QAction, QCloseEvent
+from PyQt6.QtGui import QIcon, QAction, QCloseEvent, QKeySequence
 from updater import setup_auto_updater
-from live_updater import setup_live_updater
+from live_updater import setup_live_updater, push_events
 from version import get_version, get_app_info, get_github_repo_url, CONFIG_FILE, DEFAULT_REPO
 from typing import TYPE_CHECKING, Optional
 from telemetry_client import start_telemetry_client
-import pyperclip
-import pyautogui
-import cv2
-from pyzbar.pyzbar import decode as decode_qr
-import pyttsx3
-import psutil
-from plyer import notification
-import pandas as pd
-import humanize
-from bs4 import BeautifulSoup
-import bs4
+from lazy_imports import LazyModule, prewarm, import_timings
 import io
 import datetime
-import rich
-from rich.console import Console
+
+# Dépendances lourdes des outils de la sidebar : chargées à la première utilisation
+pyperclip = LazyModule("pyperclip")
+pyautogui = LazyModule("pyautogui")
+cv2 = LazyModule("cv2")
+pyzbar = LazyModule("pyzbar.pyzbar")
+pyttsx3 = LazyModule("pyttsx3")
+psutil = LazyModule("psutil")
+plyer = LazyModule("plyer")
+pd = LazyModule("pandas")
+bs4 = LazyModule("bs4")
 from PyQt6.QtWidgets import QDialog, QVBoxLayout, QTextEdit, QPushButton
-from service_monitor import start_monitor, get_status_report
+from service_monitor import supervisor, get_status_report
+from startup_trace import tracer, traced
+from boot_scheduler import scheduler, IDLE, PRIORITY_HIGH, PRIORITY_LOW
+from log_setup import setup_logging
+import status_probes
+from status_probes import StatusProbeEngine
+from config_store import store as config_store
+from tab_manager import TabManager
+import web_profile
 
-# Configuration basique du journal (enregistre dans un fichier)
-logging.basicConfig(filename='browser_log.txt', level=logging.DEBUG, 
-                    format='%(asctime)s - %(levelname)s - %(message)s')
+# Configuration du journal : écriture asynchrone avec rotation (voir log_setup)
+setup_logging(
+    'browser_log.txt',
+    level=getattr(logging, config_store.get_str("log_level", "DEBUG").upper(), logging.DEBUG),
+    max_bytes=config_store.get_int("log_max_bytes", 5 * 1024 * 1024),
+    backup_count=config_store.get_int("log_backup_count", 5),
+    rotate_hours=config_store.get_float("log_rotate_hours", 24),
+    compress=config_store.get_bool("log_compress", False),
+    json_lines=config_store.get_bool("log_json", False),
+)
 
 logging.info("Demarrage de l'application")
+_IMPORTS_DONE = time.time()
 
 
 class SettingsDialog(QDialog):
@@ -70,8 +87,6 @@ class SettingsDialog(QDialog):
         self.setWindowTitle("⚙️ Paramètres - Retrosoft")
         self.setFixedSize(500, 400)
         self.setWindowIcon(QIcon("icons/browser.svg"))
-        import json, os
-        self.config_path = os.path.join(os.path.dirname(__file__), "config.json")
         self.config = self.load_config()
         # Layout principal
         layout = QVBoxLayout()
@@ -86,6 +101,9 @@ class SettingsDialog(QDialog):
         # Onglet Avancé
         advanced_tab = self.create_advanced_tab()
         tabs.addTab(advanced_tab, "🛠️ Avancé")
+        # Onglet Cache web
+        cache_tab = self.create_cache_tab()
+        tabs.addTab(cache_tab, "🗄️ Cache")
         # Onglet À propos
         about_tab = self.create_about_tab()
         tabs.addTab(about_tab, "ℹ️ À propos")
@@ -101,16 +119,11 @@ class SettingsDialog(QDialog):
         self.setLayout(layout)
 
     def load_config(self):
-        try:
-            with open(self.config_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return {}
+        return config_store.snapshot()
 
     def save_config(self):
-        import json
-        with open(self.config_path, "w", encoding="utf-8") as f:
-            json.dump(self.config, f, indent=2)
+        # Appliqué tout de suite aux abonnés ; écriture atomique et différée du fichier
+        config_store.update(self.config)
 
     def create_general_tab(self):
         """Crée l'onglet des paramètres généraux"""
@@ -333,6 +346,52 @@ class SettingsDialog(QDialog):
         widget.setLayout(layout)
         return widget
 
+    def create_cache_tab(self):
+        """Crée l'onglet du profil web (cache HTTP sur disque, cookies)"""
+        widget = QWidget()
+        layout = QVBoxLayout()
+        cache_group = QGroupBox("🗄️ Cache HTTP sur disque")
+        cache_layout = QFormLayout()
+        self.cb_persistent_profile = QCheckBox("Profil persistant (cache et cookies entre deux lancements)")
+        self.cb_persistent_profile.setChecked(self.config.get("web_profile_persistent", True))
+        cache_layout.addRow(self.cb_persistent_profile)
+        self.cache_size_spin = QSpinBox()
+        self.cache_size_spin.setRange(0, 10240)
+        self.cache_size_spin.setSuffix(" Mo")
+        self.cache_size_spin.setSpecialValueText("Automatique")
+        self.cache_size_spin.setValue(int(self.config.get("cache_size_mb", web_profile.CACHE_SIZE_MB)))
+        cache_layout.addRow("Taille maximale:", self.cache_size_spin)
+        self.cache_dir_edit = QLineEdit(self.config.get("cache_dir", web_profile.CACHE_DIR))
+        self.cache_dir_edit.setPlaceholderText("Dossier du profil")
+        cache_layout.addRow("Emplacement:", self.cache_dir_edit)
+        self.cb_persistent_cookies = QCheckBox("Conserver les cookies")
+        self.cb_persistent_cookies.setChecked(self.config.get("persistent_cookies", True))
+        cache_layout.addRow(self.cb_persistent_cookies)
+        cache_group.setLayout(cache_layout)
+        layout.addWidget(cache_group)
+        # Actions
+        actions_layout = QHBoxLayout()
+        stats_btn = QPushButton("Statistiques du cache")
+        stats_btn.clicked.connect(self.show_cache_stats)
+        clear_btn = QPushButton("Vider le cache")
+        clear_btn.clicked.connect(self.clear_web_cache)
+        actions_layout.addWidget(stats_btn)
+        actions_layout.addWidget(clear_btn)
+        layout.addLayout(actions_layout)
+        layout.addWidget(QLabel("Le changement de profil persistant s'applique au prochain démarrage."))
+        layout.addStretch()
+        widget.setLayout(layout)
+        return widget
+
+    def show_cache_stats(self):
+        from PyQt6.QtWidgets import QMessageBox
+        QMessageBox.information(self, "Cache web", web_profile.describe_cache())
+
+    def clear_web_cache(self):
+        from PyQt6.QtWidgets import QMessageBox
+        web_profile.clear_cache()
+        QMessageBox.information(self, "Cache web", "Le cache HTTP a été vidé (les cookies sont conservés).")
+
     def create_about_tab(self):
         """Crée l'onglet À propos"""
         widget = QWidget()
@@ -579,8 +638,8 @@ visitez notre repository GitHub.
         import os
         log_path = os.path.join(os.path.dirname(__file__), "browser_log.txt")
         if os.path.exists(log_path):
-            with open(log_path, "r", encoding="utf-8") as f:
-                text.setText(f.read()[-10000:])
+            from log_tail import tail_text
+            text.setText(tail_text(log_path, 10000))
         else:
             text.setText("Aucun log trouvé.")
         layout.addWidget(text)
@@ -598,7 +657,6 @@ visitez notre repository GitHub.
         import os
         histo_path = os.path.join(os.path.dirname(__file__), "update_history.json")
         if os.path.exists(histo_path):
-            import pandas as pd
             try:
                 df = pd.read_json(histo_path)
                 text.setText(df.to_string())
@@ -618,39 +676,115 @@ visitez notre repository GitHub.
         self.config["telemetry_enabled"] = self.cb_telemetry.isChecked()
         self.config["sync_enabled"] = self.cb_sync.isChecked()
         self.config["notify_enabled"] = self.cb_notify.isChecked()
+        # Profil web
+        self.config["web_profile_persistent"] = self.cb_persistent_profile.isChecked()
+        self.config["cache_size_mb"] = self.cache_size_spin.value()
+        self.config["cache_dir"] = self.cache_dir_edit.text().strip()
+        self.config["persistent_cookies"] = self.cb_persistent_cookies.isChecked()
         self.save_config()
         self.accept()
 
 
 class LogViewerDialog(QDialog):
+    LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+    MAX_LINES = 5000
+
     def __init__(self, parent=None, log_path="browser_log.txt"):
         super().__init__(parent)
         self.setWindowTitle("Console Live - Logs Retrosoft")
         self.resize(900, 600)
         layout = QVBoxLayout()
-        self.text = QTextEdit()
+        # Filtres et pause
+        filters = QHBoxLayout()
+        self.level_combo = QComboBox()
+        self.level_combo.addItems(["Tous niveaux"] + self.LEVELS[1:])
+        self.level_combo.currentIndexChanged.connect(self.rebuild_view)
+        filters.addWidget(self.level_combo)
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filtrer...")
+        self.filter_edit.textChanged.connect(self.rebuild_view)
+        filters.addWidget(self.filter_edit)
+        self.pause_btn = QPushButton("⏸ Pause")
+        self.pause_btn.setCheckable(True)
+        self.pause_btn.toggled.connect(self.toggle_pause)
+        filters.addWidget(self.pause_btn)
+        layout.addLayout(filters)
+        from PyQt6.QtWidgets import QPlainTextEdit
+        self.text = QPlainTextEdit()
         self.text.setReadOnly(True)
+        self.text.setMaximumBlockCount(self.MAX_LINES)
         layout.addWidget(self.text)
         self.setLayout(layout)
         self.log_path = log_path
-        from PyQt6.QtCore import QTimer
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.refresh_log)
-        self.timer.start(1500)
-        self.refresh_log()
-    def refresh_log(self):
-        import os
-        if os.path.exists(self.log_path):
-            with open(self.log_path, "r", encoding="utf-8") as f:
-                self.text.setText(f.read()[-20000:])
-        else:
-            self.text.setText("Aucun log trouvé.")
+        # Lignes récentes (niveau, texte) pour refiltrer sans relire le fichier
+        from collections import deque
+        self.lines = deque(maxlen=self.MAX_LINES)
+        self._last_level = "INFO"
+        from log_tail import LogTailer
+        self.tailer = LogTailer(log_path, self)
+        self.tailer.lines_appended.connect(self.on_lines_appended)
+        self.tailer.reset.connect(self.on_log_reset)
+        if not os.path.exists(log_path):
+            self.text.setPlainText("Aucun log trouvé.")
+        self.tailer.start()
+
+    def parse_level(self, line):
+        """Niveau d'une ligne 'date - NIVEAU - message' ; les suites (traceback) héritent du précédent"""
+        parts = line.split(" - ", 2)
+        if len(parts) == 3 and parts[1] in self.LEVELS:
+            self._last_level = parts[1]
+        return self._last_level
+
+    def accepts(self, level, line):
+        min_index = self.level_combo.currentIndex()
+        if min_index and self.LEVELS.index(level) < min_index:
+            return False
+        needle = self.filter_edit.text()
+        return not needle or needle.lower() in line.lower()
+
+    def on_lines_appended(self, lines):
+        entries = [(self.parse_level(line), line) for line in lines]
+        self.lines.extend(entries)
+        if self.pause_btn.isChecked():
+            return
+        visible = [line for level, line in entries if self.accepts(level, line)]
+        if visible:
+            self.append_lines(visible)
+
+    def append_lines(self, lines):
+        """Ajoute en bas sans perdre la position de lecture si l'utilisateur a défilé"""
+        bar = self.text.verticalScrollBar()
+        at_bottom = bar.value() >= bar.maximum() - 2
+        position = bar.value()
+        self.text.appendPlainText("\n".join(lines))
+        bar.setValue(bar.maximum() if at_bottom else position)
+
+    def rebuild_view(self, *_):
+        if self.pause_btn.isChecked():
+            return
+        self.text.setPlainText("\n".join(line for level, line in self.lines if self.accepts(level, line)))
+        bar = self.text.verticalScrollBar()
+        bar.setValue(bar.maximum())
+
+    def toggle_pause(self, paused):
+        self.pause_btn.setText("▶ Reprendre" if paused else "⏸ Pause")
+        if not paused:
+            self.rebuild_view()
+
+    def on_log_reset(self):
+        self.lines.clear()
+        self.text.clear()
+
+    def done(self, result):
+        self.tailer.stop()
+        super().done(result)
 
 class MainWindow(QMainWindow):
+    @traced("MainWindow.__init__")
     def __init__(self, *args, **kwargs):
         super(MainWindow, self).__init__(*args, **kwargs)
         # --- Définir la page d'accueil locale ---
-        logging.info("Definition de la page d'accueil")
+        tracer.phase("Definition de la page d'accueil")
         # Recherche robuste de accueil.html
         possible_paths = []
         if getattr(sys, 'frozen', False):
@@ -675,22 +809,25 @@ class MainWindow(QMainWindow):
         self.setWindowIcon(QIcon("icons/browser.svg")) # On utilise notre nouvelle icône SVG
         self.resize(1200, 800)
 
-        logging.info("Creation de la vue web")
-        # --- Vue Web ---
-        self.browser = QWebEngineView()
+        tracer.phase("Creation de la vue web")
+        # --- Onglets (les onglets en arrière-plan sont gelés puis abandonnés, voir tab_manager) ---
+        # Profil persistant : cache HTTP et cookies conservés d'un lancement à l'autre
+        self.tabs = TabManager(self.home_page_url, web_profile.get_profile())
         
         # Vérifier si une URL a été passée en argument
+        first_url = None
         if len(sys.argv) > 1:
             url_arg = sys.argv[1]
             if url_arg.startswith(('http://', 'https://')):
-                self.browser.setUrl(QUrl(url_arg))
+                first_url = QUrl(url_arg)
                 logging.info(f"URL passée en argument : {url_arg}")
-            else:
-                self.browser.setUrl(self.home_page_url)
-        else:
-            self.browser.setUrl(self.home_page_url)
+        self._first_view = self.tabs.new_tab(first_url)
+        # Préchargement des outils lourds une fois la première page affichée
+        self._first_view.loadFinished.connect(self._on_first_load_finished)
+        # Les services différés démarrent après le premier affichage
+        scheduler.attach(self._first_view)
 
-        logging.info("Creation de la barre d'outils")
+        tracer.phase("Creation de la barre d'outils")
         # --- Barre d'outils de navigation ---
         nav_toolbar = QToolBar("Navigation")
         nav_toolbar.setIconSize(QSize(24, 24))
@@ -699,21 +836,34 @@ class MainWindow(QMainWindow):
         # Bouton Précédent
         back_btn = QAction(QIcon.fromTheme("go-previous"), "Précédent", self)
         back_btn.setStatusTip("Aller à la page précédente")
-        back_btn.triggered.connect(self.browser.back)
+        back_btn.triggered.connect(lambda: self.browser.back())
         nav_toolbar.addAction(back_btn)
 
         # Bouton Suivant
         next_btn = QAction(QIcon.fromTheme("go-next"), "Suivant", self)
         next_btn.setStatusTip("Aller à la page suivante")
-        next_btn.triggered.connect(self.browser.forward)
+        next_btn.triggered.connect(lambda: self.browser.forward())
         nav_toolbar.addAction(next_btn)
 
         # Bouton Recharger
         reload_btn = QAction(QIcon.fromTheme("view-refresh"), "Recharger", self)
         reload_btn.setStatusTip("Recharger la page")
-        reload_btn.triggered.connect(self.browser.reload)
+        reload_btn.triggered.connect(lambda: self.browser.reload())
         nav_toolbar.addAction(reload_btn)
 
+        # Bouton Nouvel onglet
+        new_tab_btn = QAction(QIcon.fromTheme("tab-new"), "Nouvel onglet", self)
+        new_tab_btn.setStatusTip("Ouvrir un nouvel onglet")
+        new_tab_btn.setShortcut(QKeySequence.StandardKey.AddTab)
+        new_tab_btn.triggered.connect(lambda: self.tabs.new_tab())
+        nav_toolbar.addAction(new_tab_btn)
+
+        # Fermer l'onglet courant (raccourci seulement)
+        close_tab_action = QAction("Fermer l'onglet", self)
+        close_tab_action.setShortcut(QKeySequence.StandardKey.Close)
+        close_tab_action.triggered.connect(self.tabs.close_current_tab)
+        self.addAction(close_tab_action)
+
         # Bouton Accueil
         home_btn = QAction(QIcon.fromTheme("go-home"), "Accueil", self)
         home_btn.setStatusTip("Aller à la page d'accueil")
@@ -739,16 +889,16 @@ class MainWindow(QMainWindow):
 
         nav_toolbar.addSeparator()
 
-        logging.info("Creation de la barre d'adresse")
+        tracer.phase("Creation de la barre d'adresse")
         # --- Barre d'adresse ---
         self.url_bar = QLineEdit()
         self.url_bar.returnPressed.connect(self.navigate_to_url) # Naviguer avec la touche Entrée
         nav_toolbar.addWidget(self.url_bar)
 
-        # Mettre à jour la barre d'adresse quand l'URL change
-        self.browser.urlChanged.connect(self.update_url_bar)
+        # Mettre à jour la barre d'adresse quand l'URL de l'onglet courant change
+        self.tabs.current_url_changed.connect(self.update_url_bar)
         
-        logging.info("Creation de la barre de statut")
+        tracer.phase("Creation de la barre de statut")
         # --- Barre de statut ---
         self.status = QStatusBar(self)
         self.setStatusBar(self.status)
@@ -761,36 +911,51 @@ class MainWindow(QMainWindow):
         self.status.addPermanentWidget(self.status_sync)
         self.status.addPermanentWidget(self.status_notify)
         self.status.addPermanentWidget(self.status_telemetry)
-        # Timer de rafraîchissement
-        from PyQt6.QtCore import QTimer
-        self.status_timer = QTimer(self)
-        self.status_timer.timeout.connect(self.refresh_status_indicators)
-        self.status_timer.start(10000)  # 10 secondes
-        self.refresh_status_indicators()
+        # Sondes d'état en arrière-plan (intervalle adaptatif à partir de 10 secondes)
+        self.status_probes = StatusProbeEngine(self)
+        self.status_probes.add_probe("conn", status_probes.probe_internet)
+        self.status_probes.add_probe("sync", lambda: status_probes.probe_log_marker(
+            "auto_sync.log", "Synchronisation terminée"), max_interval=30)
+        self.status_probes.add_probe("notify", lambda: status_probes.probe_websocket(
+            config_store.get_str("notifier_url") or "ws://localhost:8000/ws"))
+        self.status_probes.add_probe("telemetry", lambda: status_probes.probe_log_marker(
+            "telemetry.log", "Télémétrie envoyée"), max_interval=30)
+        self.status_probes.state_changed.connect(self.on_status_changed)
+        self.status_probes.start()
         
-        logging.info("Creation de la sidebar")
+        tracer.phase("Creation de la sidebar")
         # --- Sidebar ---
         self.create_sidebar()
         
         # --- Layout principal avec splitter ---
         self.splitter = QSplitter(Qt.Orientation.Horizontal)
         self.splitter.addWidget(self.sidebar)
-        self.splitter.addWidget(self.browser)
+        self.splitter.addWidget(self.tabs)
         
-        # Définir les tailles initiales (sidebar 200px, browser le reste)
+        # Définir les tailles initiales (sidebar 200px, onglets le reste)
         self.splitter.setSizes([200, 1000])
         
         # --- Affichage ---
         self.setCentralWidget(self.splitter)
+        tracer.end_phase()
         
-        # --- Système de mise à jour automatique ---
-        self.updater = setup_auto_updater(self, version=get_version())
+        # --- Système de mise à jour automatique (vérification après le premier affichage) ---
+        with tracer.span("setup_auto_updater"):
+            self.updater = setup_auto_updater(self, version=get_version(), check_now=False)
+        scheduler.add("auto_updater", lambda: self.updater.check_for_updates(silent=True))
         
         # --- Système de mise à jour en temps réel ---
-        self.live_updater = setup_live_updater(self, version=get_version(), auto_check_minutes=2)
+        with tracer.span("setup_live_updater"):
+            self.live_updater = setup_live_updater(self, version=get_version(), auto_check_minutes=2, start=False)
+        scheduler.add("live_updater", lambda: self.live_updater.start_live_updates(2))
+        # Fichiers reçus par notification push : même traitement que ceux du polling
+        push_events.files_downloaded.connect(self.on_files_downloaded)
+        # Santé du push : connexion réelle du client de notifications (rythme du polling)
+        push_events.connection_changed.connect(self.on_push_connection_changed)
         logging.info("Système de mise à jour en temps réel activé (vérification toutes les 2 minutes)")
         # --- Vérification et synchronisation automatique des fichiers au démarrage ---
-        self.check_and_update_files()
+        scheduler.add("check_and_update_files", self.check_and_update_files,
+                      priority=PRIORITY_LOW, after=["live_updater"], stage=IDLE)
 
     def create_sidebar(self):
         """Crée la sidebar avec des boutons utiles."""
@@ -982,6 +1147,21 @@ class MainWindow(QMainWindow):
         
         self.sidebar.setLayout(layout)
     
+    def _on_first_load_finished(self, ok):
+        """Première page affichée : précharge les outils de la sidebar en arrière-plan"""
+        self._first_view.loadFinished.disconnect(self._on_first_load_finished)
+        tracer.mark("first_load_finished", ok=ok)
+        tracer.metadata["version"] = get_version()
+        tracer.write()
+        if config_store.get_bool("prewarm_tools", True):
+            from PyQt6.QtCore import QTimer
+            QTimer.singleShot(1000, prewarm)
+
+    @property
+    def browser(self):
+        """Vue de l'onglet courant"""
+        return self.tabs.current_view()
+
     def navigate_to_site(self, url):
         """Navigue vers un site spécifique."""
         self.browser.setUrl(QUrl(url))
@@ -1020,6 +1200,8 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event: QCloseEvent):
         logging.info("Fermeture de l'application")
+        self.status_probes.stop()
+        tracer.write()
         event.accept()
 
 
@@ -1035,8 +1217,10 @@ class MainWindow(QMainWindow):
         QMessageBox.information(self, "Historique", "Fonctionnalité d'historique à venir !")
 
     def check_and_update_files(self):
-        from live_updater import LiveUpdateChecker, LiveFileDownloader
+        from live_updater import LiveUpdateChecker
         self._checker = LiveUpdateChecker()
+        # Le span couvre la vérification elle-même (thread), jusqu'à la fin du QThread
+        self._checker.finished.connect(tracer.begin("check_and_update_files"))
         self._checker.files_updated.connect(self.on_files_need_update)
         self._checker.no_update.connect(lambda: self._show_status_message("Tous les fichiers sont à jour.", 5000))
         self._checker.error_occurred.connect(lambda msg: self._show_status_message(f"Erreur MAJ : {msg}", 8000))
@@ -1044,8 +1228,7 @@ class MainWindow(QMainWindow):
 
     def show_notification(self, title, message, timeout=5):
         try:
-            from plyer import notification
-            notification.notify(title=title, message=message, timeout=timeout)
+            plyer.notification.notify(title=title, message=message, timeout=timeout)
         except Exception:
             from PyQt6.QtWidgets import QMessageBox
             QMessageBox.information(self, title, message)
@@ -1054,10 +1237,20 @@ class MainWindow(QMainWindow):
     def on_files_need_update(self, files):
         from live_updater import LiveFileDownloader
         self._downloader = LiveFileDownloader(files)
-        self._downloader.download_finished.connect(lambda files: (self._show_status_message(f"Mise à jour appliquée : {', '.join(files)}", 8000), self.show_notification("Mise à jour", f"Fichiers mis à jour : {', '.join(files)}")))
+        self._downloader.download_finished.connect(self.on_files_downloaded)
         self._downloader.error_occurred.connect(lambda msg: (self._show_status_message(f"Erreur MAJ : {msg}", 8000), self.show_notification("Erreur MAJ", msg)))
         self._downloader.start()
 
+    def on_files_downloaded(self, files):
+        """Applique à chaud les fichiers téléchargés ; redémarrage seulement pour navigateur.py"""
+        from hot_reload import apply_updates
+        result = apply_updates(files, self)
+        self._show_status_message(result.summary(), 8000)
+        if result.restart_required:
+            self.show_notification("Mise à jour", f"Redémarrez Retrosoft pour appliquer : {', '.join(result.restart_required)}")
+        else:
+            self.show_notification("Mise à jour", f"Fichiers mis à jour : {', '.join(files)}")
+
     def _show_status_message(self, message: str, timeout: int = 5000):
         if hasattr(self, 'status') and self.status is not None:
             self.status.showMessage(message, timeout)
@@ -1077,7 +1270,7 @@ class MainWindow(QMainWindow):
         file, _ = QFileDialog.getOpenFileName(self, "Sélectionner une image", "", "Images (*.png *.jpg *.jpeg *.bmp)")
         if file:
             img = cv2.imread(file)
-            decoded = decode_qr(img)
+            decoded = pyzbar.decode(img)
             if decoded:
                 data = decoded[0].data.decode('utf-8')
                 self._show_status_message(f"QR code détecté : {data}", 8000)
@@ -1098,7 +1291,7 @@ class MainWindow(QMainWindow):
     def extract_links(self):
         def handle_html(html):
             try:
-                soup = BeautifulSoup(html, 'html.parser')
+                soup = bs4.BeautifulSoup(html, 'html.parser')
                 links = []
                 for a in soup.find_all('a', href=True):
                     if isinstance(a, bs4.element.Tag):
@@ -1123,7 +1316,6 @@ class MainWindow(QMainWindow):
         QMessageBox.information(self, "Infos système", f"CPU : {cpu}%\nRAM : {ram}%")
     def show_history_popup(self):
         try:
-            import pandas as pd
             df = pd.read_json("update_history.json")
             from PyQt6.QtWidgets import QDialog, QVBoxLayout, QTextEdit
             dlg = QDialog(self)
@@ -1140,165 +1332,102 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Erreur", f"Impossible d'afficher l'historique : {e}")
 
     def refresh_status_indicators(self):
-        # Connexion Internet
-        import socket
-        try:
-            socket.create_connection(("8.8.8.8", 53), timeout=2)
-            if getattr(self, '_last_conn_status', None) == False:
+        """Relance toutes les sondes d'état (elles tournent hors du thread GUI)"""
+        self.status_probes.refresh_now()
+
+    def on_status_changed(self, name, state):
+        """Met à jour l'indicateur d'une sonde ; appelé seulement quand son état change"""
+        label, prefix = {
+            "conn": (self.status_conn, "🌐 Connexion"),
+            "sync": (self.status_sync, "🔄 Sync"),
+            "notify": (self.status_notify, "🔔 Notif"),
+            "telemetry": (self.status_telemetry, "📡 Télémétrie"),
+        }[name]
+        text, style = {
+            status_probes.OK: ("OK", "color: green;"),
+            status_probes.DOWN: ("HS", "color: red;"),
+            status_probes.PENDING: ("...", ""),
+            status_probes.UNKNOWN: ("?", "color: orange;"),
+        }[state]
+        label.setText(f"{prefix} : {text}")
+        label.setStyleSheet(style)
+        if name == "conn":
+            if state == status_probes.OK and getattr(self, '_last_conn_status', None) == False:
                 self.show_notification("Connexion Internet", "Connexion rétablie.")
-            self.status_conn.setText("🌐 Connexion : OK")
-            self.status_conn.setStyleSheet("color: green;")
-            self._last_conn_status = True
-        except Exception:
-            if getattr(self, '_last_conn_status', None) != False:
+            elif state == status_probes.DOWN and getattr(self, '_last_conn_status', None) != False:
                 self.show_notification("Connexion Internet", "Connexion perdue !")
-            self.status_conn.setText("🌐 Connexion : HS")
-            self.status_conn.setStyleSheet("color: red;")
-            self._last_conn_status = False
-        # Sync GitHub (on regarde le log de auto_sync)
-        try:
-            import os
-            log_path = os.path.join(os.path.dirname(__file__), "auto_sync.log")
-            if os.path.exists(log_path):
-                with open(log_path, "r", encoding="utf-8") as f:
-                    lines = f.readlines()[-10:]
-                last = next((l for l in reversed(lines) if "Synchronisation terminée" in l), None)
-                if last:
-                    self.status_sync.setText("🔄 Sync : OK")
-                    self.status_sync.setStyleSheet("color: green;")
-                else:
-                    self.status_sync.setText("🔄 Sync : ...")
-                    self.status_sync.setStyleSheet("")
-            else:
-                self.status_sync.setText("🔄 Sync : ...")
-                self.status_sync.setStyleSheet("")
-        except Exception:
-            self.status_sync.setText("🔄 Sync : ?")
-            self.status_sync.setStyleSheet("color: orange;")
-        # Notifications (on regarde si le port WebSocket est ouvert)
-        try:
-            import websocket
-            ws = websocket.create_connection("ws://localhost:8000/ws", timeout=2)
-            ws.close()
-            self.status_notify.setText("🔔 Notif : OK")
-            self.status_notify.setStyleSheet("color: green;")
-        except Exception:
-            self.status_notify.setText("🔔 Notif : HS")
-            self.status_notify.setStyleSheet("color: red;")
-        # Télémétrie (on regarde le log de telemetry_client)
-        try:
-            import os
-            log_path = os.path.join(os.path.dirname(__file__), "telemetry.log")
-            if os.path.exists(log_path):
-                with open(log_path, "r", encoding="utf-8") as f:
-                    lines = f.readlines()[-10:]
-                last = next((l for l in reversed(lines) if "Télémétrie envoyée" in l), None)
-                if last:
-                    self.status_telemetry.setText("📡 Télémétrie : OK")
-                    self.status_telemetry.setStyleSheet("color: green;")
-                else:
-                    self.status_telemetry.setText("📡 Télémétrie : ...")
-                    self.status_telemetry.setStyleSheet("")
-            else:
-                self.status_telemetry.setText("📡 Télémétrie : ...")
-                self.status_telemetry.setStyleSheet("")
-        except Exception:
-            self.status_telemetry.setText("📡 Télémétrie : ?")
-            self.status_telemetry.setStyleSheet("color: orange;")
+            self._last_conn_status = state == status_probes.OK
+
+    def on_push_connection_changed(self, connected):
+        """Client de notifications connecté ou non : le polling de GitHub ralentit ou reprend"""
+        self.live_updater.set_push_healthy(connected)
 
     def show_log_viewer(self):
         dlg = LogViewerDialog(self)
         dlg.exec()
     def show_diagnostic(self):
         from PyQt6.QtWidgets import QMessageBox
-        report = get_status_report()
+        report = (get_status_report() + "\n\n" + self.tabs.lifecycle_report() + "\n" +
+                  web_profile.describe_cache() + "\n\n" +
+                  self.live_updater.describe_schedule() + "\n\n" +
+                  tracer.summary() + "\n\n" + scheduler.report())
         QMessageBox.information(self, "État des services", report)
 
 
+def install_startup_bench(app, window, output_path):
+    """Mode benchmark : enregistre les temps de démarrage puis quitte au premier loadFinished"""
+    timings = {
+        "t0": _STARTUP_T0,
+        "imports_done": _IMPORTS_DONE,
+        "window_shown": time.time(),
+    }
+
+    def on_load_finished(ok):
+        timings["first_load_finished"] = time.time()
+        timings["load_ok"] = ok
+        timings["lazy_imports"] = dict(import_timings)
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(timings, f)
+        app.quit()
+
+    window._first_view.loadFinished.connect(on_load_finished)
+
+
 # --- Exécution de l'application ---
 if __name__ == "__main__":
-    console = Console()
-    console.print("[bold green]Démarrage de Retrosoft...[/bold green]")
+    # Simple ligne de journal : rich coûtait ~40 ms d'import avant la première fenêtre
+    logging.info("Démarrage de Retrosoft...")
     import os
     import json
     import threading
     from config_watcher import start_config_watcher
     import signal
-    config_path = os.path.join(os.path.dirname(__file__), "config.json")
-    service_threads = {}
-    service_procs = {}
-    def start_auto_sync():
-        import subprocess
-        proc = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(__file__), "auto_sync.py")],
-                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        service_procs["auto_sync"] = proc
-        logging.info("auto_sync lancé")
-    def stop_auto_sync():
-        proc = service_procs.get("auto_sync")
-        if proc and proc.poll() is None:
-            proc.terminate()
-            logging.info("auto_sync arrêté")
-    def start_telemetry():
-        from telemetry_client import start_telemetry_client
-        t = threading.Thread(target=start_telemetry_client, daemon=True)
-        t.start()
-        service_threads["telemetry"] = t
-        logging.info("Télémétrie lancée")
-    def stop_telemetry():
-        # Pas d'arrêt propre, mais le thread s'arrêtera si désactivé dans la config
-        logging.info("Télémétrie arrêt demandée (soft)")
-    def start_notify():
-        import subprocess
-        notifier_path = os.path.join(os.path.dirname(__file__), "notifier_client.py")
-        if os.path.exists(notifier_path):
-            proc = subprocess.Popen([sys.executable, notifier_path],
-                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            service_procs["notify"] = proc
-            logging.info("Notifications temps réel lancées")
-    def stop_notify():
-        proc = service_procs.get("notify")
-        if proc and proc.poll() is None:
-            proc.terminate()
-            logging.info("Notifications temps réel arrêtées")
+    # Le superviseur possède tous les services : chacun ne tourne qu'une fois
+    services = {"auto_sync": "sync_enabled", "telemetry": "telemetry_enabled", "notify": "notify_enabled"}
     def apply_config(new, old):
-        # Sync
-        if new.get("sync_enabled", True) != old.get("sync_enabled", True):
-            if new.get("sync_enabled", True):
-                start_auto_sync()
-            else:
-                stop_auto_sync()
-        # Télémétrie
-        if new.get("telemetry_enabled", True) != old.get("telemetry_enabled", True):
-            if new.get("telemetry_enabled", True):
-                start_telemetry()
-            else:
-                stop_telemetry()
-        # Notifications
-        if new.get("notify_enabled", True) != old.get("notify_enabled", True):
-            if new.get("notify_enabled", True):
-                start_notify()
-            else:
-                stop_notify()
-    # Charger la config avancée
-    try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            config = json.load(f)
-    except Exception:
-        config = {}
-    # Lancer les services selon la config
-    if config.get("sync_enabled", True):
-        start_auto_sync()
-    if config.get("telemetry_enabled", True):
-        start_telemetry()
-    if config.get("notify_enabled", True):
-        start_notify()
+        for name, key in services.items():
+            if new.get(key, True) != old.get(key, True):
+                if new.get(key, True):
+                    supervisor.enable(name)
+                else:
+                    supervisor.disable(name)
+    # Lancer les services selon la config, après le premier affichage de page
+    if config_store.get_bool("sync_enabled", True):
+        scheduler.add("auto_sync", lambda: supervisor.enable("auto_sync"))
+    if config_store.get_bool("telemetry_enabled", True):
+        scheduler.add("telemetry", lambda: supervisor.enable("telemetry"), priority=PRIORITY_LOW, stage=IDLE)
+    if config_store.get_bool("notify_enabled", True):
+        scheduler.add("notify", lambda: supervisor.enable("notify"), priority=PRIORITY_HIGH)
     # Watcher de config pour rechargement à chaud
-    start_config_watcher(apply_config)
-    # Lancer la surveillance des services
-    start_monitor()
-    app = QApplication(sys.argv)
+    scheduler.add("config_watcher", lambda: start_config_watcher(apply_config), stage=IDLE)
+    with tracer.span("QApplication"):
+        app = QApplication(sys.argv)
     window = MainWindow()
-    window.show()
+    with tracer.span("window.show"):
+        window.show()
+    bench_output = os.environ.get("RETROSOFT_STARTUP_BENCH")
+    if bench_output:
+        install_startup_bench(app, window, bench_output)
     try:
         logging.info("Application en cours d'execution")
         sys.exit(app.exec())
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Backplane pub/sub de notifier_server : un webhook reçu par un worker est publié
+sur le backplane et chaque worker le diffuse à ses propres clients WebSocket
+
+RETROSOFT_BACKPLANE :
+    (vide) ou local           un seul processus, diffusion directe
+    tcp://hôte:port           courtier local fourni ici (python notifier_backplane.py --port 8790)
+    redis://hôte:port         serveur Redis (ou compatible), canal RETROSOFT_BACKPLANE_CHANNEL
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+from urllib.parse import urlparse
+
+CHANNEL = os.environ.get("RETROSOFT_BACKPLANE_CHANNEL", "retrosoft-updates")
+# Un abonné qui laisse s'accumuler plus que cela dans le courtier est déconnecté
+BROKER_MAX_BUFFER = 8 * 1024 * 1024
+RECONNECT_MAX = 30.0
+# Taille maximale d'une ligne (la limite par défaut d'asyncio est 64 Ko)
+STREAM_LIMIT = 16 * 1024 * 1024
+
+
+class LocalBackplane:
+    """Un seul processus : la publication est diffusée directement"""
+
+    name = "local"
+
+    def __init__(self):
+        self.on_message = None
+
+    async def start(self, on_message):
+        self.on_message = on_message
+
+    async def publish(self, message):
+        self.on_message(message)
+
+    async def close(self):
+        pass
+
+
+class _StreamBackplane:
+    """Abonnement maintenu en tâche de fond, reconnecté avec attente exponentielle"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.on_message = None
+        self._task = None
+        self._connected = asyncio.Event()
+
+    async def start(self, on_message):
+        self.on_message = on_message
+        self._task = asyncio.create_task(self._subscribe_forever())
+        await asyncio.wait_for(self._connected.wait(), timeout=10)
+
+    async def _subscribe_forever(self):
+        attempt = 0
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port, limit=STREAM_LIMIT)
+                try:
+                    await self._subscribe(reader, writer)
+                    attempt = 0
+                    self._connected.set()
+                    await self._read_messages(reader)
+                finally:
+                    self._connected.clear()
+                    writer.close()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"Backplane {self.name} indisponible : {e}")
+            delay = random.uniform(0, min(RECONNECT_MAX, 0.5 * 2 ** attempt))
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+
+
+class BrokerBackplane(_StreamBackplane):
+    """Courtier TCP local : une ligne par message, renvoyée à toutes les connexions"""
+
+    name = "tcp"
+
+    def __init__(self, host, port):
+        super().__init__(host, port)
+        self._writer = None
+
+    async def _subscribe(self, reader, writer):
+        self._writer = writer
+
+    async def _read_messages(self, reader):
+        while True:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("connexion au courtier fermée")
+            self.on_message(line.decode().rstrip("\n"))
+
+    async def publish(self, message):
+        # Les messages sont du JSON compact : jamais de saut de ligne
+        await asyncio.wait_for(self._connected.wait(), timeout=10)
+        self._writer.write(message.encode() + b"\n")
+        await self._writer.drain()
+
+
+def _resp_command(*args):
+    """Commande au protocole Redis (RESP)"""
+    out = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode()
+        out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(out)
+
+
+async def _resp_read(reader):
+    """Lit une réponse RESP (types simples, entiers, chaînes et tableaux)"""
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("connexion Redis fermée")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode()
+    if kind == b"-":
+        raise ConnectionError(rest.decode())
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        if length < 0:
+            return None
+        return (await reader.readexactly(length + 2))[:-2]
+    if kind == b"*":
+        return [await _resp_read(reader) for _ in range(int(rest))]
+    raise ConnectionError(f"réponse Redis inattendue : {line!r}")
+
+
+class RedisBackplane(_StreamBackplane):
+    """Canal Redis PUBLISH/SUBSCRIBE (une connexion abonnée, une pour publier)"""
+
+    name = "redis"
+
+    def __init__(self, host, port):
+        super().__init__(host, port)
+        self._publisher = None
+        self._publish_lock = asyncio.Lock()
+
+    async def _subscribe(self, reader, writer):
+        writer.write(_resp_command("SUBSCRIBE", CHANNEL))
+        await writer.drain()
+        await _resp_read(reader)  # Confirmation ["subscribe", canal, 1]
+
+    async def _read_messages(self, reader):
+        while True:
+            reply = await _resp_read(reader)
+            if isinstance(reply, list) and reply and reply[0] == b"message":
+                self.on_message(reply[2].decode())
+
+    async def publish(self, message):
+        async with self._publish_lock:
+            for retry in (True, False):
+                try:
+                    if self._publisher is None:
+                        self._publisher = await asyncio.open_connection(self.host, self.port)
+                    reader, writer = self._publisher
+                    writer.write(_resp_command("PUBLISH", CHANNEL, message.encode()))
+                    await writer.drain()
+                    return await _resp_read(reader)
+                except (ConnectionError, OSError, asyncio.IncompleteReadError):
+                    self._publisher = None
+                    if not retry:
+                        raise
+
+    async def close(self):
+        await super().close()
+        if self._publisher:
+            self._publisher[1].close()
+
+
+def create_backplane(url=None):
+    """Backplane décrit par l'URL (ou RETROSOFT_BACKPLANE)"""
+    url = url if url is not None else os.environ.get("RETROSOFT_BACKPLANE", "")
+    if not url or url == "local":
+        return LocalBackplane()
+    parsed = urlparse(url)
+    if parsed.scheme == "tcp":
+        return BrokerBackplane(parsed.hostname or "127.0.0.1", parsed.port or 8790)
+    if parsed.scheme == "redis":
+        return RedisBackplane(parsed.hostname or "127.0.0.1", parsed.port or 6379)
+    raise ValueError(f"Backplane inconnu : {url}")
+
+
+async def run_broker(host="127.0.0.1", port=8790):
+    """Courtier minimal : chaque ligne reçue est renvoyée à toutes les connexions"""
+    subscribers = set()
+
+    async def handle(reader, writer):
+        subscribers.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                for subscriber in list(subscribers):
+                    if subscriber.transport.get_write_buffer_size() > BROKER_MAX_BUFFER:
+                        logging.warning("Abonné trop lent, déconnexion")
+                        subscribers.discard(subscriber)
+                        subscriber.close()
+                        continue
+                    subscriber.write(line)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            subscribers.discard(writer)
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port, limit=STREAM_LIMIT)
+    logging.info(f"Courtier de notifications à l'écoute sur {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8790)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_broker(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
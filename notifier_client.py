@@ -1,31 +1,189 @@
 import threading
 import time
+import random
+import asyncio
 import websocket
 import json
 import logging
-from live_updater import LiveUpdater
+from live_updater import LiveFileDownloader, MONITORED_FILES, push_events
+from github_api import DEFAULT_BRANCH, fetch_tree, repo_path_from_url
+from update_manifest import UpdateManifest
+from version import get_github_repo_url
+from config_store import store as config_store
 
 SERVER_URL = "ws://localhost:8000/ws"  # À personnaliser avec l'adresse de ton serveur
 
+# Les notifications reçues pendant cette fenêtre sont fusionnées en une seule mise à jour
+DEBOUNCE_SECONDS = 2.0
+# Reconnexion : attente exponentielle avec gigue complète, plafonnée
+RECONNECT_BASE = 1.0
+RECONNECT_MAX = 300.0
+# Une connexion restée ouverte plus longtemps remet l'attente à zéro
+STABLE_CONNECTION = 60.0
+# Heartbeat : ping toutes les 30 s, connexion considérée morte sans pong sous 10 s
+PING_INTERVAL = 30
+PING_TIMEOUT = 10
+
+def files_to_fetch(files):
+    """Fichiers suivis listés dans la notification et différents de la copie locale"""
+    files = {path: sha for path, sha in files.items() if path in MONITORED_FILES}
+    manifest = UpdateManifest()
+    manifest.refresh(list(files))
+    # SHA inconnu (serveur sans accès à l'API) : le fichier a changé dans le push, on le prend
+    return {path: sha for path, sha in files.items() if sha is None or sha != manifest.sha(path)}
+
+class UpdateCoalescer:
+    """Fusionne les notifications d'une rafale de pushs en une seule mise à jour ciblée"""
+
+    def __init__(self, debounce=DEBOUNCE_SECONDS):
+        self.debounce = debounce
+        self._lock = threading.Lock()
+        self._timer = None
+        self._files = {}
+        self._commit = None
+        self._full_scan = False
+
+    def add(self, data):
+        with self._lock:
+            if "files" in data:
+                # Un SHA plus récent remplace le précédent pour le même fichier
+                self._files.update(data["files"])
+                self._commit = data.get("commit") or self._commit
+            else:
+                self._full_scan = True  # Ancien format de notification ou resynchronisation
+            if self._timer is None:
+                self._timer = threading.Timer(self.debounce, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            files, commit, full_scan = self._files, self._commit, self._full_scan
+            self._files, self._commit, self._full_scan = {}, None, False
+            self._timer = None
+        try:
+            if full_scan:
+                # Analyse complète : une requête d'arbre (cache ETag) comparée au manifeste
+                tree = fetch_tree(repo_path_from_url(get_github_repo_url()))
+                changed = UpdateManifest().changed_files(tree, MONITORED_FILES)
+                wanted = {path: tree[path]["sha"] for path in changed}
+                commit = None
+            else:
+                wanted = files_to_fetch(files)
+            logging.info(f"Notifications fusionnées : {len(wanted)} fichier(s) à récupérer")
+            if wanted:
+                downloader = LiveFileDownloader(list(wanted), {path: sha for path, sha in wanted.items() if sha},
+                                                ref=commit or DEFAULT_BRANCH)
+                downloaded = downloader.download_all()
+                logging.info(f"Mise à jour par notification : {', '.join(downloaded) or 'aucun fichier'}")
+                if downloaded:
+                    # Application à chaud (ou demande de redémarrage) par la fenêtre principale
+                    push_events.files_downloaded.emit(downloaded)
+        except Exception as e:
+            logging.warning(f"Mise à jour par notification impossible : {e}")
+
+coalescer = UpdateCoalescer()
+
+# Dernière position vue dans le journal du serveur, renvoyée à la reconnexion pour le rattrapage
+last_position = {"epoch": None, "seq": None}
+
+def server_url():
+    base = config_store.get_str("notifier_url") or SERVER_URL
+    if last_position["epoch"] is None:
+        return base
+    separator = "&" if "?" in base else "?"
+    return f"{base}{separator}epoch={last_position['epoch']}&since={last_position['seq']}"
+
 def on_message(ws, message):
     data = json.loads(message)
-    if data.get("type") == "update":
-        logging.info("Signal reçu : mise à jour GitHub détectée")
-        updater = LiveUpdater(None)
-        updater.check_for_updates_silent()
+    if "seq" in data:
+        previous = last_position["seq"] if last_position["epoch"] == data["epoch"] else None
+        last_position.update(epoch=data["epoch"], seq=data["seq"])
+        if data.get("type") not in ("hello", "resync") and previous is not None and data["seq"] != previous + 1:
+            # Trou dans la séquence (message abandonné par le serveur) : analyse complète
+            logging.info(f"Notifications manquées ({previous} → {data['seq']}) : resynchronisation complète")
+            coalescer.add({"type": "update"})
+    if data.get("type") == "resync":
+        # Événements manqués trop anciens (ou serveur redémarré) : une analyse complète
+        logging.info("Notifications manquées non rejouables : resynchronisation complète")
+        coalescer.add({"type": "update"})
+        return
+    if data.get("type") != "update":
+        return
+    if data.get("ref") not in (None, f"refs/heads/{DEFAULT_BRANCH}"):
+        return
+    logging.info(f"Signal reçu : commit {data.get('commit')}")
+    coalescer.add(data)
+
+def reconnect_delay(attempt):
+    """Attente avant la tentative suivante (gigue complète : les clients ne se reconnectent pas ensemble)"""
+    # Exposant borné : 2 ** attempt déborde en float après une très longue coupure
+    return random.uniform(0, min(RECONNECT_MAX, RECONNECT_BASE * 2 ** min(attempt, 16)))
+
+def next_attempt(attempt, connected_at):
+    """(tentative suivante, attente) après une déconnexion"""
+    if connected_at is not None and time.monotonic() - connected_at > STABLE_CONNECTION:
+        attempt = 0
+    return attempt + 1, reconnect_delay(attempt)
+
+async def run_notifier():
+    """Client de notifications hébergé sur la boucle asyncio partagée du navigateur (service "notify")"""
+    import websockets
+    attempt = 0
+    while True:
+        connected_at = None
+        try:
+            async with websockets.connect(server_url(), ping_interval=PING_INTERVAL,
+                                          ping_timeout=PING_TIMEOUT) as ws:
+                connected_at = time.monotonic()
+                logging.info("Connecté au serveur de notifications")
+                push_events.connection_changed.emit(True)
+                async for message in ws:
+                    # Rapide : les téléchargements se font dans le thread du coalesceur
+                    on_message(ws, message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.warning(f"Erreur WebSocket : {e}")
+        finally:
+            if connected_at is not None:
+                # Le polling reprend son rythme normal tant que le push est coupé
+                push_events.connection_changed.emit(False)
+        attempt, delay = next_attempt(attempt, connected_at)
+        logging.info(f"Reconnexion au serveur de notifications dans {delay:.1f}s")
+        await asyncio.sleep(delay)
 
 def run_ws_client():
+    attempt = 0
     while True:
+        connected_at = None
+
+        def on_open(ws):
+            nonlocal connected_at
+            connected_at = time.monotonic()
+            logging.info("Connecté au serveur de notifications")
+            push_events.connection_changed.emit(True)
+
         try:
             ws = websocket.WebSocketApp(
-                SERVER_URL,
+                server_url(),
+                on_open=on_open,
                 on_message=on_message
             )
-            ws.run_forever()
+            # Les pings détectent une connexion à moitié ouverte (run_forever rend la main sans pong)
+            ws.run_forever(ping_interval=PING_INTERVAL, ping_timeout=PING_TIMEOUT)
         except Exception as e:
-            logging.warning(f"Erreur WebSocket, reconnexion dans 10s : {e}")
-            time.sleep(10)
+            logging.warning(f"Erreur WebSocket : {e}")
+        if connected_at is not None:
+            push_events.connection_changed.emit(False)
+        attempt, delay = next_attempt(attempt, connected_at)
+        logging.info(f"Reconnexion au serveur de notifications dans {delay:.1f}s")
+        time.sleep(delay)
 
 def start_notifier_client():
     t = threading.Thread(target=run_ws_client, daemon=True)
-    t.start() 
\ No newline at end of file
+    t.start()
+
+if __name__ == "__main__":
+    # Client autonome (le navigateur héberge run_notifier sur sa boucle partagée)
+    run_ws_client()
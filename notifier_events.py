@@ -0,0 +1,123 @@
+"""
+Journal numéroté des notifications de notifier_server
+Chaque événement reçoit un numéro de séquence croissant ; les derniers sont gardés
+(en mémoire, et sur disque si RETROSOFT_EVENT_LOG est défini) pour être rejoués
+à un client qui se reconnecte avec le dernier numéro qu'il a vu
+
+Le fichier appartient à un seul processus : avec plusieurs workers, chacun doit avoir
+son propre RETROSOFT_EVENT_LOG (un fichier déjà verrouillé par un autre worker est refusé
+et ce worker garde son journal en mémoire seulement).
+"""
+
+import json
+import logging
+import os
+from collections import deque
+
+EVENT_LOG_SIZE = int(os.environ.get("RETROSOFT_EVENT_LOG_SIZE", "256"))
+
+
+def _lock_file(path):
+    """Verrou exclusif sur path + ".lock" (libéré à la fin du processus) ; None s'il est déjà pris"""
+    f = open(path + ".lock", "a+")
+    try:
+        f.seek(0)
+        if os.name == "nt":
+            import msvcrt
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return None
+    return f
+
+
+class EventLog:
+    """Anneau borné des derniers événements, déjà encodés avec leur numéro"""
+
+    def __init__(self, size=EVENT_LOG_SIZE, path=None):
+        self.events = deque(maxlen=size)  # (seq, texte)
+        self.path = path
+        # L'époque change à chaque journal neuf : une séquence d'une autre époque n'a pas de sens
+        self.epoch = os.urandom(6).hex()
+        self.seq = 0
+        self._lines_on_disk = 0
+        self._needs_newline = False  # Dernière ligne tronquée par un arrêt brutal
+        self._lock = None
+        if path:
+            self._lock = _lock_file(path)
+            if self._lock is None:
+                logging.error(f"Journal de notifications {path} déjà utilisé par un autre processus : "
+                              f"journal en mémoire seulement (un fichier par worker)")
+                self.path = None
+                return
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except OSError:
+            return
+        lines = text.splitlines()
+        self._needs_newline = bool(text) and not text.endswith("\n")
+        for line in lines:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue  # Dernière ligne tronquée par un arrêt brutal
+            self.epoch, self.seq = event["epoch"], event["seq"]
+            self.events.append((self.seq, line))
+        self._lines_on_disk = len(lines)
+        logging.info(f"Journal de notifications rechargé : {len(self.events)} événement(s), séquence {self.seq}")
+
+    def append(self, message):
+        """Numérote un message JSON déjà encodé ; retourne le texte à diffuser"""
+        self.seq += 1
+        # Insertion en tête de l'objet : le message n'est ni décodé ni ré-encodé
+        text = '{"seq":%d,"epoch":"%s",%s' % (self.seq, self.epoch, message[1:])
+        self.events.append((self.seq, text))
+        if self.path:
+            self._persist(text)
+        return text
+
+    def _persist(self, text):
+        try:
+            if self._lines_on_disk >= 2 * self.events.maxlen:
+                # Réécrit le fichier avec le seul contenu de l'anneau
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.writelines(line + "\n" for _, line in self.events)
+                os.replace(tmp_path, self.path)
+                self._lines_on_disk = len(self.events)
+            else:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    # Ne pas coller l'événement à une ligne tronquée : il serait perdu au rechargement
+                    f.write(("\n" if self._needs_newline else "") + text + "\n")
+                self._needs_newline = False
+                self._lines_on_disk += 1
+        except OSError as e:
+            logging.warning(f"Écriture du journal de notifications impossible : {e}")
+
+    def close(self):
+        """Libère le fichier pour un autre processus"""
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
+
+    def since(self, epoch, seq):
+        """Événements postérieurs à seq ; None si l'écart n'est plus couvert (resynchronisation)"""
+        if epoch != self.epoch or seq > self.seq:
+            return None
+        if seq == self.seq:
+            return []
+        oldest = self.events[0][0] if self.events else self.seq + 1
+        if seq < oldest - 1:
+            return None
+        return [text for event_seq, text in self.events if event_seq > seq]
+
+    def position(self, kind):
+        """Message de contrôle portant la position courante ("hello" ou "resync")"""
+        return json.dumps({"type": kind, "epoch": self.epoch, "seq": self.seq}, separators=(",", ":"))
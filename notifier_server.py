@@ -1,22 +1,169 @@
 import hmac
 import hashlib
+import json
+import logging
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket, Request, Header, HTTPException
 from fastapi.responses import JSONResponse
 import asyncio
+from github_api import fetch_tree
+from notifier_backplane import create_backplane
+from notifier_events import EventLog
 
-app = FastAPI()
+# Les webhooks sont publiés sur le backplane ; chaque worker diffuse à ses propres clients
+backplane = create_backplane()
+# Événements récents numérotés, rejoués aux clients qui se reconnectent
+event_log = EventLog(path=os.environ.get("RETROSOFT_EVENT_LOG") or None)
+
+@asynccontextmanager
+async def lifespan(app):
+    await backplane.start(on_backplane_message)
+    logging.info(f"Backplane {backplane.name} actif (worker {os.getpid()})")
+    yield
+    await backplane.close()
+
+app = FastAPI(lifespan=lifespan)
 clients = set()
-GITHUB_SECRET = b"CHANGE_ME_SECRET"  # À personnaliser et à synchroniser avec le webhook GitHub
+GITHUB_SECRET = os.environ.get("RETROSOFT_GITHUB_SECRET", "CHANGE_ME_SECRET").encode()  # À personnaliser et à synchroniser avec le webhook GitHub
+
+# File d'envoi bornée par client : un client lent ne retarde plus les autres
+SEND_QUEUE_SIZE = int(os.environ.get("RETROSOFT_SEND_QUEUE_SIZE", "16"))
+SEND_TIMEOUT = float(os.environ.get("RETROSOFT_SEND_TIMEOUT", "10"))
+# "drop_oldest" : le plus ancien message en attente est abandonné ; "disconnect" : le client est déconnecté
+SLOW_CLIENT_POLICY = os.environ.get("RETROSOFT_SLOW_CLIENT_POLICY", "drop_oldest")
+
+stats = {"broadcasts": 0, "dropped": 0, "disconnected": 0}
+_watchdog = None
+_pending = set()  # Publications en cours (références gardées jusqu'à la fin des tâches)
+
+
+class ClientConnection:
+    """WebSocket d'un client avec sa file d'envoi et sa tâche d'écriture"""
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        self.send_started = None  # Début de l'envoi en cours (horloge de la boucle)
+        self.task = asyncio.create_task(self.writer())
+
+    def offer(self, message):
+        """Dépose un message déjà encodé sans attendre ; False si le client doit être déconnecté"""
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            if SLOW_CLIENT_POLICY == "disconnect":
+                return False
+            # Place pour le message et un marqueur "resync" : le client sait qu'il a manqué
+            # des événements et refait une analyse complète
+            while self.queue.qsize() > max(0, self.queue.maxsize - 2):
+                self.queue.get_nowait()
+                stats["dropped"] += 1
+            if self.queue.maxsize >= 2:
+                self.queue.put_nowait(message)
+            else:
+                stats["dropped"] += 1
+            self.queue.put_nowait(event_log.position("resync"))
+            return True
+
+    async def writer(self):
+        try:
+            while True:
+                message = await self.queue.get()
+                self.send_started = asyncio.get_running_loop().time()
+                await self.websocket.send_text(message)
+                self.send_started = None
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            # Envoi en échec : client considéré comme mort
+            logging.info(f"Client WebSocket retiré : {e!r}")
+            clients.discard(self)
+            stats["disconnected"] += 1
+            await self.close_socket()
+
+    async def close_socket(self, code=1000):
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
+
+    async def disconnect(self):
+        """Déconnecte un client trop lent (1013 : réessayer plus tard)"""
+        self.task.cancel()
+        await self.close_socket(code=1013)
+
+
+def broadcast(message):
+    """Dépose le message (texte encodé une seule fois) dans la file de chaque client ;
+    retourne le nombre de destinataires"""
+    stats["broadcasts"] += 1
+    delivered = 0
+    for client in list(clients):
+        if client.offer(message):
+            delivered += 1
+        else:
+            clients.discard(client)
+            stats["disconnected"] += 1
+            asyncio.create_task(client.disconnect())
+    return delivered
+
+
+def on_backplane_message(message):
+    """Message reçu du backplane : numéroté dans le journal puis diffusé"""
+    broadcast(event_log.append(message))
+
+
+def replay(client, epoch, since):
+    """Envoie au client ce qu'il a manqué depuis since, ou un marqueur de resynchronisation"""
+    missed = event_log.since(epoch, since) if epoch and since is not None else None
+    # Un rattrapage plus long que la file d'envoi serait tronqué : resynchronisation complète
+    if missed is None or len(missed) > SEND_QUEUE_SIZE - 1:
+        client.offer(event_log.position("resync"))
+        return
+    for text in missed:
+        client.offer(text)
+    client.offer(event_log.position("hello"))
+
+
+async def watch_stalled_sends():
+    """Déconnecte les clients dont un envoi est bloqué depuis plus de SEND_TIMEOUT
+    (une seule tâche pour tous les clients plutôt qu'un wait_for par message)"""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(1)
+        now = loop.time()
+        for client in list(clients):
+            if client.send_started is not None and now - client.send_started > SEND_TIMEOUT:
+                logging.info("Client WebSocket bloqué, déconnexion")
+                clients.discard(client)
+                stats["disconnected"] += 1
+                asyncio.create_task(client.disconnect())
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
+    global _watchdog
     await websocket.accept()
-    clients.add(websocket)
+    if _watchdog is None:
+        _watchdog = asyncio.create_task(watch_stalled_sends())
+    client = ClientConnection(websocket)
+    # Rattrapage et inscription sans attente entre les deux : aucun événement ne peut être manqué
+    epoch = websocket.query_params.get("epoch")
+    since = websocket.query_params.get("since")
+    if since is not None and since.isdigit():
+        replay(client, epoch, int(since))
+    else:
+        client.offer(event_log.position("hello"))
+    clients.add(client)
     try:
         while True:
             await websocket.receive_text()  # Keep alive
     except Exception:
-        clients.discard(websocket)
+        pass
+    finally:
+        clients.discard(client)
+        client.task.cancel()
 
 def verify_github_signature(payload, signature):
     if not signature:
@@ -25,16 +172,55 @@ def verify_github_signature(payload, signature):
     expected = "sha256=" + mac.hexdigest()
     return hmac.compare_digest(expected, signature)
 
+def compact_push(data):
+    """Réduit un événement push GitHub au commit et aux fichiers modifiés ou supprimés"""
+    files, removed = {}, set()
+    # Les commits du push sont dans l'ordre chronologique
+    for commit in data.get("commits", []):
+        for path in commit.get("added", []) + commit.get("modified", []):
+            files[path] = None
+            removed.discard(path)
+        for path in commit.get("removed", []):
+            files.pop(path, None)
+            removed.add(path)
+    return {"type": "update", "ref": data.get("ref"), "commit": data.get("after"),
+            "files": files, "removed": sorted(removed)}
+
+def encode_message(message):
+    return json.dumps(message, separators=(",", ":"))
+
+async def publish_push(message, repo_path):
+    """Complète les SHA de blob des fichiers modifiés (arbre du commit) puis publie"""
+    if repo_path and message["files"] and message["commit"]:
+        try:
+            tree = await asyncio.to_thread(fetch_tree, repo_path, message["commit"])
+            for path in message["files"]:
+                entry = tree.get(path)
+                message["files"][path] = entry["sha"] if entry else None
+        except Exception as e:
+            logging.warning(f"SHA des fichiers indisponibles pour {message['commit']} : {e}")
+    try:
+        await backplane.publish(encode_message(message))
+    except Exception as e:
+        logging.error(f"Publication sur le backplane {backplane.name} impossible : {e}")
+
 @app.post("/github-webhook")
 async def github_webhook(request: Request, x_hub_signature_256: str = Header(None)):
     body = await request.body()
     if not verify_github_signature(body, x_hub_signature_256):
         raise HTTPException(status_code=403, detail="Invalid signature")
-    data = await request.json()
-    # Diffuse à tous les clients connectés
-    for ws in list(clients):
-        try:
-            await ws.send_json({"type": "update", "data": data})
-        except Exception:
-            clients.discard(ws)
-    return JSONResponse({"status": "ok"}) 
\ No newline at end of file
+    data = json.loads(body)
+    if "commits" not in data:
+        return JSONResponse({"status": "ignored"})  # ping ou autre événement que push
+    message = compact_push(data)
+    # Diffuse à tous les clients connectés sans attendre les envois
+    task = asyncio.create_task(publish_push(message, data.get("repository", {}).get("full_name")))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+    return JSONResponse({"status": "ok", "clients": len(clients), "files": len(message["files"])})
+
+@app.get("/stats")
+async def get_stats():
+    return {"worker": os.getpid(), "backplane": backplane.name,
+            "epoch": event_log.epoch, "seq": event_log.seq,
+            "clients": len(clients), "queued": sum(c.queue.qsize() for c in clients), **stats}
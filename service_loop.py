@@ -0,0 +1,70 @@
+"""
+Boucle asyncio partagée, dans un thread d'arrière-plan du navigateur
+Héberge les services légers (notifications...) sous forme de tâches plutôt que
+d'un interpréteur Python supplémentaire par service
+"""
+
+import asyncio
+import logging
+import threading
+
+
+class ServiceTask:
+    """Poignée d'un service hébergé sur la boucle (équivalent d'un Popen ou d'un Thread)"""
+
+    def __init__(self, name, future, native_id):
+        self.name = name
+        self.future = future
+        # Thread de la boucle : le temps CPU mesuré est celui de tous les services hébergés
+        self.native_id = native_id
+
+    def is_alive(self):
+        return not self.future.done()
+
+    def cancel(self):
+        self.future.cancel()
+
+    def add_exit_callback(self, callback):
+        """callback(message) à la fin de la tâche (appelé tout de suite si elle est déjà finie)"""
+        def done(future):
+            if future.cancelled():
+                message = "Tâche annulée"
+            elif future.exception() is not None:
+                message = f"Tâche morte : {future.exception()!r}"
+            else:
+                message = "Tâche terminée"
+            callback(message)
+        self.future.add_done_callback(done)
+
+
+class ServiceLoop:
+    """Une seule boucle pour tous les services ; démarrée au premier service"""
+
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="service-loop", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def start(self, name, coroutine_function):
+        """Lance coroutine_function() sur la boucle ; retourne sa ServiceTask"""
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(coroutine_function(), loop)
+        logging.debug(f"Service {name} hébergé sur la boucle partagée")
+        return ServiceTask(name, future, self._thread.native_id)
+
+    def stop(self):
+        """Arrête la boucle (fermeture de l'application)"""
+        with self._lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+service_loop = ServiceLoop()
@@ -3,7 +3,18 @@ import time
 import logging
 import os
 import sys
+import random
+import atexit
+import importlib.util
+import inspect
 import subprocess
+from collections import deque
+from config_store import store as config_store
+from service_loop import service_loop, ServiceTask
+from lazy_imports import LazyModule
+# Importé à la première mesure seulement (pas au démarrage du navigateur)
+HAS_PSUTIL = importlib.util.find_spec("psutil") is not None
+psutil = LazyModule("psutil")
 
 SERVICE_DEFS = {
     "auto_sync": {
@@ -11,10 +22,10 @@ SERVICE_DEFS = {
         "path": os.path.join(os.path.dirname(__file__), "auto_sync.py"),
         "args": [sys.executable],
     },
+    # Hébergé sur la boucle asyncio partagée plutôt que dans un interpréteur séparé
     "notify": {
-        "type": "process",
-        "path": os.path.join(os.path.dirname(__file__), "notifier_client.py"),
-        "args": [sys.executable],
+        "type": "task",
+        "target": "notifier_client.run_notifier",
     },
     "telemetry": {
         "type": "thread",
@@ -22,74 +33,343 @@ SERVICE_DEFS = {
     },
 }
 
-service_procs = {}
-service_threads = {}
+# Relance après un arrêt inattendu : 1 s, 2 s, 4 s... plafonné
+RESTART_BASE = 1.0
+RESTART_MAX = 120.0
+# Au-delà de RESTART_BUDGET relances en RESTART_WINDOW secondes, le service est abandonné
+RESTART_BUDGET = 5
+RESTART_WINDOW = 600.0
+# Un service resté en vie plus longtemps est considéré comme stable (l'attente repart de zéro)
+STABLE_RUN = 60.0
+STOP_TIMEOUT = 5.0
+
+# Mesure des ressources : un échantillon toutes les 5 s, 10 min d'historique par service
+SAMPLE_INTERVAL = 5.0
+SAMPLE_HISTORY = 120
+# Limites souples (config "service_limits" : {"auto_sync": {"cpu_percent": 80, "rss_mb": 300, "fds": 500}}) :
+# dépassées sur LIMIT_SAMPLES échantillons consécutifs, le service est tué puis relancé
+LIMIT_SAMPLES = 3
+
 service_status = {k: {"status": "unknown", "restarts": 0, "last_error": None} for k in SERVICE_DEFS}
 
-# Pour threads Python, on ne peut pas vraiment les relancer proprement, donc on surveille surtout les process
 
-def start_service(name):
-    conf = SERVICE_DEFS[name]
-    if conf["type"] == "process":
-        if not os.path.exists(conf["path"]):
-            service_status[name]["status"] = "absent"
-            return
-        proc = subprocess.Popen(conf["args"] + [conf["path"]], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        service_procs[name] = proc
-        service_status[name]["status"] = "running"
-    elif conf["type"] == "thread":
-        # Pour la télémétrie, on relance le thread si besoin
-        import importlib
-        mod_name, func_name = conf["target"].rsplit(".", 1)
-        mod = importlib.import_module(mod_name)
-        t = threading.Thread(target=getattr(mod, func_name), daemon=True)
-        t.start()
-        service_threads[name] = t
-        service_status[name]["status"] = "running"
+class ResourceHistory:
+    """Anneau des derniers échantillons d'un service (temps CPU, RSS, descripteurs, E/S)"""
 
-def stop_service(name):
-    conf = SERVICE_DEFS[name]
-    if conf["type"] == "process":
-        proc = service_procs.get(name)
-        if proc and proc.poll() is None:
-            proc.terminate()
-            service_status[name]["status"] = "stopped"
-    elif conf["type"] == "thread":
-        # Pas d'arrêt propre pour les threads
-        service_status[name]["status"] = "stopped"
-
-def monitor_services(interval=5):
-    while True:
-        for name, conf in SERVICE_DEFS.items():
+    def __init__(self, size=SAMPLE_HISTORY):
+        self.samples = deque(maxlen=size)
+
+    def add(self, sample):
+        self.samples.append(sample)
+
+    def rates(self):
+        """Taux entre échantillons consécutifs d'un même processus : (CPU %, E/S octets/s)"""
+        samples = list(self.samples)
+        result = []
+        for prev, cur in zip(samples, samples[1:]):
+            dt = cur["t"] - prev["t"]
+            if cur["id"] != prev["id"] or dt <= 0:
+                continue  # Relance entre les deux : compteurs remis à zéro
+            io = None
+            if cur["io"] is not None and prev["io"] is not None:
+                io = (cur["io"] - prev["io"]) / dt
+            result.append((100 * (cur["cpu"] - prev["cpu"]) / dt, io))
+        return result
+
+    def summary(self):
+        if not self.samples:
+            return "pas encore mesuré"
+        last = self.samples[-1]
+        rates = self.rates()
+        parts = []
+        if rates:
+            cpu = [r[0] for r in rates]
+            parts.append(f"CPU {cpu[-1]:.1f} % (pic {max(cpu):.1f} %)")
+            io = [r[1] for r in rates if r[1] is not None]
+            if io:
+                parts.append(f"E/S {io[-1] / 1024:.1f} Ko/s (pic {max(io) / 1024:.1f} Ko/s)")
+        else:
+            parts.append(f"CPU {last['cpu']:.1f} s cumulées")
+        rss = [s["rss"] for s in self.samples if s["rss"] is not None]
+        if rss:
+            parts.append(f"RSS {rss[-1] / 2**20:.1f} Mo (pic {max(rss) / 2**20:.1f} Mo)")
+        if last["fds"] is not None:
+            parts.append(f"{last['fds']} descripteurs")
+        return ", ".join(parts)
+
+
+def measure(worker):
+    """Échantillon de ressources d'un processus fils ou d'un thread de ce processus"""
+    now = time.monotonic()
+    if isinstance(worker, subprocess.Popen):
+        proc = psutil.Process(worker.pid)
+        with proc.oneshot():
+            cpu = proc.cpu_times()
+            try:
+                fds = proc.num_fds()
+            except AttributeError:
+                fds = proc.num_handles()  # Windows
+            try:
+                io = proc.io_counters()
+                io = io.read_bytes + io.write_bytes
+            except (AttributeError, psutil.AccessDenied):
+                io = None  # macOS
+            return {"t": now, "id": worker.pid, "cpu": cpu.user + cpu.system,
+                    "rss": proc.memory_info().rss, "fds": fds, "io": io}
+    # Thread (ou boucle partagée d'une tâche) : seul son temps CPU est mesurable séparément
+    for thread in psutil.Process().threads():
+        if thread.id == worker.native_id:
+            return {"t": now, "id": worker.native_id, "cpu": thread.user_time + thread.system_time,
+                    "rss": None, "fds": None, "io": None}
+    return None
+
+
+class ServiceSupervisor:
+    """Seul propriétaire des services : démarrage unique, fin détectée par événement, relance avec attente"""
+
+    def __init__(self, defs=SERVICE_DEFS, status=service_status):
+        self.defs = defs
+        self.status = status
+        self._lock = threading.RLock()
+        self._wanted = set()      # Services activés (config)
+        self._running = {}        # nom -> Popen ou Thread en cours
+        self._started_at = {}
+        self._failures = {}       # Arrêts inattendus consécutifs
+        self._restart_times = {}  # Horodatages des relances récentes (budget)
+        self._timers = {}         # Relances programmées
+        self.history = {}         # nom -> ResourceHistory
+        self._over_limit = {}     # Échantillons consécutifs au-delà d'une limite
+        self._kill_reasons = {}   # Arrêts forcés par une limite, rapportés à la sortie
+        self._sampler = None
+
+    def enable(self, name):
+        """Active le service et le démarre s'il ne tourne pas déjà"""
+        with self._lock:
+            self._wanted.add(name)
+            self._failures[name] = 0
+            self._restart_times[name] = []
+            worker = self._running.get(name)
+            if (self.status[name]["status"] == "stopping" and isinstance(worker, threading.Thread)
+                    and not worker.stoppable and worker.is_alive()):
+                # Thread sans stop_event : il ne s'est jamais arrêté et reprend simplement son rôle
+                self.status[name]["status"] = "running"
+            self._start(name)
+            if HAS_PSUTIL and self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample_loop, name="service-sampler", daemon=True)
+                self._sampler.start()
+
+    def disable(self, name):
+        """Désactive le service : arrêt et annulation d'une éventuelle relance"""
+        with self._lock:
+            self._wanted.discard(name)
+            timer = self._timers.pop(name, None)
+            if timer:
+                timer.cancel()
+            worker = self._running.get(name)
+            if worker is None:
+                self.status[name]["status"] = "stopped"
+            else:
+                # Suivi jusqu'à sa fin réelle (_on_exit), pour ne jamais en lancer un second
+                self.status[name]["status"] = "stopping"
+        if isinstance(worker, subprocess.Popen) and worker.poll() is None:
+            worker.terminate()
+            logging.info(f"Service {name} arrêté")
+        elif isinstance(worker, ServiceTask):
+            worker.cancel()
+            logging.info(f"Service {name} : arrêt demandé")
+        elif isinstance(worker, threading.Thread):
+            # Arrêt coopératif : le service surveille son stop_event
+            worker.stop_event.set()
+            logging.info(f"Service {name} : arrêt demandé")
+
+    def is_running(self, name):
+        with self._lock:
+            worker = self._running.get(name)
+        if isinstance(worker, subprocess.Popen):
+            return worker.poll() is None
+        return worker is not None and worker.is_alive()
+
+    def _start(self, name):
+        if name not in self._wanted or name in self._timers or self.is_running(name):
+            return  # Déjà lancé ou relance déjà programmée : jamais deux instances
+        conf = self.defs[name]
+        try:
             if conf["type"] == "process":
-                proc = service_procs.get(name)
-                if proc:
-                    if proc.poll() is not None:
-                        # Crash détecté
-                        service_status[name]["status"] = "crashed"
-                        service_status[name]["restarts"] += 1
-                        service_status[name]["last_error"] = f"Code retour: {proc.returncode}"
-                        logging.warning(f"Service {name} crashé, relance...")
-                        start_service(name)
+                if not os.path.exists(conf["path"]):
+                    self.status[name]["status"] = "absent"
+                    return
+                worker = subprocess.Popen(conf["args"] + [conf["path"]],
+                                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                waiter = lambda: self._on_exit(name, worker, f"Code retour: {worker.wait()}")
+            else:
+                import importlib
+                mod_name, func_name = conf["target"].rsplit(".", 1)
+                target = getattr(importlib.import_module(mod_name), func_name)
+                if conf["type"] == "task":
+                    worker = service_loop.start(name, target)
                 else:
-                    # Pas lancé, on tente de lancer
-                    start_service(name)
-            elif conf["type"] == "thread":
-                t = service_threads.get(name)
-                if t and not t.is_alive():
-                    service_status[name]["status"] = "crashed"
-                    service_status[name]["restarts"] += 1
-                    service_status[name]["last_error"] = "Thread mort"
-                    logging.warning(f"Thread {name} mort, relance...")
-                    start_service(name)
-        time.sleep(interval)
-
-def start_monitor():
-    t = threading.Thread(target=monitor_services, daemon=True)
-    t.start()
+                    worker = threading.Thread(target=self._run_thread, args=(name, target), daemon=True)
+                    worker.stop_event = threading.Event()
+                    worker.stoppable = True  # Précisé par _run_thread selon la signature de la cible
+                waiter = None
+        except Exception as e:
+            self.status[name]["last_error"] = str(e)
+            self._on_exit(name, None, str(e))
+            return
+        self._running[name] = worker
+        self._started_at[name] = time.monotonic()
+        self.status[name]["status"] = "running"
+        if waiter:
+            # proc.wait() bloque sans sonder : réveil dès la fin du processus (waitpid / WaitForSingleObject)
+            threading.Thread(target=waiter, name=f"wait-{name}", daemon=True).start()
+        elif isinstance(worker, ServiceTask):
+            # Enregistré après _running : une fin immédiate est bien reconnue
+            worker.add_exit_callback(lambda message: self._on_exit(name, worker, message))
+        else:
+            worker.start()
+        logging.info(f"Service {name} lancé")
+
+    def _run_thread(self, name, target):
+        thread = threading.current_thread()
+        # Les services qui acceptent stop_event s'arrêtent proprement à la désactivation
+        thread.stoppable = "stop_event" in inspect.signature(target).parameters
+        try:
+            if thread.stoppable:
+                target(stop_event=thread.stop_event)
+            else:
+                target()
+            error = "Thread terminé"
+        except Exception as e:
+            error = f"Thread mort : {e}"
+        self._on_exit(name, thread, error)
+
+    def _on_exit(self, name, worker, error):
+        """Fin d'un service : relance différée s'il est toujours voulu, dans la limite du budget"""
+        with self._lock:
+            if worker is not None and self._running.get(name) is not worker:
+                return
+            self._running.pop(name, None)
+            error = self._kill_reasons.pop(name, None) or error
+            if name not in self._wanted:
+                self.status[name]["status"] = "stopped"
+                return
+            if self.status[name]["status"] == "stopping":
+                # Réactivé pendant son arrêt : l'ancienne instance est finie, la nouvelle démarre
+                self._start(name)
+                return
+            now = time.monotonic()
+            if worker is not None and now - self._started_at.get(name, now) > STABLE_RUN:
+                self._failures[name] = 0
+            self._failures[name] = self._failures.get(name, 0) + 1
+            recent = [t for t in self._restart_times.get(name, []) if now - t < RESTART_WINDOW]
+            st = self.status[name]
+            st["last_error"] = error
+            if len(recent) >= RESTART_BUDGET:
+                st["status"] = "failed"
+                self._wanted.discard(name)
+                logging.error(f"Service {name} abandonné : {len(recent)} relances en "
+                              f"{RESTART_WINDOW / 60:.0f} min ({error})")
+                return
+            recent.append(now)
+            self._restart_times[name] = recent
+            delay = min(RESTART_MAX, RESTART_BASE * 2 ** (self._failures[name] - 1))
+            delay *= random.uniform(0.8, 1.2)
+            st["status"] = "crashed"
+            st["restarts"] += 1
+            logging.warning(f"Service {name} arrêté ({error}), relance dans {delay:.1f}s")
+            timer = threading.Timer(delay, self._restart, args=(name,))
+            timer.daemon = True
+            self._timers[name] = timer
+            timer.start()
+
+    def _restart(self, name):
+        with self._lock:
+            self._timers.pop(name, None)
+            self._start(name)
+
+    def _sample_loop(self):
+        while True:
+            time.sleep(SAMPLE_INTERVAL)
+            self.sample()
+
+    def sample(self):
+        """Mesure chaque service en cours et applique les limites souples"""
+        with self._lock:
+            running = dict(self._running)
+        for name, worker in running.items():
+            try:
+                sample = measure(worker)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue  # Fin du service entre-temps : l'événement de sortie s'en charge
+            if sample is None:
+                continue
+            history = self.history.setdefault(name, ResourceHistory())
+            history.add(sample)
+            self._check_limits(name, worker, history)
+
+    def _check_limits(self, name, worker, history):
+        limits = (config_store.get("service_limits") or {}).get(name)
+        if not isinstance(limits, dict):
+            return
+        last = history.samples[-1]
+        rates = history.rates()
+        exceeded = None
+        if "cpu_percent" in limits and rates and rates[-1][0] > limits["cpu_percent"]:
+            exceeded = f"CPU {rates[-1][0]:.0f} % > {limits['cpu_percent']} %"
+        elif "rss_mb" in limits and last["rss"] is not None and last["rss"] > limits["rss_mb"] * 2**20:
+            exceeded = f"RSS {last['rss'] / 2**20:.0f} Mo > {limits['rss_mb']} Mo"
+        elif "fds" in limits and last["fds"] is not None and last["fds"] > limits["fds"]:
+            exceeded = f"{last['fds']} descripteurs > {limits['fds']}"
+        if exceeded is None:
+            self._over_limit[name] = 0
+            return
+        self._over_limit[name] = self._over_limit.get(name, 0) + 1
+        if self._over_limit[name] < LIMIT_SAMPLES:
+            return
+        self._over_limit[name] = 0
+        if isinstance(worker, subprocess.Popen):
+            logging.warning(f"Service {name} hors limites ({exceeded}) : arrêt forcé puis relance")
+            with self._lock:
+                self._kill_reasons[name] = f"Limite dépassée : {exceeded}"
+            # La sortie est détectée par le thread d'attente, qui programme la relance
+            worker.kill()
+        else:
+            logging.warning(f"Service {name} hors limites ({exceeded}) ; un thread ne peut pas être arrêté")
+
+    def resource_report(self, name):
+        if not HAS_PSUTIL:
+            return "mesures indisponibles (psutil absent)"
+        history = self.history.get(name)
+        return history.summary() if history else "pas encore mesuré"
+
+    def shutdown(self):
+        """Arrête tous les services (fermeture de l'application)"""
+        with self._lock:
+            names = list(self._wanted)
+            workers = list(self._running.values())
+        for name in names:
+            self.disable(name)
+        for worker in workers:
+            if isinstance(worker, subprocess.Popen):
+                try:
+                    worker.wait(timeout=STOP_TIMEOUT)
+                except subprocess.TimeoutExpired:
+                    worker.kill()
+        service_loop.stop()
+
+
+supervisor = ServiceSupervisor()
+atexit.register(supervisor.shutdown)
+
+def start_service(name):
+    supervisor.enable(name)
+
+def stop_service(name):
+    supervisor.disable(name)
 
 def get_status_report():
     report = []
     for name, st in service_status.items():
         report.append(f"{name}: {st['status']} (restarts: {st['restarts']}, last_error: {st['last_error']})")
-    return "\n".join(report) 
\ No newline at end of file
+        report.append(f"    {supervisor.resource_report(name)}")
+    return "\n".join(report)
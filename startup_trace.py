@@ -0,0 +1,151 @@
+"""
+Traçage des phases de démarrage de Retrosoft
+Produit un fichier Chrome trace-event (chrome://tracing, Perfetto) par lancement
+"""
+
+import datetime
+import functools
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+TRACE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "traces")
+MAX_TRACE_FILES = 20
+
+
+class StartupTracer:
+    """Enregistre des spans (début, durée) et les exporte au format Chrome trace-event"""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.started_at = datetime.datetime.now()
+        self.events = []
+        self.metadata = {}
+        self.trace_path = None
+        self._lock = threading.Lock()
+        self._current_phase = None
+
+    def _now_us(self):
+        return (time.perf_counter() - self.origin) * 1_000_000
+
+    def _add(self, event):
+        event.setdefault("pid", os.getpid())
+        event.setdefault("tid", threading.get_ident())
+        with self._lock:
+            self.events.append(event)
+
+    @contextmanager
+    def span(self, name, category="startup", **args):
+        """Mesure la durée du bloc encadré"""
+        start = self._now_us()
+        try:
+            yield
+        finally:
+            self._add({"name": name, "cat": category, "ph": "X", "ts": start,
+                       "dur": self._now_us() - start, "args": args})
+
+    def begin(self, name, category="startup", **args):
+        """Span d'une opération asynchrone : retourne la fonction qui le termine
+        (à connecter par exemple au signal finished d'un QThread)"""
+        start = self._now_us()
+        tid = threading.get_ident()
+
+        def end(*_):
+            self._add({"name": name, "cat": category, "ph": "X", "ts": start,
+                       "dur": self._now_us() - start, "tid": tid, "args": args})
+        return end
+
+    def phase(self, name):
+        """Termine la phase en cours et en démarre une nouvelle (remplace les marqueurs de log)"""
+        logging.info(name)
+        self.end_phase()
+        self._current_phase = (name, self._now_us())
+
+    def end_phase(self):
+        if self._current_phase is None:
+            return
+        name, start = self._current_phase
+        self._current_phase = None
+        self._add({"name": name, "cat": "phase", "ph": "X", "ts": start, "dur": self._now_us() - start})
+
+    def mark(self, name, **args):
+        """Événement instantané (ex. premier loadFinished)"""
+        self._add({"name": name, "cat": "startup", "ph": "i", "s": "p", "ts": self._now_us(), "args": args})
+
+    def to_chrome_trace(self):
+        with self._lock:
+            events = list(self.events)
+        meta = [{"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": "Retrosoft"}}]
+        return {
+            "traceEvents": meta + events,
+            "displayTimeUnit": "ms",
+            "otherData": dict(self.metadata, started_at=self.started_at.isoformat()),
+        }
+
+    def write(self):
+        """Écrit (ou réécrit) le fichier de trace de ce lancement"""
+        try:
+            os.makedirs(TRACE_DIR, exist_ok=True)
+            if self.trace_path is None:
+                stamp = self.started_at.strftime("%Y%m%d_%H%M%S")
+                self.trace_path = os.path.join(TRACE_DIR, f"startup_{stamp}_{os.getpid()}.json")
+            with open(self.trace_path, "w", encoding="utf-8") as f:
+                json.dump(self.to_chrome_trace(), f)
+            for old in sorted(glob.glob(os.path.join(TRACE_DIR, "startup_*.json")))[:-MAX_TRACE_FILES]:
+                os.remove(old)
+        except Exception as e:
+            logging.warning(f"Écriture de la trace de démarrage impossible : {e}")
+        return self.trace_path
+
+    def durations(self):
+        """Liste (nom, durée en ms) des spans terminés, dans l'ordre de début"""
+        with self._lock:
+            spans = [e for e in self.events if e.get("ph") == "X"]
+        return [(e["name"], e["dur"] / 1000) for e in sorted(spans, key=lambda e: e["ts"])]
+
+    def summary(self):
+        """Résumé texte pour la fenêtre de diagnostic"""
+        lines = ["Démarrage (ms) :"]
+        for name, ms in self.durations():
+            lines.append(f"  {name} : {ms:.1f}")
+        previous = previous_trace_summary(self.trace_path)
+        if previous:
+            lines.append(f"Lancement précédent (v{previous['version']}) : {previous['total']:.1f} ms")
+        return "\n".join(lines)
+
+
+def previous_trace_summary(exclude=None):
+    """Version et durée de MainWindow.__init__ du dernier lancement tracé"""
+    paths = sorted(glob.glob(os.path.join(TRACE_DIR, "startup_*.json")))
+    paths = [p for p in paths if p != exclude]
+    if not paths:
+        return None
+    try:
+        with open(paths[-1], "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        return None
+    total = next((e["dur"] / 1000 for e in data.get("traceEvents", [])
+                  if e.get("name") == "MainWindow.__init__"), None)
+    if total is None:
+        return None
+    return {"version": data.get("otherData", {}).get("version", "?"), "total": total}
+
+
+# Traceur unique pour tout le processus
+tracer = StartupTracer()
+
+
+def traced(name):
+    """Décorateur : enregistre chaque appel de la fonction comme un span"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
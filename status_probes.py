@@ -0,0 +1,133 @@
+"""
+Sondes d'état non bloquantes pour la barre de statut de Retrosoft
+Chaque sonde tourne hors du thread GUI ; les résultats arrivent par signal Qt
+"""
+
+import logging
+import os
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from log_tail import find_last_line
+
+# États renvoyés par les sondes
+OK = "ok"
+DOWN = "down"
+PENDING = "pending"
+UNKNOWN = "unknown"
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def probe_internet(host="8.8.8.8", port=53, timeout=2):
+    """Connexion Internet : ouverture d'une socket vers un DNS public"""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return OK
+    except OSError:
+        return DOWN
+
+
+def probe_websocket(url="ws://localhost:8000/ws", timeout=2):
+    """Serveur de notifications : ouverture d'une connexion WebSocket"""
+    try:
+        import websocket
+        ws = websocket.create_connection(url, timeout=timeout)
+        ws.close()
+        return OK
+    except Exception:
+        return DOWN
+
+
+def probe_log_marker(filename, marker):
+    """Service journalisé : le marqueur apparaît-il dans les dernières lignes du log ?"""
+    log_path = os.path.join(APP_DIR, filename)
+    if not os.path.exists(log_path):
+        return PENDING
+    return OK if find_last_line(log_path, marker, 10) else PENDING
+
+
+class Probe:
+    """Sonde et son planning adaptatif"""
+
+    def __init__(self, name, func, interval, max_interval):
+        self.name = name
+        self.func = func
+        self.base_interval = interval
+        self.max_interval = max_interval
+        self.interval = interval
+        self.next_due = 0.0
+        self.running = False
+        self.failures = 0
+        self.state = None
+
+
+class StatusProbeEngine(QObject):
+    """Exécute les sondes en parallèle et n'émet state_changed que si l'état change"""
+
+    state_changed = pyqtSignal(str, str)  # nom de la sonde, nouvel état
+    _probe_done = pyqtSignal(str, str, bool)  # interne : nom, état, erreur
+
+    def __init__(self, parent=None, max_workers=4):
+        super().__init__(parent)
+        self.probes = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="status-probe")
+        self._probe_done.connect(self._on_probe_done)
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._tick)
+
+    def add_probe(self, name, func, interval=10, max_interval=60):
+        """Ajoute une sonde ; interval et max_interval en secondes"""
+        self.probes[name] = Probe(name, func, interval, max_interval)
+
+    def start(self):
+        self._tick()
+        self._timer.start(1000)
+
+    def stop(self):
+        self._timer.stop()
+        self._executor.shutdown(wait=False)
+
+    def refresh_now(self):
+        """Relance immédiatement toutes les sondes qui ne tournent pas déjà"""
+        for probe in self.probes.values():
+            probe.next_due = 0.0
+        self._tick()
+
+    def _tick(self):
+        now = time.monotonic()
+        for probe in self.probes.values():
+            if probe.running or now < probe.next_due:
+                continue
+            probe.running = True
+            self._executor.submit(self._run, probe)
+
+    def _run(self, probe):
+        # Thread de travail : aucun accès aux widgets ici
+        try:
+            state, error = probe.func(), False
+        except Exception as e:
+            logging.debug(f"Sonde {probe.name} en erreur : {e}")
+            state, error = UNKNOWN, True
+        self._probe_done.emit(probe.name, state, error)
+
+    def _on_probe_done(self, name, state, error):
+        probe = self.probes[name]
+        probe.running = False
+        if error:
+            # Erreur : backoff exponentiel
+            probe.failures += 1
+            probe.interval = min(probe.base_interval * 2 ** probe.failures, probe.max_interval)
+        elif state != probe.state:
+            # Changement : on revient à l'intervalle de base
+            probe.failures = 0
+            probe.interval = probe.base_interval
+        else:
+            # État stable : on espace les vérifications
+            probe.failures = 0
+            probe.interval = min(probe.interval * 1.5, probe.max_interval)
+        probe.next_due = time.monotonic() + probe.interval
+        if state != probe.state:
+            probe.state = state
+            self.state_changed.emit(name, state)
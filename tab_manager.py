@@ -0,0 +1,224 @@
+"""
+Onglets de Retrosoft et cycle de vie des onglets en arrière-plan
+Les onglets inactifs passent de Active à Frozen puis Discarded, du moins récemment
+utilisé au plus récent, selon leur ancienneté et la mémoire des processus de rendu ;
+un onglet abandonné ne se recharge que lorsqu'on y revient
+"""
+
+import importlib.util
+import logging
+import time
+from PyQt6.QtCore import QTimer, QUrl, pyqtSignal
+from PyQt6.QtWidgets import QTabWidget
+from PyQt6.QtWebEngineWidgets import QWebEngineView
+from PyQt6.QtWebEngineCore import QWebEnginePage
+from config_store import store as config_store
+from lazy_imports import LazyModule
+# Importé à la première mesure seulement (pas au démarrage du navigateur)
+HAS_PSUTIL = importlib.util.find_spec("psutil") is not None
+psutil = LazyModule("psutil")
+
+ACTIVE = QWebEnginePage.LifecycleState.Active
+FROZEN = QWebEnginePage.LifecycleState.Frozen
+DISCARDED = QWebEnginePage.LifecycleState.Discarded
+
+# Valeurs par défaut des clés de config.json (0 désactive la règle)
+FREEZE_AFTER = 300        # tab_freeze_after_s : gel après 5 min en arrière-plan
+DISCARD_AFTER = 1800      # tab_discard_after_s : abandon après 30 min
+MEMORY_BUDGET_MB = 1024   # tab_memory_budget_mb : au-delà, abandon des onglets les plus anciens
+CHECK_INTERVAL_MS = 10000
+TITLE_LENGTH = 28
+
+STATE_NAMES = {ACTIVE: "actif", FROZEN: "gelé", DISCARDED: "abandonné"}
+
+
+def plan_lifecycle(tabs, now, freeze_after, discard_after, budget=0, total=0):
+    """Transitions à appliquer aux onglets en arrière-plan
+
+    tabs : [(clé, état, dernière activation, mémoire estimée, audible)]
+    Retourne [(clé, nouvel état)] ; les onglets qui jouent du son ne sont pas touchés.
+    """
+    plan = {}
+    candidates = sorted((tab for tab in tabs if not tab[4]), key=lambda tab: tab[2])
+    for key, state, last_active, _, _ in candidates:
+        idle = now - last_active
+        if discard_after > 0 and idle >= discard_after and state != DISCARDED:
+            plan[key] = DISCARDED
+        elif freeze_after > 0 and idle >= freeze_after and state == ACTIVE:
+            plan[key] = FROZEN
+    # Mémoire : abandon du moins récemment utilisé jusqu'à repasser sous le budget
+    if budget > 0:
+        total -= sum(tab[3] for tab in candidates if plan.get(tab[0]) == DISCARDED)
+        for key, state, _, memory, _ in candidates:
+            if total <= budget:
+                break
+            if state != DISCARDED and plan.get(key) != DISCARDED and memory > 0:
+                plan[key] = DISCARDED
+                total -= memory
+    return list(plan.items())
+
+
+class BrowserView(QWebEngineView):
+    """Vue d'un onglet ; les liens « nouvelle fenêtre » s'ouvrent dans un onglet"""
+
+    def __init__(self, tabs):
+        super().__init__()
+        self.tabs = tabs
+        if tabs.profile is not None:
+            # Page du profil persistant (cache disque et cookies), détruite avec la vue
+            self.setPage(QWebEnginePage(tabs.profile, self))
+        self.last_active = time.monotonic()
+        self.tab_title = "Nouvel onglet"
+
+    def createWindow(self, window_type):
+        background = window_type == QWebEnginePage.WebWindowType.WebBrowserBackgroundTab
+        return self.tabs.new_tab(background=background)
+
+
+class TabManager(QTabWidget):
+    """Onglets de la fenêtre principale et politique de gel / abandon"""
+
+    current_url_changed = pyqtSignal(QUrl)
+
+    def __init__(self, home_url, profile=None, parent=None):
+        super().__init__(parent)
+        self.home_url = home_url
+        self.profile = profile
+        self.setTabsClosable(True)
+        self.setMovable(True)
+        self.setDocumentMode(True)
+        self.tabCloseRequested.connect(self.close_tab)
+        self.currentChanged.connect(self._on_current_changed)
+        self._previous = None
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.apply_policy)
+        self.timer.start(CHECK_INTERVAL_MS)
+
+    def current_view(self):
+        return self.currentWidget()
+
+    def views(self):
+        return [self.widget(i) for i in range(self.count())]
+
+    def new_tab(self, url=None, background=False):
+        """Ouvre un onglet (page d'accueil par défaut) ; retourne sa vue"""
+        view = BrowserView(self)
+        page = view.page()
+        view.titleChanged.connect(lambda title: self._on_title_changed(view, title))
+        view.iconChanged.connect(lambda icon: self.setTabIcon(self.indexOf(view), icon))
+        view.urlChanged.connect(lambda q: self._on_url_changed(view, q))
+        page.lifecycleStateChanged.connect(lambda state: self._update_label(view))
+        if url is not None:
+            view.setUrl(url if isinstance(url, QUrl) else QUrl(url))
+        elif not background:
+            view.setUrl(self.home_url)
+        index = self.insertTab(self.currentIndex() + 1, view, view.tab_title)
+        if not background:
+            self.setCurrentIndex(index)
+        return view
+
+    def close_tab(self, index):
+        view = self.widget(index)
+        if view is None:
+            return
+        if self.count() == 1:
+            # Toujours au moins un onglet : le dernier revient à l'accueil
+            view.setUrl(self.home_url)
+            return
+        if view is self._previous:
+            self._previous = None
+        self.removeTab(index)
+        view.deleteLater()
+
+    def close_current_tab(self):
+        self.close_tab(self.currentIndex())
+
+    def _on_current_changed(self, index):
+        now = time.monotonic()
+        if self._previous is not None:
+            self._previous.last_active = now
+        view = self.widget(index)
+        self._previous = view
+        if view is None:
+            return
+        view.last_active = now
+        if view.page().lifecycleState() != ACTIVE:
+            # Un onglet abandonné recharge sa page à ce moment seulement
+            logging.debug(f"Onglet réactivé ({STATE_NAMES.get(view.page().lifecycleState())}) : {view.url().toString()}")
+            view.page().setLifecycleState(ACTIVE)
+        self.current_url_changed.emit(view.url())
+
+    def _on_url_changed(self, view, q):
+        if view is self.currentWidget():
+            self.current_url_changed.emit(q)
+
+    def _on_title_changed(self, view, title):
+        if title:
+            view.tab_title = title
+        self._update_label(view)
+
+    def _update_label(self, view):
+        index = self.indexOf(view)
+        if index < 0:
+            return
+        state = view.page().lifecycleState()
+        title = view.tab_title
+        if len(title) > TITLE_LENGTH:
+            title = title[:TITLE_LENGTH - 1] + "…"
+        self.setTabText(index, ("💤 " if state == DISCARDED else "") + title)
+        self.setTabToolTip(index, f"{view.tab_title}\n{view.url().toString()}\nÉtat : {STATE_NAMES.get(state, '?')}")
+
+    # --- Cycle de vie ----------------------------------------------------
+
+    def renderer_memory(self):
+        """{vue: mémoire estimée} : RSS de chaque processus de rendu, réparti entre ses onglets"""
+        if not HAS_PSUTIL:
+            return {}
+        by_pid = {}
+        for view in self.views():
+            pid = view.page().renderProcessPid()
+            if pid > 0:
+                by_pid.setdefault(pid, []).append(view)
+        memory = {}
+        for pid, views in by_pid.items():
+            try:
+                rss = psutil.Process(pid).memory_info().rss
+            except psutil.Error:
+                continue
+            for view in views:
+                memory[view] = rss // len(views)
+        return memory
+
+    def apply_policy(self, freeze_after=None, discard_after=None, budget_mb=None):
+        """Gèle ou abandonne les onglets en arrière-plan (minuterie, thread GUI)
+
+        Les seuils non fournis viennent de config.json.
+        """
+        if freeze_after is None:
+            freeze_after = config_store.get_float("tab_freeze_after_s", FREEZE_AFTER)
+        if discard_after is None:
+            discard_after = config_store.get_float("tab_discard_after_s", DISCARD_AFTER)
+        if budget_mb is None:
+            budget_mb = config_store.get_float("tab_memory_budget_mb", MEMORY_BUDGET_MB)
+        current = self.currentWidget()
+        memory = self.renderer_memory()
+        tabs = [(view, view.page().lifecycleState(), view.last_active, memory.get(view, 0),
+                 view.page().recentlyAudible())
+                for view in self.views() if view is not current]
+        plan = plan_lifecycle(tabs, time.monotonic(), freeze_after, discard_after,
+                              budget=budget_mb * 2**20, total=sum(memory.values()))
+        for view, state in plan:
+            logging.debug(f"Onglet {STATE_NAMES[state]} : {view.url().toString()}")
+            view.page().setLifecycleState(state)
+        return plan
+
+    def lifecycle_report(self):
+        """Résumé pour le diagnostic"""
+        counts = {name: 0 for name in STATE_NAMES.values()}
+        for view in self.views():
+            counts[STATE_NAMES.get(view.page().lifecycleState(), "actif")] += 1
+        text = f"Onglets : {self.count()} ({', '.join(f'{n} {name}' for name, n in counts.items())})"
+        memory = self.renderer_memory()
+        if memory:
+            text += f", rendu {sum(memory.values()) / 2**20:.0f} Mo"
+        return text
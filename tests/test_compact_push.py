@@ -0,0 +1,33 @@
+import pytest
+
+pytest.importorskip("fastapi")
+from notifier_server import compact_push
+
+
+def test_compact_push_keeps_commit_and_files():
+    data = {
+        "ref": "refs/heads/main",
+        "after": "c" * 40,
+        "commits": [{"added": ["a.py"], "modified": ["b.py"], "removed": []}],
+        "repository": {"full_name": "qjslk/navigateur-rapide"},
+        "pusher": {"name": "qjslk"},
+    }
+    assert compact_push(data) == {"type": "update", "ref": "refs/heads/main", "commit": "c" * 40,
+                                  "files": {"a.py": None, "b.py": None}, "removed": []}
+
+
+def test_compact_push_follows_commit_order():
+    data = {"after": "d" * 40, "commits": [
+        {"added": ["x.py"], "modified": [], "removed": ["y.py"]},
+        {"added": ["y.py"], "modified": [], "removed": ["x.py"]},
+        {"added": [], "modified": [], "removed": ["z.py"]},
+    ]}
+    message = compact_push(data)
+    # x.py ajouté puis supprimé, y.py supprimé puis recréé
+    assert message["files"] == {"y.py": None}
+    assert message["removed"] == ["x.py", "z.py"]
+
+
+def test_compact_push_without_commits():
+    assert compact_push({"ref": "refs/heads/main"}) == {
+        "type": "update", "ref": "refs/heads/main", "commit": None, "files": {}, "removed": []}
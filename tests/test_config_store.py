@@ -0,0 +1,117 @@
+import json
+import os
+
+import pytest
+
+import config_store
+from config_store import ConfigStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"theme": "sombre", "zoom": "1.5"}), encoding="utf-8")
+    return str(path)
+
+
+def write_external(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    # Date de modification distincte même sur un système de fichiers à faible résolution
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def test_typed_getters(path):
+    store = ConfigStore(path)
+    assert store.get_str("theme") == "sombre"
+    assert store.get_float("zoom") == 1.5
+    assert store.get_int("absent", 3) == 3
+    store.update({"flag": "oui", "n": True})
+    assert store.get_bool("flag") is True
+    assert store.get_int("n", 7) == 7
+
+
+def test_reads_come_from_memory(path, monkeypatch):
+    store = ConfigStore(path)
+    write_external(path, {"theme": "clair"})
+    # Vérification du fichier au plus une fois par CHECK_INTERVAL
+    monkeypatch.setattr(config_store, "CHECK_INTERVAL", 3600)
+    assert store.get("theme") == "sombre"
+    monkeypatch.setattr(config_store, "CHECK_INTERVAL", 0)
+    assert store.get("theme") == "clair"
+
+
+def test_external_change_notifies_subscribers(path):
+    store = ConfigStore(path)
+    keyed, everything = [], []
+    store.subscribe("theme", lambda new, old: keyed.append((new, old)))
+    store.subscribe("zoom", lambda new, old: keyed.append(("zoom", new)))
+    store.subscribe_all(lambda new, old: everything.append(new))
+    write_external(path, {"theme": "clair", "zoom": "1.5"})
+    assert store.check() is True
+    assert keyed == [("clair", "sombre")]
+    assert everything == [{"theme": "clair", "zoom": "1.5"}]
+    # Fichier inchangé : ni relecture ni notification
+    assert store.check() is False
+    assert len(everything) == 1
+
+
+def test_writes_are_coalesced_and_not_reread(path):
+    store = ConfigStore(path, write_delay=3600)
+    calls = []
+    store.subscribe("theme", lambda new, old: calls.append(new))
+    store.set("theme", "clair")
+    store.set("theme", "bleu")
+    assert calls == ["clair", "bleu"]
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["theme"] == "sombre"  # Écriture encore en attente
+    store.flush()
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["theme"] == "bleu"
+    # Notre propre écriture n'est pas un changement externe
+    assert store.check() is False
+    assert calls == ["clair", "bleu"]
+
+
+def test_pending_write_wins_over_disk(path):
+    store = ConfigStore(path, write_delay=3600)
+    store.set("theme", "clair")
+    write_external(path, {"theme": "externe"})
+    assert store.check() is False
+    assert store.get("theme") == "clair"
+    store.flush()
+
+
+def test_unsubscribe_and_failing_callback(path):
+    store = ConfigStore(path, write_delay=3600)
+    calls = []
+
+    def failing(new, old):
+        raise RuntimeError("abonné en erreur")
+
+    def callback(new, old):
+        calls.append(new)
+
+    store.subscribe("theme", failing)
+    store.subscribe("theme", callback)
+    store.set("theme", "clair")
+    assert calls == ["clair"]
+    store.unsubscribe(callback)
+    store.set("theme", "bleu")
+    assert calls == ["clair"]
+    store.flush()
+
+
+def test_invalid_file_keeps_previous_config(path):
+    store = ConfigStore(path)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{incomplet")
+    assert store.check() is False
+    assert store.get("theme") == "sombre"
+
+
+def test_missing_file(tmp_path):
+    store = ConfigStore(str(tmp_path / "absent.json"))
+    assert not store.exists()
+    assert store.snapshot() == {}
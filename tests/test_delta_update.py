@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+import delta_update
+from delta_update import DeltaError, apply_delta, create_delta, read_header
+
+
+def sample_pair(seed=0, size=200_000):
+    rng = random.Random(seed)
+    old = bytes(rng.getrandbits(8) for _ in range(size))
+    new = bytearray(old)
+    # Insertion, suppression et réécriture : les blocs ne sont plus alignés
+    new[5000:5000] = b"insertion" * 100
+    del new[60_000:61_234]
+    new[120_000:130_000] = bytes(rng.getrandbits(8) for _ in range(10_000))
+    return old, bytes(new) + b"fin"
+
+
+def round_trip(tmp_path, old, new, block_size=1024):
+    (tmp_path / "old").write_bytes(old)
+    delta = create_delta(old, new, block_size)
+    (tmp_path / "patch").write_bytes(delta)
+    sha = apply_delta(str(tmp_path / "old"), str(tmp_path / "patch"), str(tmp_path / "new"))
+    assert (tmp_path / "new").read_bytes() == new
+    assert read_header(str(tmp_path / "patch"))[3] == sha
+    return delta
+
+
+def test_round_trip_shifted_content(tmp_path):
+    old, new = sample_pair()
+    delta = round_trip(tmp_path, old, new)
+    # L'essentiel est copié depuis l'ancien fichier
+    assert len(delta) < len(new) // 5
+
+
+@pytest.mark.parametrize("old, new", [
+    (b"", b"tout nouveau"),
+    (b"ancien contenu", b""),
+    (b"court", b"court"),
+    (b"x" * 5000, b"x" * 5001),
+])
+def test_round_trip_edge_cases(tmp_path, old, new):
+    round_trip(tmp_path, old, new)
+
+
+def test_pure_python_scan_gives_same_delta(monkeypatch):
+    pytest.importorskip("numpy")
+    old, new = sample_pair(seed=1, size=50_000)
+    vectorized = create_delta(old, new, 512)
+    monkeypatch.setattr(delta_update, "_numpy_index", lambda old, block_size: None)
+    assert create_delta(old, new, 512) == vectorized
+
+
+@pytest.mark.parametrize("chunk", [1000, 1 << 20])
+def test_window_keys_match_weak_hash(monkeypatch, chunk):
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(delta_update, "_CHUNK", chunk)
+    data = bytes(random.Random(2).getrandbits(8) for _ in range(3000))
+    keys = [key for _, chunk in delta_update._window_keys(data, 64) for key in chunk.tolist()]
+    assert len(keys) == len(data) - 64 + 1
+    for i in (0, 1, 999, 1000, 2500, len(data) - 64):
+        a, b = delta_update._weak_hash(data[i:i + 64])
+        assert keys[i] == (b << 16) | a
+
+
+def test_wrong_base_is_refused(tmp_path):
+    old, new = sample_pair(size=20_000)
+    (tmp_path / "patch").write_bytes(create_delta(old, new, 1024))
+    (tmp_path / "old").write_bytes(old[:-1] + b"?")
+    with pytest.raises(DeltaError):
+        apply_delta(str(tmp_path / "old"), str(tmp_path / "patch"), str(tmp_path / "new"))
+
+
+def test_corrupt_delta_is_refused(tmp_path):
+    (tmp_path / "patch").write_bytes(b"PASUNDELTA" + bytes(100))
+    with pytest.raises(DeltaError):
+        read_header(str(tmp_path / "patch"))
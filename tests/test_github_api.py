@@ -0,0 +1,77 @@
+import pytest
+
+import github_api
+import github_standin
+
+
+@pytest.fixture
+def standin(tmp_path, monkeypatch):
+    repo = tmp_path / "depot"
+    repo.mkdir()
+    (repo / "navigateur.py").write_bytes(b"print('v1')\n")
+    server = github_standin.serve(str(repo), port=0)
+    monkeypatch.setenv("RETROSOFT_GITHUB_API", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setattr(github_api, "etag_cache", github_api.ETagCache(str(tmp_path / "cache.json")))
+    monkeypatch.setattr(github_standin.StandinHandler, "counts", {})
+    monkeypatch.setattr(github_standin.StandinHandler, "rate_used", 0)
+    yield repo
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def sent_headers(monkeypatch):
+    """En-têtes de chaque requête envoyée par la session partagée"""
+    session = github_api.get_session()
+    sent = []
+    original = session.get
+
+    def get(url, headers=None, **kwargs):
+        sent.append(dict(headers or {}))
+        response = original(url, headers=headers, **kwargs)
+        sent[-1]["status"] = response.status_code
+        return response
+    monkeypatch.setattr(session, "get", get)
+    return sent
+
+
+def test_unchanged_tree_is_revalidated_with_304(standin, sent_headers):
+    first = github_api.fetch_tree("owner/repo")
+    second = github_api.fetch_tree("owner/repo")
+    assert second == first
+    assert first["navigateur.py"]["sha"] == github_api.git_blob_sha(b"print('v1')\n")
+    assert "If-None-Match" not in sent_headers[0]
+    assert sent_headers[1]["If-None-Match"]
+    assert [h["status"] for h in sent_headers] == [200, 304]
+    assert github_standin.StandinHandler.counts == {"tree": 2, "200": 1, "304": 1}
+
+
+def test_get_json_cached_returns_cached_body_on_304(standin):
+    url = f"{github_api.get_api_base()}/repos/owner/repo/git/trees/main?recursive=1"
+    data, from_cache = github_api.get_json_cached(url)
+    assert not from_cache
+    cached, from_cache = github_api.get_json_cached(url)
+    assert from_cache and cached == data
+
+
+def test_changed_tree_is_downloaded_again(standin):
+    github_api.fetch_tree("owner/repo")
+    (standin / "navigateur.py").write_bytes(b"print('v2')\n")
+    tree = github_api.fetch_tree("owner/repo")
+    assert tree["navigateur.py"]["sha"] == github_api.git_blob_sha(b"print('v2')\n")
+    assert github_standin.StandinHandler.counts["200"] == 2
+
+
+def test_304_still_counts_against_quota(standin):
+    github_api.fetch_tree("owner/repo")
+    before = github_api.get_rate_limit()["remaining"]
+    github_api.fetch_tree("owner/repo")
+    assert github_api.get_rate_limit()["remaining"] == before - 1
+
+
+def test_commit_tree_is_not_cached(standin, sent_headers):
+    sha = "a" * 40
+    github_api.fetch_tree("owner/repo", sha)
+    github_api.fetch_tree("owner/repo", sha)
+    assert all("If-None-Match" not in h for h in sent_headers)
+    assert github_api.etag_cache.get(f"{github_api.get_api_base()}/repos/owner/repo/git/trees/{sha}?recursive=1") is None
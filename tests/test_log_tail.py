@@ -0,0 +1,121 @@
+import os
+
+import pytest
+from PyQt6.QtCore import QCoreApplication
+
+import log_tail
+
+
+def write(path, text):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+
+
+def test_tail_lines_last_n(tmp_path):
+    path = tmp_path / "app.log"
+    write(path, "".join(f"ligne {i}\n" for i in range(100)))
+    assert log_tail.tail_lines(str(path), 3) == ["ligne 97", "ligne 98", "ligne 99"]
+
+
+def test_tail_lines_spans_several_blocks(tmp_path):
+    path = tmp_path / "app.log"
+    write(path, "".join(f"ligne {i}\n" for i in range(1000)))
+    lines = log_tail.tail_lines(str(path), 50, block_size=16)
+    assert lines == [f"ligne {i}" for i in range(950, 1000)]
+
+
+def test_tail_lines_short_file_and_missing_newline(tmp_path):
+    path = tmp_path / "app.log"
+    write(path, "a\nb\nc")
+    assert log_tail.tail_lines(str(path), 10) == ["a", "b", "c"]
+
+
+def test_tail_lines_missing_file(tmp_path):
+    assert log_tail.tail_lines(str(tmp_path / "absent.log")) == []
+
+
+def test_tail_lines_sees_appended_lines(tmp_path):
+    path = tmp_path / "app.log"
+    write(path, "a\nb\n")
+    assert log_tail.tail_lines(str(path), 2) == ["a", "b"]
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("c\n")
+    # La taille change : le cache ne doit pas resservir l'ancien résultat
+    assert log_tail.tail_lines(str(path), 2) == ["b", "c"]
+
+
+def test_tail_lines_result_is_a_copy(tmp_path):
+    path = tmp_path / "app.log"
+    write(path, "a\nb\n")
+    log_tail.tail_lines(str(path), 2).append("modifié")
+    assert log_tail.tail_lines(str(path), 2) == ["a", "b"]
+
+
+def test_find_last_line(tmp_path):
+    path = tmp_path / "app.log"
+    write(path, "INFO un\nERROR deux\nINFO trois\n")
+    assert log_tail.find_last_line(str(path), "ERROR") == "ERROR deux"
+    assert log_tail.find_last_line(str(path), "CRITICAL") is None
+
+
+@pytest.fixture
+def tailer(tmp_path):
+    app = QCoreApplication.instance() or QCoreApplication([])
+    tailer = log_tail.LogTailer(str(tmp_path / "app.log"), initial_bytes=10)
+    emitted = []
+    tailer.lines_appended.connect(lambda lines: emitted.append(lines))
+    tailer.reset.connect(lambda: emitted.append("reset"))
+    tailer.emitted = emitted
+    yield tailer
+    tailer.stop()
+    app.processEvents()
+
+
+def append(path, text):
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        f.write(text)
+
+
+def test_log_tailer_starts_at_the_end(tailer):
+    write(tailer.path, "ligne longue 1\nligne 2\n")
+    tailer.poll()
+    # Seuls les 10 derniers octets sont lus ; la ligne coupée est ignorée
+    assert tailer.emitted == [["ligne 2"]]
+
+
+def test_log_tailer_follows_appends_and_partial_lines(tailer):
+    write(tailer.path, "a\n")
+    tailer.poll()
+    append(tailer.path, "b\r\nc\npar")
+    tailer.poll()
+    tailer.poll()  # Rien de nouveau : pas d'émission
+    append(tailer.path, "tiel\n")
+    tailer.poll()
+    assert tailer.emitted == [["a"], ["b", "c"], ["partiel"]]
+    assert tailer.offset == os.path.getsize(tailer.path)
+
+
+def test_log_tailer_resets_on_truncation(tailer):
+    write(tailer.path, "a\nb\n")
+    tailer.poll()
+    append(tailer.path, "incomplet")
+    tailer.poll()
+    write(tailer.path, "x\n")
+    tailer.poll()
+    # La ligne incomplète de l'ancien contenu n'est pas recollée au nouveau
+    assert tailer.emitted == [["a", "b"], "reset", ["x"]]
+
+
+def test_log_tailer_resets_on_rotation(tailer, tmp_path):
+    write(tailer.path, "a\n")
+    tailer.poll()
+    rotated = tmp_path / "nouveau.log"
+    write(rotated, "b\nc\nd\n")
+    os.replace(rotated, tailer.path)
+    tailer.poll()
+    assert tailer.emitted == [["a"], "reset", ["b", "c", "d"]]
+
+
+def test_log_tailer_waits_for_missing_file(tailer):
+    tailer.poll()
+    assert tailer.emitted == [] and tailer.offset is None
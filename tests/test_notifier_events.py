@@ -0,0 +1,93 @@
+import json
+
+from notifier_events import EventLog
+
+
+def test_append_numbers_messages():
+    log = EventLog(size=4)
+    text = log.append('{"type":"update"}')
+    assert json.loads(text) == {"seq": 1, "epoch": log.epoch, "type": "update"}
+    assert log.seq == 1
+
+
+def test_since_replays_missed_events():
+    log = EventLog(size=4)
+    texts = [log.append('{"n":%d}' % i) for i in range(3)]
+    assert log.since(log.epoch, 0) == texts
+    assert log.since(log.epoch, 1) == texts[1:]
+    assert log.since(log.epoch, 3) == []
+
+
+def test_since_other_epoch_needs_resync():
+    log = EventLog(size=4)
+    log.append('{"n":1}')
+    assert log.since("autre", 0) is None
+
+
+def test_since_future_seq_needs_resync():
+    log = EventLog(size=4)
+    log.append('{"n":1}')
+    assert log.since(log.epoch, 5) is None
+
+
+def test_since_gap_older_than_ring_needs_resync():
+    log = EventLog(size=2)
+    texts = [log.append('{"n":%d}' % i) for i in range(5)]
+    # L'anneau ne garde que 4 et 5 : depuis 3 c'est encore couvert, depuis 2 non
+    assert log.since(log.epoch, 3) == texts[3:]
+    assert log.since(log.epoch, 2) is None
+
+
+def test_reload_keeps_epoch_and_seq(tmp_path):
+    path = str(tmp_path / "events.log")
+    log = EventLog(size=4, path=path)
+    texts = [log.append('{"n":%d}' % i) for i in range(3)]
+    log.close()
+    reloaded = EventLog(size=4, path=path)
+    assert (reloaded.epoch, reloaded.seq) == (log.epoch, 3)
+    assert reloaded.since(log.epoch, 1) == texts[1:]
+
+
+def test_reload_skips_truncated_last_line(tmp_path):
+    path = tmp_path / "events.log"
+    log = EventLog(size=4, path=str(path))
+    log.append('{"n":1}')
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"seq":2,"epo')
+    log.close()
+    reloaded = EventLog(size=4, path=str(path))
+    assert reloaded.seq == 1
+
+
+def test_disk_log_is_compacted(tmp_path):
+    path = tmp_path / "events.log"
+    log = EventLog(size=2, path=str(path))
+    for i in range(10):
+        log.append('{"n":%d}' % i)
+    assert len(path.read_text(encoding="utf-8").splitlines()) <= 2 * 2 + 1
+    log.close()
+    assert EventLog(size=2, path=str(path)).since(log.epoch, 8) == log.since(log.epoch, 8)
+
+
+def test_append_after_truncated_line_is_kept(tmp_path):
+    path = tmp_path / "events.log"
+    log = EventLog(size=4, path=str(path))
+    log.append('{"n":1}')
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"seq":2,"epo')
+    log.close()  # Arrêt brutal du premier processus
+    reloaded = EventLog(size=4, path=str(path))
+    text = reloaded.append('{"n":2}')
+    reloaded.close()
+    assert EventLog(size=4, path=str(path)).since(log.epoch, 1) == [text]
+
+
+def test_shared_path_is_refused(tmp_path):
+    path = str(tmp_path / "events.log")
+    first = EventLog(size=4, path=path)
+    second = EventLog(size=4, path=path)
+    assert first.path == path
+    assert second.path is None
+    second.append('{"n":1}')
+    assert EventLog(size=4, path=path).path is None
+    assert not (tmp_path / "events.log").exists()
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+import notifier_client
+import notifier_server
+
+
+class StalledSocket:
+    """WebSocket dont l'envoi ne se termine jamais"""
+
+    async def send_text(self, text):
+        await asyncio.Event().wait()
+
+    async def close(self, code=1000):
+        pass
+
+
+def overflow(count):
+    """Diffuse count événements à un client bloqué ; retourne ce qui reste dans sa file"""
+    async def run():
+        client = notifier_server.ClientConnection(StalledSocket())
+        await asyncio.sleep(0)  # Le premier message reste bloqué dans send_text
+        sent = [notifier_server.event_log.append('{"type":"update","files":{"f%d.py":null}}' % i)
+                for i in range(count)]
+        for text in sent:
+            client.offer(text)
+        queued = []
+        while not client.queue.empty():
+            queued.append(client.queue.get_nowait())
+        client.task.cancel()
+        return sent, queued
+    return asyncio.run(run())
+
+
+def test_overflow_queues_resync_marker(monkeypatch):
+    monkeypatch.setattr(notifier_server, "SLOW_CLIENT_POLICY", "drop_oldest")
+    size = notifier_server.SEND_QUEUE_SIZE
+    sent, queued = overflow(size + 5)
+    assert len(queued) <= size
+    assert queued[-2] == sent[-1]
+    assert '"type":"resync"' in queued[-1]
+
+
+def test_client_resyncs_after_overflow(monkeypatch):
+    monkeypatch.setattr(notifier_server, "SLOW_CLIENT_POLICY", "drop_oldest")
+    added = []
+    monkeypatch.setattr(notifier_client.coalescer, "add", added.append)
+    monkeypatch.setitem(notifier_client.last_position, "epoch", None)
+    monkeypatch.setitem(notifier_client.last_position, "seq", None)
+    sent, queued = overflow(notifier_server.SEND_QUEUE_SIZE + 5)
+    # Le client a reçu le premier message (celui dont l'envoi était en cours), puis sa file
+    for text in sent[:1] + queued:
+        notifier_client.on_message(None, text)
+    assert {"type": "update"} in added
+    assert notifier_client.last_position["seq"] == notifier_server.event_log.seq
+
+
+def test_client_detects_sequence_gap(monkeypatch):
+    added = []
+    monkeypatch.setattr(notifier_client.coalescer, "add", added.append)
+    monkeypatch.setitem(notifier_client.last_position, "epoch", "e")
+    monkeypatch.setitem(notifier_client.last_position, "seq", 3)
+    notifier_client.on_message(None, '{"seq":4,"epoch":"e","type":"update","files":{}}')
+    assert added == [{"seq": 4, "epoch": "e", "type": "update", "files": {}}]
+    notifier_client.on_message(None, '{"seq":6,"epoch":"e","type":"update","files":{}}')
+    assert added[-2:] == [{"type": "update"}, {"seq": 6, "epoch": "e", "type": "update", "files": {}}]
@@ -0,0 +1,59 @@
+import pytest
+
+# QtWebEngine absent ou inutilisable (bibliothèques système manquantes) : tests ignorés
+tab_manager = pytest.importorskip("tab_manager", exc_type=ImportError)
+from tab_manager import ACTIVE, DISCARDED, FROZEN, plan_lifecycle
+
+NOW = 10_000.0
+MB = 2**20
+
+
+def tab(key, state=ACTIVE, idle=0, memory=0, audible=False):
+    return key, state, NOW - idle, memory, audible
+
+
+def test_recent_tabs_untouched():
+    assert plan_lifecycle([tab("a", idle=10)], NOW, freeze_after=300, discard_after=1800) == []
+
+
+def test_freeze_then_discard_by_age():
+    tabs = [tab("gel", idle=400), tab("abandon", idle=2000), tab("déjà", FROZEN, idle=400)]
+    assert dict(plan_lifecycle(tabs, NOW, 300, 1800)) == {"gel": FROZEN, "abandon": DISCARDED}
+
+
+def test_frozen_tab_is_discarded_later():
+    assert plan_lifecycle([tab("a", FROZEN, idle=2000)], NOW, 300, 1800) == [("a", DISCARDED)]
+
+
+def test_discarded_tab_stays_discarded():
+    assert plan_lifecycle([tab("a", DISCARDED, idle=5000)], NOW, 300, 1800) == []
+
+
+def test_zero_disables_rules():
+    assert plan_lifecycle([tab("a", idle=5000)], NOW, 0, 0) == []
+    assert plan_lifecycle([tab("a", idle=5000)], NOW, 300, 0) == [("a", FROZEN)]
+
+
+def test_audible_tab_is_kept():
+    assert plan_lifecycle([tab("musique", idle=5000, audible=True)], NOW, 300, 1800) == []
+
+
+def test_memory_budget_discards_least_recently_used():
+    tabs = [tab("récent", idle=5, memory=300 * MB), tab("vieux", idle=60, memory=300 * MB),
+            tab("moyen", idle=30, memory=300 * MB)]
+    plan = plan_lifecycle(tabs, NOW, 0, 0, budget=700 * MB, total=900 * MB)
+    assert plan == [("vieux", DISCARDED)]
+    plan = plan_lifecycle(tabs, NOW, 0, 0, budget=250 * MB, total=900 * MB)
+    assert plan == [("vieux", DISCARDED), ("moyen", DISCARDED), ("récent", DISCARDED)]
+
+
+def test_age_discards_count_towards_budget():
+    tabs = [tab("ancien", idle=5000, memory=500 * MB), tab("récent", idle=5, memory=300 * MB)]
+    plan = plan_lifecycle(tabs, NOW, 300, 1800, budget=400 * MB, total=800 * MB)
+    assert plan == [("ancien", DISCARDED)]
+
+
+def test_budget_skips_tabs_without_measure():
+    tabs = [tab("inconnu", idle=60), tab("mesuré", idle=30, memory=600 * MB)]
+    plan = plan_lifecycle(tabs, NOW, 0, 0, budget=500 * MB, total=600 * MB)
+    assert plan == [("mesuré", DISCARDED)]
@@ -0,0 +1,73 @@
+import os
+
+from github_api import git_blob_sha
+from update_manifest import UpdateManifest
+
+
+def write(root, name, data):
+    with open(os.path.join(root, name), "wb") as f:
+        f.write(data)
+
+
+def test_changed_files_against_remote_tree(tmp_path):
+    write(tmp_path, "a.py", b"print('a')\n")
+    write(tmp_path, "b.py", b"print('b')\n")
+    manifest = UpdateManifest(str(tmp_path))
+    remote = {
+        "a.py": {"sha": git_blob_sha(b"print('a')\n")},
+        "b.py": {"sha": git_blob_sha(b"print('b2')\n")},
+        "c.py": {"sha": git_blob_sha(b"nouveau\n")},
+    }
+    # b.py diffère, c.py n'existe pas en local ; d.py est absent de l'arbre distant
+    assert manifest.changed_files(remote, ["a.py", "b.py", "c.py", "d.py"]) == ["b.py", "c.py"]
+
+
+def test_manifest_is_persisted(tmp_path):
+    write(tmp_path, "a.py", b"x")
+    UpdateManifest(str(tmp_path)).refresh(["a.py"])
+    reloaded = UpdateManifest(str(tmp_path))
+    assert reloaded.sha("a.py") == git_blob_sha(b"x")
+
+
+def test_unchanged_file_is_not_rehashed(tmp_path, monkeypatch):
+    write(tmp_path, "a.py", b"x")
+    manifest = UpdateManifest(str(tmp_path))
+    manifest.refresh(["a.py"])
+    hashed = []
+    monkeypatch.setattr("update_manifest.git_blob_sha", lambda data: hashed.append(data) or "sha")
+    manifest.refresh(["a.py"])
+    assert hashed == []
+
+
+def test_modified_file_is_rehashed(tmp_path):
+    write(tmp_path, "a.py", b"x")
+    manifest = UpdateManifest(str(tmp_path))
+    manifest.refresh(["a.py"])
+    write(tmp_path, "a.py", b"xy")
+    manifest.refresh(["a.py"])
+    assert manifest.sha("a.py") == git_blob_sha(b"xy")
+
+
+def test_deleted_file_is_dropped(tmp_path):
+    write(tmp_path, "a.py", b"x")
+    manifest = UpdateManifest(str(tmp_path))
+    manifest.refresh(["a.py"])
+    os.remove(tmp_path / "a.py")
+    manifest.refresh(["a.py"])
+    assert manifest.sha("a.py") is None
+    assert UpdateManifest(str(tmp_path)).sha("a.py") is None
+
+
+def test_record_known_sha(tmp_path):
+    write(tmp_path, "a.py", b"x")
+    manifest = UpdateManifest(str(tmp_path))
+    manifest.record("a.py", "abc")
+    assert manifest.sha("a.py") == "abc"
+    # Taille et date enregistrées : refresh ne recalcule pas
+    manifest.refresh(["a.py"])
+    assert manifest.sha("a.py") == "abc"
+
+
+def test_corrupt_manifest_starts_empty(tmp_path):
+    write(tmp_path, ".update_manifest.json", b"{pas du json")
+    assert UpdateManifest(str(tmp_path)).entries == {}
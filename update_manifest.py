@@ -0,0 +1,80 @@
+"""
+Manifeste local des fichiers mis à jour par Retrosoft
+Un seul fichier (chemin -> SHA de blob git, taille, mtime) remplace les fichiers .{nom}.sha ;
+un fichier n'est re-haché que si sa taille ou sa date de modification a changé
+"""
+
+import json
+import logging
+import os
+import threading
+from github_api import git_blob_sha
+
+MANIFEST_FILE = ".update_manifest.json"
+
+
+class UpdateManifest:
+    """État local des fichiers suivis, comparé en mémoire à l'arbre distant"""
+
+    def __init__(self, root=".", path=MANIFEST_FILE):
+        self.root = root
+        self.path = os.path.join(root, path)
+        self.entries = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f).get("files", {})
+        except Exception:
+            self.entries = {}
+
+    def save(self):
+        with self._lock:
+            data = {"files": dict(self.entries)}
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.warning(f"Écriture du manifeste de mise à jour impossible : {e}")
+
+    def refresh(self, paths):
+        """Met à jour les entrées des chemins donnés ; ne hache que les fichiers modifiés"""
+        changed = False
+        for path in paths:
+            full = os.path.join(self.root, path)
+            try:
+                st = os.stat(full)
+            except OSError:
+                if self.entries.pop(path, None) is not None:
+                    changed = True
+                continue
+            entry = self.entries.get(path)
+            if entry and entry["size"] == st.st_size and entry["mtime"] == st.st_mtime_ns:
+                continue
+            with open(full, "rb") as f:
+                sha = git_blob_sha(f.read())
+            with self._lock:
+                self.entries[path] = {"sha": sha, "size": st.st_size, "mtime": st.st_mtime_ns}
+            changed = True
+        if changed:
+            self.save()
+
+    def record(self, path, sha):
+        """Enregistre un fichier qui vient d'être écrit avec un SHA déjà connu"""
+        st = os.stat(os.path.join(self.root, path))
+        with self._lock:
+            self.entries[path] = {"sha": sha, "size": st.st_size, "mtime": st.st_mtime_ns}
+
+    def sha(self, path):
+        entry = self.entries.get(path)
+        return entry["sha"] if entry else None
+
+    def changed_files(self, remote_tree, paths):
+        """Chemins dont le SHA local diffère de l'arbre distant (absents en local compris)"""
+        self.refresh(paths)
+        return [path for path in paths
+                if path in remote_tree and remote_tree[path]["sha"] != self.sha(path)]
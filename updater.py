@@ -10,10 +10,18 @@ import os
 import sys
 import subprocess
 import tempfile
+import hashlib
+import logging
+import time
 from pathlib import Path
 from PyQt6.QtWidgets import QMessageBox, QProgressDialog
 from PyQt6.QtCore import QThread, pyqtSignal, Qt
 from version import get_github_repo_url
+from delta_update import (DeltaError, apply_delta, delta_asset_name, file_sha256,
+                          read_header as read_delta_header)
+
+# Cache des installateurs téléchargés, un sous-dossier par version
+UPDATE_CACHE_DIR = os.path.join(tempfile.gettempdir(), "Retrosoft", "updates")
 
 class UpdateChecker(QThread):
     """Thread pour vérifier les mises à jour sans bloquer l'interface"""
@@ -70,40 +78,193 @@ class UpdateChecker(QThread):
             return False
 
 class UpdateDownloader(QThread):
-    """Thread pour télécharger et installer la mise à jour"""
+    """Thread pour télécharger et installer la mise à jour
+
+    Le fichier est conservé dans un cache par version (tag) : un téléchargement interrompu
+    reprend avec un en-tête Range et un fichier déjà vérifié est réutilisé tel quel.
+    """
     
     progress_updated = pyqtSignal(int)
     download_finished = pyqtSignal(str)
     error_occurred = pyqtSignal(str)
     
-    def __init__(self, download_url, filename):
+    MIN_CHUNK = 64 * 1024
+    MAX_CHUNK = 1024 * 1024
+    PROGRESS_INTERVAL = 0.1  # secondes entre deux signaux de progression
+    
+    def __init__(self, download_url, filename, tag="latest", expected_sha256=None, expected_size=None):
         super().__init__()
         self.download_url = download_url
         self.filename = filename
+        self.tag = tag
+        self.expected_sha256 = expected_sha256.lower() if expected_sha256 else None
+        self.expected_size = expected_size
+        self.cache_dir = os.path.join(UPDATE_CACHE_DIR, tag)
+        self._cancelled = False
+        
+    def cancel(self):
+        """Interrompt le téléchargement ; la partie déjà reçue est gardée pour reprise"""
+        self._cancelled = True
         
     def run(self):
         """Télécharger la mise à jour"""
         try:
-            response = requests.get(self.download_url, stream=True)
-            total_size = int(response.headers.get('content-length', 0))
-            
-            temp_dir = tempfile.gettempdir()
-            file_path = os.path.join(temp_dir, self.filename)
-            
-            with open(file_path, 'wb') as file:
-                downloaded = 0
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        file.write(chunk)
-                        downloaded += len(chunk)
-                        if total_size > 0:
-                            progress = int((downloaded / total_size) * 100)
-                            self.progress_updated.emit(progress)
-            
-            self.download_finished.emit(file_path)
-            
+            file_path = self.fetch()
+            if file_path:
+                self.progress_updated.emit(100)
+                self.download_finished.emit(file_path)
         except Exception as e:
             self.error_occurred.emit(f"Erreur de téléchargement: {str(e)}")
+    
+    def fetch(self):
+        """Télécharge (ou reprend) le fichier dans le cache ; None si annulé"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        file_path = os.path.join(self.cache_dir, self.filename)
+        
+        # Fichier déjà téléchargé et vérifié pour cette version
+        if os.path.exists(file_path) and self.verify_cached(file_path, self.expected_sha256):
+            logging.info(f"Mise à jour {self.tag} réutilisée depuis le cache : {file_path}")
+            return file_path
+        
+        part_path = file_path + ".part"
+        digest = hashlib.sha256()
+        offset = 0
+        if os.path.exists(part_path):
+            with open(part_path, 'rb') as f:
+                for block in iter(lambda: f.read(self.MAX_CHUNK), b""):
+                    digest.update(block)
+                    offset += len(block)
+        
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        with requests.get(self.download_url, stream=True, headers=headers, timeout=(10, 30)) as response:
+            if response.status_code == 206:
+                logging.info(f"Reprise du téléchargement à {offset} octets")
+                self.receive(response, part_path, "ab", digest, offset)
+            elif response.status_code == 416 and offset and self.part_complete(response, offset, digest):
+                pass  # Déjà complet
+            else:
+                if response.status_code == 416:
+                    os.remove(part_path)  # Partie inutilisable, la prochaine tentative repart de zéro
+                response.raise_for_status()
+                # Le serveur ignore Range : on repart de zéro
+                digest = hashlib.sha256()
+                offset = 0
+                self.receive(response, part_path, "wb", digest, offset)
+        if self._cancelled:
+            return None
+        
+        sha256 = digest.hexdigest()
+        if self.expected_sha256 and sha256 != self.expected_sha256:
+            os.remove(part_path)
+            raise ValueError(f"Fichier corrompu (SHA-256 {sha256} au lieu de {self.expected_sha256})")
+        os.replace(part_path, file_path)
+        with open(file_path + ".sha256", 'w') as f:
+            f.write(sha256)
+        return file_path
+    
+    def part_complete(self, response, offset, digest):
+        """Réponse 416 à une reprise : le .part contient-il déjà tout le fichier ?"""
+        total = self.expected_size
+        if total is None:
+            # 416 indique la taille réelle : "Content-Range: bytes */12345"
+            content_range = response.headers.get("Content-Range", "")
+            if content_range.startswith("bytes */") and content_range[8:].isdigit():
+                total = int(content_range[8:])
+        if total is not None:
+            return offset == total
+        # Taille inconnue : seul le SHA-256 attendu permet de garder le fichier
+        return bool(self.expected_sha256) and digest.hexdigest() == self.expected_sha256
+    
+    def receive(self, response, part_path, mode, digest, offset):
+        """Écrit le corps de la réponse par blocs adaptatifs et limite les signaux de progression"""
+        content_length = int(response.headers.get('content-length', 0))
+        total_size = offset + content_length if content_length else (self.expected_size or 0)
+        chunk_size = self.MIN_CHUNK
+        downloaded = offset
+        last_emit = 0.0
+        last_progress = -1
+        with open(part_path, mode) as file:
+            while not self._cancelled:
+                start = time.monotonic()
+                chunk = response.raw.read(chunk_size, decode_content=True)
+                if not chunk:
+                    break
+                file.write(chunk)
+                digest.update(chunk)
+                downloaded += len(chunk)
+                # Blocs plus gros sur une liaison rapide, plus petits sur une liaison lente
+                elapsed = time.monotonic() - start
+                if elapsed < 0.05:
+                    chunk_size = min(chunk_size * 2, self.MAX_CHUNK)
+                elif elapsed > 0.5:
+                    chunk_size = max(chunk_size // 2, self.MIN_CHUNK)
+                if total_size > 0:
+                    progress = int((downloaded / total_size) * 100)
+                    now = time.monotonic()
+                    if progress != last_progress and now - last_emit >= self.PROGRESS_INTERVAL:
+                        self.progress_updated.emit(progress)
+                        last_progress = progress
+                        last_emit = now
+    
+    def verify_cached(self, file_path, expected=None):
+        """Vérifie un fichier du cache contre le SHA-256 attendu (ou celui noté au téléchargement)"""
+        if expected is None:
+            try:
+                with open(file_path + ".sha256", 'r') as f:
+                    expected = f.read().strip()
+            except OSError:
+                return False
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(self.MAX_CHUNK), b""):
+                digest.update(block)
+        if digest.hexdigest() == expected:
+            return True
+        logging.warning(f"Fichier en cache invalide, nouveau téléchargement : {file_path}")
+        os.remove(file_path)
+        return False
+
+class DeltaUpdateDownloader(UpdateDownloader):
+    """Télécharge le patch vX→vY et reconstruit l'installateur à partir de la version en cache"""
+    
+    delta_failed = pyqtSignal(str)  # le delta est inutilisable : repli sur l'installateur complet
+    
+    def __init__(self, delta_url, delta_name, base_candidates, target_name, tag,
+                 target_sha256=None, delta_size=None):
+        super().__init__(delta_url, delta_name, tag, None, delta_size)
+        self.base_candidates = base_candidates
+        self.target_name = target_name
+        self.target_sha256 = target_sha256.lower() if target_sha256 else None
+        
+    def run(self):
+        try:
+            target_path = os.path.join(self.cache_dir, self.target_name)
+            if os.path.exists(target_path) and self.verify_cached(target_path, self.target_sha256):
+                self.progress_updated.emit(100)
+                self.download_finished.emit(target_path)
+                return
+            delta_path = self.fetch()
+            if not delta_path:
+                return
+            _, base_sha, _, delta_target_sha = read_delta_header(delta_path)
+            if self.target_sha256 and delta_target_sha != self.target_sha256:
+                raise DeltaError("Le delta ne produit pas l'installateur publié")
+            base_path = next((p for p in self.base_candidates if file_sha256(p) == base_sha), None)
+            if base_path is None:
+                raise DeltaError("Aucune version locale ne correspond à la base du delta")
+            start = time.perf_counter()
+            sha256 = apply_delta(base_path, delta_path, target_path + ".part")
+            os.replace(target_path + ".part", target_path)
+            with open(target_path + ".sha256", 'w') as f:
+                f.write(sha256)
+            os.remove(delta_path)
+            logging.info(f"Installateur {self.tag} reconstruit par delta "
+                         f"({self.expected_size or '?'} octets téléchargés) en {time.perf_counter() - start:.1f} s")
+            self.progress_updated.emit(100)
+            self.download_finished.emit(target_path)
+        except Exception as e:
+            logging.warning(f"Mise à jour différentielle impossible : {e}")
+            self.delta_failed.emit(str(e))
 
 class AutoUpdater:
     """Gestionnaire principal des mises à jour automatiques"""
@@ -156,7 +317,19 @@ class AutoUpdater:
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            self.download_update(exe_asset["browser_download_url"], exe_asset["name"])
+            # Empreinte publiée par GitHub pour l'asset ("sha256:...") si disponible
+            digest = exe_asset.get("digest") or ""
+            expected_sha256 = digest.split(":", 1)[1] if digest.startswith("sha256:") else None
+            # Patch vX→vY publié dans la release et version précédente disponible localement ?
+            delta_name = delta_asset_name(self.current_version, version)
+            delta_asset = next((a for a in release_data.get("assets", []) if a["name"] == delta_name), None)
+            bases = self.find_delta_bases()
+            if delta_asset and bases:
+                self.download_delta(delta_asset, bases, exe_asset, version, expected_sha256)
+            else:
+                self.download_update(exe_asset["browser_download_url"], exe_asset["name"],
+                                     tag=version, expected_sha256=expected_sha256,
+                                     expected_size=exe_asset.get("size"))
     
     def on_no_update(self):
         """Aucune mise à jour disponible"""
@@ -176,8 +349,40 @@ class AutoUpdater:
                 f"Impossible de vérifier les mises à jour:\n{error_message}"
             )
     
-    def download_update(self, download_url, filename):
-        """Télécharger la mise à jour"""
+    def find_delta_bases(self):
+        """Installateurs de la version installée pouvant servir de base à un delta
+
+        Les deltas sont construits d'installateur à installateur (make_delta.py) :
+        l'exécutable de l'application n'a jamais le SHA-256 de la base.
+        """
+        candidates = []
+        for tag in (f"v{self.current_version}", self.current_version):
+            tag_dir = os.path.join(UPDATE_CACHE_DIR, tag)
+            if os.path.isdir(tag_dir):
+                candidates += [os.path.join(tag_dir, name) for name in sorted(os.listdir(tag_dir))
+                               if name.endswith(".exe")]
+        return candidates
+    
+    def download_delta(self, delta_asset, bases, exe_asset, version, expected_sha256):
+        """Télécharger le patch ; repli automatique sur l'installateur complet en cas d'échec"""
+        downloader = DeltaUpdateDownloader(
+            delta_asset["browser_download_url"], delta_asset["name"], bases,
+            exe_asset["name"], version, expected_sha256, delta_asset.get("size"))
+        
+        def fallback(reason):
+            self.progress_dialog.close()
+            self.download_update(exe_asset["browser_download_url"], exe_asset["name"],
+                                 tag=version, expected_sha256=expected_sha256,
+                                 expected_size=exe_asset.get("size"))
+        downloader.delta_failed.connect(fallback)
+        self.start_download(downloader)
+    
+    def download_update(self, download_url, filename, tag="latest", expected_sha256=None, expected_size=None):
+        """Télécharger la mise à jour (ou la reprendre depuis le cache)"""
+        self.start_download(UpdateDownloader(download_url, filename, tag, expected_sha256, expected_size))
+    
+    def start_download(self, downloader):
+        """Affiche la progression et démarre le téléchargement"""
         # Dialogue de progression
         self.progress_dialog = QProgressDialog(
             "Téléchargement de la mise à jour...",
@@ -189,11 +394,11 @@ class AutoUpdater:
         self.progress_dialog.show()
         
         # Démarrer le téléchargement
-        self.downloader = UpdateDownloader(download_url, filename)
+        self.downloader = downloader
         self.downloader.progress_updated.connect(self.progress_dialog.setValue)
         self.downloader.download_finished.connect(self.on_download_finished)
         self.downloader.error_occurred.connect(self.on_download_error)
-        self.progress_dialog.canceled.connect(self.downloader.terminate)
+        self.progress_dialog.canceled.connect(self.downloader.cancel)
         self.downloader.start()
     
     def on_download_finished(self, file_path):
@@ -237,11 +442,12 @@ class AutoUpdater:
             )
 
 # Fonction utilitaire pour intégrer facilement dans l'application principale
-def setup_auto_updater(main_window, version="1.0.0"):
+def setup_auto_updater(main_window, version="1.0.0", check_now=True):
     """Configure le système de mise à jour pour l'application principale"""
     updater = AutoUpdater(main_window, version)
     
     # Vérification automatique au démarrage (silencieuse)
-    updater.check_for_updates(silent=True)
+    if check_now:
+        updater.check_for_updates(silent=True)
     
     return updater
\ No newline at end of file
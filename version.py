@@ -5,6 +5,7 @@ Informations de version pour Retrosoft
 import os
 import json
 from PyQt6.QtWidgets import QInputDialog, QApplication
+from config_store import store, CONFIG_PATH
 
 __version__ = "2.0.0"
 __app_name__ = "Retrosoft"
@@ -44,7 +45,8 @@ VERSION_HISTORY = {
     ]
 }
 
-CONFIG_FILE = "config.json"
+# Même fichier que le store, quel que soit le dossier de lancement
+CONFIG_FILE = CONFIG_PATH
 DEFAULT_REPO = "https://github.com/qjslk/navigateur-rapide"
 
 def get_version():
@@ -63,10 +65,9 @@ def get_app_info():
 
 def get_github_repo_url():
     """Retourne l'URL du dépôt GitHub à utiliser (demande à l'utilisateur au premier lancement)"""
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-            config = json.load(f)
-            return config.get("github_repo", DEFAULT_REPO)
+    # Lu en mémoire : le fichier n'est relu que s'il a changé
+    if store.exists():
+        return store.get_str("github_repo") or DEFAULT_REPO
     # Demande à l'utilisateur au premier lancement
     app = QApplication.instance() or QApplication([])
     repo_url, ok = QInputDialog.getText(
@@ -76,8 +77,8 @@ def get_github_repo_url():
         text=DEFAULT_REPO
     )
     if ok and repo_url:
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            json.dump({"github_repo": repo_url}, f)
+        store.set("github_repo", repo_url)
+        store.flush()
         return repo_url
     else:
         return DEFAULT_REPO
\ No newline at end of file
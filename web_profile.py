@@ -0,0 +1,176 @@
+"""
+Profil web persistant de Retrosoft
+Le profil par défaut de Qt 6 est hors enregistrement (rien sur disque) : chaque
+lancement retéléchargeait toutes les ressources des sites. Le profil nommé garde
+un cache HTTP sur disque et les cookies entre deux lancements.
+"""
+
+import logging
+import os
+import threading
+import time
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtWebEngineCore import QWebEngineProfile
+from config_store import store as config_store
+
+PROFILE_NAME = "Retrosoft"
+# Valeurs par défaut des clés de config.json
+CACHE_SIZE_MB = 256       # cache_size_mb (0 : taille choisie par Chromium)
+CACHE_DIR = ""            # cache_dir ("" : dossier du profil)
+# Taille du cache sur disque : mesurée dans un thread, rafraîchie par minuterie
+CACHE_USAGE_INTERVAL_MS = 5 * 60 * 1000
+CACHE_USAGE_MAX_AGE = 60  # s : au-delà, une consultation relance une mesure
+
+_profile = None
+_relay = None
+_usage_timer = None
+_usage = {"path": None, "files": None, "bytes": None, "measured_at": None}
+_usage_lock = threading.Lock()
+_usage_thread = None
+
+
+class _ConfigRelay(QObject):
+    """Ramène les changements de config sur le thread GUI
+
+    Les abonnés du store sont appelés sur le thread qui a détecté le changement
+    (surveillance de config.json, boucle des services...) ; le profil Qt ne se
+    modifie que depuis le thread GUI : le signal y est livré en file d'attente.
+    """
+    changed = pyqtSignal()
+
+
+def create_profile(name=PROFILE_NAME, storage_path=None, cache_dir="", cache_size_mb=CACHE_SIZE_MB,
+                   persistent_cookies=True):
+    """Profil sur disque ; storage_path remplace l'emplacement par défaut (données de l'application)"""
+    profile = QWebEngineProfile(name)
+    if storage_path:
+        profile.setPersistentStoragePath(storage_path)
+    configure_cache(profile, cache_dir, cache_size_mb, persistent_cookies)
+    return profile
+
+
+def configure_cache(profile, cache_dir="", cache_size_mb=CACHE_SIZE_MB, persistent_cookies=True):
+    """Applique les réglages de cache et de cookies (aussi à chaud)"""
+    profile.setHttpCacheType(QWebEngineProfile.HttpCacheType.DiskHttpCache)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    # Chemin vide : retour au dossier de cache du profil
+    profile.setCachePath(cache_dir)
+    profile.setHttpCacheMaximumSize(max(0, int(cache_size_mb)) * 2**20)
+    profile.setPersistentCookiesPolicy(
+        QWebEngineProfile.PersistentCookiesPolicy.AllowPersistentCookies if persistent_cookies
+        else QWebEngineProfile.PersistentCookiesPolicy.NoPersistentCookies)
+
+
+def _apply_config(*_):
+    configure_cache(_profile,
+                    cache_dir=config_store.get_str("cache_dir", CACHE_DIR),
+                    cache_size_mb=config_store.get_int("cache_size_mb", CACHE_SIZE_MB),
+                    persistent_cookies=config_store.get_bool("persistent_cookies", True))
+
+
+def get_profile():
+    """Profil de tous les onglets ; hors enregistrement si web_profile_persistent est faux"""
+    global _profile, _relay, _usage_timer
+    if _profile is None:
+        if not config_store.get_bool("web_profile_persistent", True):
+            logging.info("Profil web hors enregistrement (aucun cache disque)")
+            _profile = QWebEngineProfile.defaultProfile()
+            return _profile
+        _profile = create_profile()
+        _apply_config()
+        # Créé sur le thread GUI : _apply_config y est toujours exécuté
+        _relay = _ConfigRelay()
+        _relay.changed.connect(_apply_config)
+        for key in ("cache_dir", "cache_size_mb", "persistent_cookies"):
+            config_store.subscribe(key, lambda *_: _relay.changed.emit())
+        _usage_timer = QTimer(_relay)
+        _usage_timer.timeout.connect(lambda: refresh_cache_usage(_profile.cachePath()))
+        _usage_timer.start(CACHE_USAGE_INTERVAL_MS)
+        logging.info(f"Profil web persistant : {_profile.persistentStoragePath()} (cache {_profile.cachePath()})")
+    return _profile
+
+
+def _directory_usage(path):
+    files = size = 0
+    stack = [path]
+    while stack:
+        try:
+            entries = list(os.scandir(stack.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    files += 1
+                    size += entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                pass
+    return files, size
+
+
+def _measure_usage(path):
+    files, size = _directory_usage(path)
+    with _usage_lock:
+        _usage.update(path=path, files=files, bytes=size, measured_at=time.monotonic())
+
+
+def refresh_cache_usage(path):
+    """Mesure la taille du cache dans un thread : parcourir un gros cache figerait l'interface"""
+    global _usage_thread
+    with _usage_lock:
+        if _usage_thread is not None and _usage_thread.is_alive():
+            return
+        _usage_thread = threading.Thread(target=_measure_usage, args=(path,), name="cache-usage", daemon=True)
+        _usage_thread.start()
+
+
+def cache_stats(profile=None):
+    """Emplacement, nombre de fichiers, taille sur disque et taille maximale du cache HTTP
+
+    files et bytes viennent de la dernière mesure en arrière-plan (None si aucune encore) ;
+    une mesure trop ancienne est relancée sans attendre son résultat.
+    """
+    profile = profile or get_profile()
+    stats = {
+        "persistent": not profile.isOffTheRecord(),
+        "path": profile.cachePath(),
+        "files": None,
+        "bytes": None,
+        "max_bytes": profile.httpCacheMaximumSize(),
+        "cookies": profile.persistentCookiesPolicy() != QWebEngineProfile.PersistentCookiesPolicy.NoPersistentCookies,
+    }
+    if stats["persistent"] and stats["path"]:
+        with _usage_lock:
+            usage = dict(_usage)
+        if usage["path"] == stats["path"]:
+            stats["files"], stats["bytes"] = usage["files"], usage["bytes"]
+        if (usage["path"] != stats["path"] or usage["measured_at"] is None
+                or time.monotonic() - usage["measured_at"] > CACHE_USAGE_MAX_AGE):
+            refresh_cache_usage(stats["path"])
+    return stats
+
+
+def describe_cache(profile=None):
+    stats = cache_stats(profile)
+    if not stats["persistent"]:
+        return "Cache web : profil hors enregistrement (mémoire seulement)"
+    limit = f"{stats['max_bytes'] / 2**20:.0f} Mo" if stats["max_bytes"] else "automatique"
+    cookies = "conservés" if stats["cookies"] else "effacés à la fermeture"
+    if stats["bytes"] is None:
+        usage = "taille en cours de calcul"
+    else:
+        usage = f"{stats['bytes'] / 2**20:.1f} Mo en {stats['files']} fichiers"
+    return (f"Cache web : {usage} (limite {limit})\n"
+            f"Dossier : {stats['path']}\nCookies : {cookies}")
+
+
+def clear_cache(profile=None):
+    """Vide le cache HTTP (asynchrone côté Chromium) ; les cookies sont conservés"""
+    profile = profile or get_profile()
+    profile.clearHttpCache()
+    with _usage_lock:
+        _usage["measured_at"] = None  # Taille à remesurer à la prochaine consultation
+    logging.info("Cache web vidé")